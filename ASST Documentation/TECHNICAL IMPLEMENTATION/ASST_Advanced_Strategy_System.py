@@ -14,6 +14,15 @@ import json
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
+from asst_alert_rules import RISK_MANAGER_RULES, RuleEngine
+from asst_margin import BuyingPowerLedger, MarginEngine, short_put_ladder
+from asst_strategy_core import (
+    STRATEGY_ASSIGNMENT_PARAMS, STRATEGY_HEDGE_TIERS, AssignmentModelParams,
+    assignment_probability, compounding_allocation, hedge_ladder, kelly_position_size,
+    tiered_premium
+)
+from asst_vol_surface import VolSurface
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -21,6 +30,7 @@ logger = logging.getLogger(__name__)
 @dataclass
 class StrategyParameters:
     """Core strategy parameters configuration"""
+    symbol: str = 'ASST'
     asst_current_price: float = 2.40
     monthly_capital: int = 4000
     premium_put_allocation: float = 0.70
@@ -31,6 +41,27 @@ class StrategyParameters:
     iv_environment: int = 425
     max_concentration: float = 1.00
     min_hedge_ratio: float = 0.25
+    vol_surface: Optional[VolSurface] = None   # Overrides iv_environment when fitted
+    margin_method: str = 'cash'                # Put sizing: 'cash', 'reg_t' or 'portfolio'
+    legacy_contract_sizing: bool = False       # Flat $250 per contract instead of margin
+
+    def iv_at(self, strike, days_to_expiry=30, current_price: float = None):
+        """Implied volatility (%) at strike/expiry: surface lookup, else the flat iv_environment"""
+        if self.vol_surface is None:
+            return self.iv_environment
+        if current_price is None:
+            current_price = self.asst_current_price
+        iv = self.vol_surface.iv_level(strike, days_to_expiry, current_price)
+        return float(iv) if np.ndim(iv) == 0 else iv
+
+# Put ladder as moneyness: weight
+STRIKE_LADDER = {
+    0.85: 0.20,  # Deep ITM for maximum assignment
+    0.95: 0.35,  # Near ITM for balanced approach
+    1.05: 0.25,  # Slight OTM for premium
+    1.25: 0.15,  # OTM for pure premium
+    1.50: 0.05   # Far OTM for lottery premium
+}
 
 class PositionManager:
     """Advanced position management and optimization"""
@@ -40,15 +71,19 @@ class PositionManager:
         self.positions = {}
         self.assignment_history = []
         self.performance_metrics = {}
+        self.assignment_params: AssignmentModelParams = STRATEGY_ASSIGNMENT_PARAMS
 
     def calculate_optimal_position_size(self, portfolio_value: float, 
                                       edge: float = 0.15) -> Dict:
         """
         Calculate optimal position size using Kelly Criterion with safety factors
         """
-        kelly_optimal = edge / (self.params.iv_environment / 100) ** 2
-        adjusted_kelly = kelly_optimal * self.params.personal_safety_factor
-        position_size = portfolio_value * adjusted_kelly
+        variance = (self.params.iv_at(self.params.asst_current_price) / 100) ** 2
+        sizing = kelly_position_size(portfolio_value, edge, variance,
+                                     self.params.personal_safety_factor)
+        kelly_optimal = float(sizing['kelly_fraction'])
+        adjusted_kelly = float(sizing['adjusted_kelly'])
+        position_size = float(sizing['position_size'])
 
         logger.info(f"Optimal position size calculated: ${position_size:,.0f}")
 
@@ -69,20 +104,9 @@ class PositionManager:
         if current_price is None:
             current_price = self.params.asst_current_price
 
-        moneyness = strike / current_price
-        time_factor = max(0.1, days_to_expiry / 30)
-
-        if strike <= current_price:  # ITM puts
-            base_prob = 0.85
-            itm_adjustment = (current_price - strike) / current_price * 0.15
-            vol_adjustment = (self.params.iv_environment / 400) * 0.05
-            assignment_prob = min(0.98, base_prob + itm_adjustment + vol_adjustment)
-        else:  # OTM puts
-            base_prob = 0.05
-            otm_factor = (current_price / strike) ** 2 * time_factor * 0.8
-            assignment_prob = max(0.02, min(0.50, base_prob + otm_factor))
-
-        return assignment_prob
+        iv_level = self.params.iv_at(strike, days_to_expiry, current_price)
+        return float(assignment_probability(strike, current_price, days_to_expiry,
+                                            iv_level, self.assignment_params))
 
     def optimize_strike_allocation(self, available_capital: float) -> Dict:
         """
@@ -91,18 +115,20 @@ class PositionManager:
         current_price = self.params.asst_current_price
 
         # Dynamic strike allocation based on price level
-        strike_allocation = {
-            current_price * 0.85: 0.20,  # Deep ITM for maximum assignment
-            current_price * 0.95: 0.35,  # Near ITM for balanced approach
-            current_price * 1.05: 0.25,  # Slight OTM for premium
-            current_price * 1.25: 0.15,  # OTM for pure premium
-            current_price * 1.50: 0.05   # Far OTM for lottery premium
-        }
+        strike_allocation = {current_price * moneyness: weight
+                             for moneyness, weight in STRIKE_LADDER.items()}
+
+        # Single vectorized pass over the ladder
+        strikes = np.array(list(strike_allocation.keys()))
+        assignment_probs = assignment_probability(
+            strikes, current_price,
+            iv_level=self.params.iv_at(strikes, 27), params=self.assignment_params
+        )
 
         allocation_plan = {}
-        for strike, weight in strike_allocation.items():
+        for i, (strike, weight) in enumerate(strike_allocation.items()):
             capital_allocated = available_capital * weight
-            assignment_prob = self.assignment_probability_model(strike)
+            assignment_prob = float(assignment_probs[i])
 
             allocation_plan[strike] = {
                 'capital_allocation': capital_allocated,
@@ -121,44 +147,74 @@ class PremiumCompoundingEngine:
     def __init__(self, strategy_params: StrategyParameters):
         self.params = strategy_params
         self.compounding_history = []
+        self.margin_engine = MarginEngine()
 
     def calculate_monthly_allocation(self, premium_collected: float, 
                                    month_number: int) -> Dict:
         """
         Calculate optimal monthly premium allocation with compounding effects
         """
-        # Progressive scaling factor for exponential growth
-        scaling_factor = 1 + (month_number - 1) * 0.12  # 12% monthly acceleration
+        allocation = self._allocate(premium_collected, month_number)
+        allocation_result = self._allocation_record(allocation, premium_collected, month_number)
+        allocation_result['estimated_new_contracts'] = self.contract_capacity(
+            allocation_result['total_put_capital'])
 
-        # Base allocations
-        put_allocation = premium_collected * self.params.premium_put_allocation
-        call_allocation = premium_collected * self.params.premium_call_allocation
+        self.compounding_history.append(allocation_result)
+        logger.info(f"Month {month_number} allocation calculated: {allocation_result}")
 
-        # Apply scaling for compounding effect
-        scaled_put_allocation = put_allocation * scaling_factor
-        total_put_capital = scaled_put_allocation + self.params.monthly_capital
+        return allocation_result
 
-        # Contract projections
-        avg_contract_value = 250  # Dynamic based on market conditions
-        estimated_contracts = int(total_put_capital / avg_contract_value)
+    def _allocate(self, premium_collected, month_number) -> Dict[str, np.ndarray]:
+        """Vectorized allocation: 12% monthly scaling applied to reinvested premium"""
+        return compounding_allocation(
+            premium_collected, month_number, self.params.monthly_capital,
+            put_allocation=self.params.premium_put_allocation,
+            call_allocation=self.params.premium_call_allocation,
+            scaling_step=0.12,
+            scale_put_capital=True,
+            contract_cost=self.contract_cost()
+        )
 
-        allocation_result = {
+    def put_ladder_unit(self, days_to_expiry: int = 27):
+        """One short put contract spread across STRIKE_LADDER at the current price"""
+        current_price = self.params.asst_current_price
+        strikes = current_price * np.array(list(STRIKE_LADDER.keys()))
+        sigma = np.asarray(self.params.iv_at(strikes, days_to_expiry)) / 100
+        return short_put_ladder(current_price, strikes, list(STRIKE_LADDER.values()),
+                                sigma, days_to_expiry / 365)
+
+    def contract_cost(self) -> float:
+        """Buying power one new ladder contract consumes"""
+        if self.params.legacy_contract_sizing:
+            return 250.0
+        ledger = BuyingPowerLedger(self.margin_engine, 0.0, self.params.margin_method)
+        return ledger.marginal_requirement(self.params.symbol, self.put_ladder_unit())
+
+    def contract_capacity(self, put_capital: float) -> int:
+        """New ladder contracts that put_capital supports"""
+        if self.params.legacy_contract_sizing:
+            return int(np.trunc(put_capital / self.contract_cost()))
+        ledger = BuyingPowerLedger(self.margin_engine, put_capital, self.params.margin_method)
+        return ledger.max_contracts(self.params.symbol, self.put_ladder_unit(), put_capital)
+
+    @staticmethod
+    def _allocation_record(allocation: Dict[str, np.ndarray], premium_collected: float,
+                           month_number: int, i=()) -> Dict:
+        """Convert one element of a vectorized allocation to the historical dict layout"""
+        scaling_factor = float(allocation['scaling_factor'][i])
+
+        return {
             'month': month_number,
             'premium_collected': premium_collected,
-            'put_allocation': put_allocation,
-            'call_allocation': call_allocation,
+            'put_allocation': float(allocation['put_reinvestment'][i]),
+            'call_allocation': float(allocation['call_hedge_budget'][i]),
             'scaling_factor': scaling_factor,
-            'total_put_capital': total_put_capital,
-            'estimated_new_contracts': estimated_contracts,
-            'compounding_multiple': total_put_capital / self.params.monthly_capital,
+            'total_put_capital': float(allocation['total_put_capital'][i]),
+            'estimated_new_contracts': int(allocation['estimated_new_contracts'][i]),
+            'compounding_multiple': float(allocation['compounding_multiple'][i]),
             'expected_growth_rate': (scaling_factor - 1) * 100
         }
 
-        self.compounding_history.append(allocation_result)
-        logger.info(f"Month {month_number} allocation calculated: {allocation_result}")
-
-        return allocation_result
-
     def project_compound_growth(self, months: int = 12) -> pd.DataFrame:
         """
         Project compound growth over specified timeline
@@ -166,9 +222,15 @@ class PremiumCompoundingEngine:
         projections = []
         base_premium = 1000  # Starting monthly premium
 
-        for month in range(1, months + 1):
-            monthly_premium = base_premium * (1.12 ** (month - 1))
-            allocation = self.calculate_monthly_allocation(monthly_premium, month)
+        month_index = np.arange(1, months + 1)
+        premiums = base_premium * (1.12 ** (month_index - 1.0))
+        allocations = self._allocate(premiums, month_index)
+
+        for i, month in enumerate(range(1, months + 1)):
+            monthly_premium = float(premiums[i])
+            allocation = self._allocation_record(allocations, monthly_premium, month, i)
+            self.compounding_history.append(allocation)
+            logger.info(f"Month {month} allocation calculated: {allocation}")
 
             projections.append({
                 'Month': month,
@@ -220,7 +282,18 @@ class CallHedgeOptimizer:
             }
         }
 
+        # Flatten every tier's strikes into one ladder and price it in a single pass
+        tier_strikes = [tier['strikes'] for tier in hedge_tiers.values()]
+        ladder = hedge_ladder(
+            hedge_budget,
+            [tier['allocation'] for tier in hedge_tiers.values() for _ in tier['strikes']],
+            [strike / current_price for strikes in tier_strikes for strike in strikes],
+            STRATEGY_HEDGE_TIERS,
+            strikes_per_tier=[len(strikes) for strikes in tier_strikes for _ in strikes]
+        )
+
         optimization_result = {}
+        offset = 0
 
         for tier_name, tier_config in hedge_tiers.items():
             tier_budget = hedge_budget * tier_config['allocation']
@@ -237,15 +310,14 @@ class CallHedgeOptimizer:
 
             # Calculate contracts for each strike
             contracts_per_strike = []
-            for strike in tier_config['strikes']:
-                estimated_premium = self.estimate_call_premium(strike)
-                contracts = int((tier_budget / len(tier_config['strikes'])) / (estimated_premium * 100))
+            for i, strike in enumerate(tier_config['strikes'], start=offset):
                 contracts_per_strike.append({
                     'strike': strike,
-                    'contracts': contracts,
-                    'estimated_premium': estimated_premium,
-                    'total_cost': contracts * estimated_premium * 100
+                    'contracts': int(ladder['contracts'][i]),
+                    'estimated_premium': float(ladder['estimated_premium'][i]),
+                    'total_cost': float(ladder['total_cost'][i])
                 })
+            offset += len(tier_config['strikes'])
 
             tier_optimization['contracts_breakdown'] = contracts_per_strike
             optimization_result[tier_name] = tier_optimization
@@ -259,12 +331,8 @@ class CallHedgeOptimizer:
         current_price = self.params.asst_current_price
         moneyness = strike / current_price
 
-        if moneyness <= 2.0:
-            return 0.35  # Near-term calls
-        elif moneyness <= 4.0:
-            return 0.25  # Medium-term calls
-        else:
-            return 0.15  # Long-term calls
+        # <= 2x near-term ($0.35), <= 4x medium-term ($0.25), above long-term ($0.15)
+        return float(tiered_premium(moneyness, STRATEGY_HEDGE_TIERS))
 
 class RiskManager:
     """Comprehensive risk management and monitoring"""
@@ -272,6 +340,8 @@ class RiskManager:
     def __init__(self, strategy_params: StrategyParameters):
         self.params = strategy_params
         self.risk_alerts = []
+        # Deduplicated alerts with hysteresis; swap in another RuleEngine to retune
+        self.alert_engine = RuleEngine(RISK_MANAGER_RULES)
 
     def calculate_portfolio_risk(self, portfolio_value: float, 
                                asst_position_size: float) -> Dict:
@@ -279,7 +349,7 @@ class RiskManager:
         Calculate comprehensive portfolio risk metrics
         """
         concentration = asst_position_size / portfolio_value
-        daily_vol = (self.params.iv_environment / 100) / np.sqrt(252)
+        daily_vol = (self.params.iv_at(self.params.asst_current_price) / 100) / np.sqrt(252)
 
         risk_metrics = {
             'portfolio_value': portfolio_value,
@@ -308,20 +378,15 @@ class RiskManager:
             return 'CONSERVATIVE'
 
     def check_risk_thresholds(self, risk_metrics: Dict) -> List[str]:
-        """Check risk thresholds and generate alerts"""
-        alerts = []
-
-        if risk_metrics['concentration_%'] > 95:
-            alerts.append('CONCENTRATION: Extremely high ASST concentration')
-
-        if risk_metrics['var_95_%'] > 8:
-            alerts.append('VAR: High daily value at risk')
-
-        if risk_metrics['assignment_risk_score'] > 8:
-            alerts.append('ASSIGNMENT: Very high assignment probability')
+        """
+        Check risk thresholds and generate alerts
 
-        self.risk_alerts.extend(alerts)
-        return alerts
+        Returns every breach currently active. A breach is logged to
+        risk_alerts when it starts, not on every check while it lasts.
+        """
+        notified = self.alert_engine.update(risk_metrics)
+        self.risk_alerts.extend(alert['message'] for alert in notified)
+        return [alert['message'] for alert in self.alert_engine.alerts_for(risk_metrics)]
 
 class PerformanceTracker:
     """Advanced performance tracking and attribution"""
@@ -371,7 +436,7 @@ class ASSComprehensiveStrategy:
         """
         Generate comprehensive monthly execution plan
         """
-        logger.info(f"Generating plan for month {month}")
+        logger.info(f"Generating {self.params.symbol} plan for month {month}")
 
         # Calculate premium allocation
         allocation = self.premium_engine.calculate_monthly_allocation(premium_collected, month)
@@ -396,6 +461,7 @@ class ASSComprehensiveStrategy:
         )
 
         monthly_plan = {
+            'symbol': self.params.symbol,
             'month': month,
             'premium_allocation': allocation,
             'position_sizing': position_sizing,
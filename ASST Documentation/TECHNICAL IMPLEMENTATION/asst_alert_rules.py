@@ -0,0 +1,387 @@
+"""
+ASST Alert Rule Engine
+Declarative risk alert rules evaluated across all books in one pass
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Rules are declared as data (metric, comparison, threshold) and compiled
+once into per-rule arrays. Every update writes the new metric values into a
+per-book history ring and evaluates all rules for all books as one
+(books x rules) matrix:
+
+- threshold: the latest value against the threshold
+- rate: relative change over the last `window` updates
+- window: mean, max or min over the last `window` updates
+
+Alerts are edge-triggered with hysteresis. A rule fires when its signal
+crosses the threshold and re-arms only after it crosses back through the
+clear level. A breach that persists is therefore one notification, not one
+per check, while alerts_for() still reports it as active. Active alerts can optionally repeat every `renotify` seconds. A
+token bucket caps alerts per period across all books and rules, sending
+the most severe first. Alerts over the cap stay pending and go out on a
+later update.
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RULE_KINDS = ('threshold', 'rate', 'window')
+WINDOW_AGGREGATES = {'mean': np.mean, 'max': np.max, 'min': np.min}
+SEVERITY_RANK = {'INFO': 0, 'WARNING': 1, 'CRITICAL': 2}
+DEFAULT_BOOK = 'portfolio'
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """
+    One declarative alert rule
+
+    message and recommendation are format strings; they receive value,
+    threshold, book and every metric of the book by name.
+    """
+    name: str
+    metric: str
+    op: str                              # '>' or '<'
+    threshold: float
+    clear: Optional[float] = None        # Re-arm level (defaults to threshold)
+    kind: str = 'threshold'
+    window: int = 1                      # Updates spanned by rate/window rules
+    aggregate: str = 'mean'              # Window rules only
+    severity: str = 'WARNING'
+    message: str = '{name}: {metric} at {value:.4g}'
+    recommendation: str = ''
+    renotify: Optional[float] = None     # Seconds between repeats while active
+
+    def __post_init__(self):
+        if self.op not in ('>', '<'):
+            raise ValueError(f"Rule {self.name}: op must be '>' or '<'")
+        if self.kind not in RULE_KINDS:
+            raise ValueError(f"Rule {self.name}: unknown kind {self.kind}")
+        if self.aggregate not in WINDOW_AGGREGATES:
+            raise ValueError(f"Rule {self.name}: unknown aggregate {self.aggregate}")
+        if self.severity not in SEVERITY_RANK:
+            raise ValueError(f"Rule {self.name}: unknown severity {self.severity}")
+        if self.window < 1:
+            raise ValueError(f"Rule {self.name}: window must be at least 1")
+        if self.clear is not None and (self.clear - self.threshold) * (1 if self.op == '>' else -1) > 0:
+            raise ValueError(f"Rule {self.name}: clear level is on the breach side of the threshold")
+
+
+class TokenBucket:
+    """At most `capacity` alerts per `period` seconds, refilled continuously"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.stamp = None
+
+    def take(self, wanted: int, now: float) -> int:
+        if self.stamp is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        granted = min(int(wanted), int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+
+class RuleEngine:
+    """Compiled rule set with per-book state, hysteresis, dedup and rate limiting"""
+
+    def __init__(self, rules: Sequence[AlertRule], sinks: Optional[List[Callable]] = None,
+                 max_alerts: Optional[float] = None, period: float = 60.0):
+        """
+        Args:
+            rules: Rules to compile
+            sinks: Callables receiving each update's list of alert dicts
+            max_alerts: Token bucket size per period across all books (None = unlimited)
+            period: Token bucket refill period in seconds
+        """
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Rule names must be unique")
+        self.rules = tuple(rules)
+        self.sinks = list(sinks or [])
+        self.limiter = TokenBucket(max_alerts, period) if max_alerts is not None else None
+
+        self.metrics = list(dict.fromkeys(rule.metric for rule in self.rules))
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+        self.metric_of = np.array([self.metric_index[r.metric] for r in self.rules], dtype=np.intp)
+        self.sign = np.array([1.0 if r.op == '>' else -1.0 for r in self.rules])
+        self.threshold = np.array([r.threshold for r in self.rules], dtype=float)
+        self.clear = np.array([r.threshold if r.clear is None else r.clear for r in self.rules],
+                              dtype=float)
+        self.renotify = np.array([np.inf if r.renotify is None else r.renotify for r in self.rules])
+        self.severity = np.array([SEVERITY_RANK[r.severity] for r in self.rules])
+        self.window = np.array([r.window if r.kind != 'threshold' else 0 for r in self.rules])
+        self.depth = int(self.window.max(initial=0)) + 1
+
+        kinds = np.array([r.kind for r in self.rules])
+        self.threshold_rules = np.flatnonzero(kinds == 'threshold')
+        self.rate_rules = np.flatnonzero(kinds == 'rate')
+        # Window rules sharing (window, aggregate) reduce the history once
+        groups: Dict[tuple, List[int]] = {}
+        for i in np.flatnonzero(kinds == 'window'):
+            groups.setdefault((self.rules[i].window, self.rules[i].aggregate), []).append(i)
+        self.window_groups = [(w, WINDOW_AGGREGATES[agg], np.array(idx))
+                              for (w, agg), idx in groups.items()]
+
+        self.books: Dict[object, int] = {}
+        self.book_ids: List[object] = []
+        n_rules, n_metrics = len(self.rules), len(self.metrics)
+        self.history = np.full((self.depth, 0, n_metrics), np.nan)
+        self.active = np.zeros((0, n_rules), dtype=bool)
+        self.last_sent = np.full((0, n_rules), np.nan)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.pending = 0            # Due alerts held back by the rate limit
+
+    def _grow(self, n_books: int):
+        """Extend the per-book state to n_books rows"""
+        extra = n_books - len(self.counts)
+        n_rules, n_metrics = len(self.rules), len(self.metrics)
+        self.history = np.concatenate(
+            [self.history, np.full((self.depth, extra, n_metrics), np.nan)], axis=1)
+        self.active = np.vstack([self.active, np.zeros((extra, n_rules), dtype=bool)])
+        self.last_sent = np.vstack([self.last_sent, np.full((extra, n_rules), np.nan)])
+        self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+
+    def _rows(self, books: Sequence) -> np.ndarray:
+        new = [book for book in dict.fromkeys(books) if book not in self.books]
+        if new:
+            for book in new:
+                self.books[book] = len(self.book_ids)
+                self.book_ids.append(book)
+            self._grow(len(self.book_ids))
+        return np.array([self.books[book] for book in books], dtype=np.intp)
+
+    def _signals(self, rows: np.ndarray) -> np.ndarray:
+        """(len(rows) x n_rules) signal matrix from the history ring"""
+        signal = np.full((len(rows), len(self.rules)), np.nan)
+        latest = (self.counts[rows] - 1) % self.depth
+        current = self.history[latest, rows]                          # (books, metrics)
+        signal[:, self.threshold_rules] = current[:, self.metric_of[self.threshold_rules]]
+
+        if len(self.rate_rules):
+            rules = self.rate_rules
+            lag = self.window[rules]
+            slots = (self.counts[rows, None] - 1 - lag[None, :]) % self.depth
+            base = self.history[slots, rows[:, None], self.metric_of[rules][None, :]]
+            base = np.where(self.counts[rows, None] > lag[None, :], base, np.nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                signal[:, rules] = (current[:, self.metric_of[rules]] - base) / np.abs(base)
+
+        for window, reduce, rules in self.window_groups:
+            slots = (self.counts[rows, None] - 1 - np.arange(window)[None, :]) % self.depth
+            values = self.history[slots, rows[:, None]][..., self.metric_of[rules]]
+            warm = self.counts[rows] >= window
+            signal[:, rules] = np.where(warm[:, None], reduce(values, axis=1), np.nan)
+        return signal
+
+    def update(self, metrics, now: Optional[float] = None) -> List[Dict]:
+        """
+        Record new metric values and return the alerts sent
+
+        Args:
+            metrics: Dict of metric values for one book, or a DataFrame
+                indexed by book with one column per metric; metrics without
+                rules are ignored and missing ones leave their rules unchanged
+            now: Timestamp in seconds (default time.time())
+
+        Returns:
+            Alert dicts (rule, book, type, message, recommendation, value,
+            threshold, timestamp), also passed to every sink
+        """
+        now = time.time() if now is None else now
+        frame = (pd.DataFrame([metrics], index=[DEFAULT_BOOK]) if isinstance(metrics, dict)
+                 else metrics)
+        rows = self._rows(list(frame.index))
+        values = frame.reindex(columns=self.metrics).to_numpy(dtype=float)
+
+        slot = self.counts[rows] % self.depth
+        self.history[slot, rows] = values
+        self.counts[rows] += 1
+
+        signal = self._signals(rows)
+        margin = self.sign * (signal - self.threshold)
+        recovered = self.sign * (signal - self.clear) <= 0               # NaN -> False
+        was_active = self.active[rows]
+        active = np.where(was_active, ~recovered, margin > 0)
+        # Activation and recovery both reset the dedup clock
+        changed = active != was_active
+        last_sent = np.where(changed, np.nan, self.last_sent[rows])
+        due = active & (np.isnan(last_sent) | (now - last_sent >= self.renotify))
+
+        book_idx, rule_idx = np.nonzero(due)
+        self.pending = 0
+        if self.limiter is not None and len(book_idx):
+            granted = self.limiter.take(len(book_idx), now)
+            if granted < len(book_idx):
+                # Most severe first, then largest breach
+                order = np.lexsort((-margin[book_idx, rule_idx], -self.severity[rule_idx]))
+                self.pending = len(book_idx) - granted
+                keep = np.sort(order[:granted])
+                book_idx, rule_idx = book_idx[keep], rule_idx[keep]
+        last_sent[book_idx, rule_idx] = now
+        self.active[rows] = active
+        self.last_sent[rows] = last_sent
+
+        # One slice of the alerting rows feeds every message template
+        records = frame.iloc[book_idx].to_dict('records') if len(book_idx) else []
+        alerts = [self._alert(record, self.book_ids[rows[b]], r, signal[b, r], now)
+                  for record, b, r in zip(records, book_idx.tolist(), rule_idx.tolist())]
+        if alerts:
+            for sink in self.sinks:
+                sink(alerts)
+        return alerts
+
+    def _alert(self, record: Dict, book, r: int, value: float, now: float) -> Dict:
+        rule = self.rules[r]
+        fields = {**record, 'name': rule.name, 'metric': rule.metric,
+                  'value': value, 'threshold': rule.threshold, 'window': rule.window, 'book': book}
+        return {
+            'rule': rule.name,
+            'book': book,
+            'type': rule.severity,
+            'message': rule.message.format(**fields),
+            'recommendation': rule.recommendation.format(**fields),
+            'value': float(value),
+            'threshold': rule.threshold,
+            'timestamp': now
+        }
+
+    def alerts_for(self, metrics: Dict, book=DEFAULT_BOOK, now: Optional[float] = None) -> List[Dict]:
+        """
+        Every alert currently active on one book, whether or not it was sent
+
+        Args:
+            metrics: The book's latest metrics, used for the message templates
+            book: Book id (default the single-book id used by dict updates)
+            now: Timestamp in seconds (default time.time())
+
+        Returns:
+            Alert dicts in rule order, in the same layout update() returns
+        """
+        row = self.books.get(book)
+        if row is None:
+            return []
+        now = time.time() if now is None else now
+        signal = self._signals(np.array([row], dtype=np.intp))[0]
+        return [self._alert(metrics, book, r, signal[r], now)
+                for r in np.flatnonzero(self.active[row]).tolist()]
+
+    def active_alerts(self) -> pd.DataFrame:
+        """Currently breached (book, rule) pairs"""
+        book_idx, rule_idx = np.nonzero(self.active)
+        return pd.DataFrame({
+            'book': [self.book_ids[b] for b in book_idx],
+            'rule': [self.rules[r].name for r in rule_idx],
+            'type': [self.rules[r].severity for r in rule_idx],
+            'last_sent': self.last_sent[book_idx, rule_idx]
+        })
+
+    def reset(self, books: Optional[Iterable] = None):
+        """Forget state and history for some or all books"""
+        rows = (slice(None) if books is None
+                else np.array([self.books[b] for b in books if b in self.books], dtype=np.intp))
+        self.history[:, rows] = np.nan
+        self.active[rows] = False
+        self.last_sent[rows] = np.nan
+        self.counts[rows] = 0
+
+
+# The RiskManager thresholds, with hysteresis bands so a reading hovering at
+# the limit alerts once
+RISK_MANAGER_RULES = (
+    AlertRule('concentration', 'concentration_%', '>', 95, clear=90,
+              message='CONCENTRATION: Extremely high ASST concentration'),
+    AlertRule('var', 'var_95_%', '>', 8, clear=7,
+              message='VAR: High daily value at risk'),
+    AlertRule('assignment', 'assignment_risk_score', '>', 8, clear=7,
+              message='ASSIGNMENT: Very high assignment probability')
+)
+
+
+def daily_risk_rules(thresholds: Dict[str, float], checks_per_month: int = 21) -> List[AlertRule]:
+    """
+    ASSRiskMonitor.daily_risk_check alerts as rules
+
+    Args:
+        thresholds: The monitor's risk_thresholds
+        checks_per_month: Daily checks spanned by the scaling rule
+
+    Returns:
+        Assignment-probability and hedge-ratio threshold rules matching the
+        legacy messages, plus a rate rule on concentration growth over a
+        month against max_position_scaling
+    """
+    assignment = thresholds['max_assignment_rate']
+    hedge = thresholds['min_hedge_ratio']
+    return [
+        AlertRule('assignment_probability', 'assignment_probability', '>', assignment,
+                  clear=assignment - 0.05, severity='INFO',  # This is actually desired
+                  message='High assignment probability: {value:.1%}',
+                  recommendation='Prepare capital for assignments '
+                                 '(95th percentile cash: ${assignment_cash_p95:,.0f})'),
+        AlertRule('hedge_ratio', 'hedge_ratio', '<', hedge, clear=hedge + 0.025,
+                  message='Low hedge ratio: {value:.1%}',
+                  recommendation='Increase call hedge positions'),
+        AlertRule('position_scaling', 'concentration', '>', thresholds['max_position_scaling'],
+                  kind='rate', window=checks_per_month,
+                  message='Concentration up {value:.0%} in {window} checks',
+                  recommendation='Slow position scaling to the monthly limit')
+    ]
+
+
+# Usage example
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(11)
+    n_books, n_updates = 5_000, 60
+
+    rules = [
+        AlertRule('concentration', 'concentration', '>', 0.95, clear=0.90),
+        AlertRule('var_spike', 'var_95', '>', 0.15, kind='rate', window=5, severity='CRITICAL'),
+        AlertRule('var_5d', 'var_95', '>', 0.08, kind='window', window=5, clear=0.07),
+        AlertRule('hedge_floor', 'hedge_ratio', '<', 0.25, clear=0.275, severity='INFO'),
+        AlertRule('assignment_peak', 'assignment_probability', '>', 0.9,
+                  kind='window', window=10, aggregate='max', renotify=1800)
+    ]
+    sent = []
+    engine = RuleEngine(rules, sinks=[sent.extend], max_alerts=2_000, period=3600)
+    books = [f'book_{i:05d}' for i in range(n_books)]
+
+    # Random-walk metrics hovering around the thresholds
+    level = np.column_stack([rng.uniform(0.85, 1.0, n_books), rng.uniform(0.04, 0.10, n_books),
+                             rng.uniform(0.15, 0.35, n_books), rng.uniform(0.6, 0.95, n_books)])
+    columns = ['concentration', 'var_95', 'hedge_ratio', 'assignment_probability']
+    raw_breaches = 0
+    start = time.perf_counter()
+    for step in range(n_updates):
+        level = np.clip(level * (1 + rng.normal(0, 0.02, level.shape)), 0.0, None)
+        frame = pd.DataFrame(level, index=books, columns=columns)
+        engine.update(frame, now=step * 300.0)
+        raw_breaches += int((level[:, 0] > 0.95).sum() + (level[:, 2] < 0.25).sum())
+    elapsed = time.perf_counter() - start
+
+    evaluations = n_books * n_updates * len(rules)
+    print(f"{evaluations:,} rule evaluations over {n_books:,} books in {elapsed:.2f} s "
+          f"({elapsed / n_updates * 1e3:.1f} ms per update)")
+    print(f"Threshold breaches seen by naive checks: {raw_breaches:,}; alerts sent: {len(sent):,}; "
+          f"held by the rate limit: {engine.pending:,}")
+    print(pd.Series([a['rule'] for a in sent]).value_counts().to_string())
+    print(engine.active_alerts().groupby('rule').size().to_string())
+
+    # The strategy system's risk manager runs RISK_MANAGER_RULES by default
+    from ASST_Advanced_Strategy_System import RiskManager, StrategyParameters
+
+    manager = RiskManager(StrategyParameters())
+    for _ in range(5):
+        manager.calculate_portfolio_risk(100_000, 99_000)
+    print(f"RiskManager after 5 checks at 99% concentration: {manager.risk_alerts}")
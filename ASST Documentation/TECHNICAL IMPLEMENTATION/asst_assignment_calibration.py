@@ -0,0 +1,453 @@
+"""
+ASST Assignment Model Calibration
+Fits assignment probability models to realized outcomes with k-fold and walk-forward validation
+Author: Quantitative Strategy Team
+Date: October 2025
+
+The 0.85 / 0.15 / 0.8 / 0.05 coefficients in assignment_probability are
+hand-picked. This job fits them, or a logistic model, to a history of
+short put contracts labelled with whether they were assigned, and produces
+the assignment rows of ASST_Model_Validation_Results.csv from code.
+
+- Piecewise: keeps the production functional form and its caps, floors and
+  exponent. Each branch is linear in its coefficients (intercept plus
+  moneyness slope for strike <= price, intercept plus price-ratio x time
+  slope above), so the fit is one weighted least-squares (Brier score)
+  solve over the whole history.
+- Logistic: log-odds linear in log moneyness, log moneyness per root time,
+  log time, IV and the ITM indicator, fitted by L2-regularized Newton
+  iterations.
+
+Every fit is a few passes of (rows x features) matrix products, so millions
+of contracts fit in seconds. Design matrices are built once; k-fold
+training masks rows with zero weights rather than copying them, walk-forward
+folds train on a date-sorted prefix view, and fold fits start from the
+full-history logistic fit. Folds are fitted in parallel threads, since NumPy
+releases the GIL in the matrix products.
+
+Accuracy counts a contract as predicted assigned when its probability is at
+least the threshold. ITM / OTM in the validation table use put moneyness at
+entry (strike above / at-or-below the underlying).
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from asst_strategy_core import (
+    AssignmentModelParams, COMPOUNDER_ASSIGNMENT_PARAMS, assignment_probability
+)
+
+logger = logging.getLogger(__name__)
+
+PARAMS_FILE = 'assignment_model_params.json'
+VALIDATION_FILE = 'assignment_model_validation.csv'
+VALIDATION_COLUMNS = ('Model_Component', 'Validation_Method', 'Sample_Size', 'Accuracy_ITM_Puts',
+                      'Accuracy_OTM_Puts', 'Overall_Accuracy', 'False_Positive_Rate',
+                      'False_Negative_Rate', 'Log_Loss', 'Brier_Score')
+LOGISTIC_FEATURES = ('intercept', 'log_moneyness', 'log_moneyness_per_root_time', 'log_time',
+                     'iv', 'strike_below_price')
+EPSILON = 1e-9
+BLOCK_ROWS = 1 << 15    # Rows per accumulation block in the fits
+
+
+def _history_arrays(history) -> Dict[str, np.ndarray]:
+    """Columns of a contract history as float arrays (iv_level defaults to 0)"""
+    frame = history if isinstance(history, pd.DataFrame) else pd.DataFrame(history)
+    arrays = {name: frame[name].to_numpy(dtype=float)
+              for name in ('strike', 'current_price', 'days_to_expiry', 'assigned')}
+    arrays['iv_level'] = (frame['iv_level'].to_numpy(dtype=float) if 'iv_level' in frame
+                          else np.zeros(len(frame)))
+    return arrays
+
+
+def classification_metrics(probability, assigned, put_itm, threshold: float = 0.5) -> Dict[str, float]:
+    """Accuracy, error rates and proper scores of probabilities against outcomes"""
+    p = np.clip(probability, EPSILON, 1 - EPSILON)
+    y = assigned.astype(bool)
+    predicted = p >= threshold
+    correct = predicted == y
+    positives, negatives = y.sum(), (~y).sum()
+    return {
+        'Sample_Size': int(y.size),
+        'Accuracy_ITM_Puts': float(correct[put_itm].mean()) if put_itm.any() else np.nan,
+        'Accuracy_OTM_Puts': float(correct[~put_itm].mean()) if (~put_itm).any() else np.nan,
+        'Overall_Accuracy': float(correct.mean()),
+        'False_Positive_Rate': float((predicted & ~y).sum() / negatives) if negatives else np.nan,
+        'False_Negative_Rate': float((~predicted & y).sum() / positives) if positives else np.nan,
+        'Log_Loss': float(-np.mean(np.where(y, np.log(p), np.log1p(-p)))),
+        'Brier_Score': float(np.mean((p - y) ** 2))
+    }
+
+
+@dataclass
+class LogisticAssignmentModel:
+    """Fitted logistic assignment model (coefficients on standardized features)"""
+    coefficients: np.ndarray
+    feature_mean: np.ndarray
+    feature_scale: np.ndarray
+    time_floor: float = 0.1
+
+    @staticmethod
+    def raw_features(strike, current_price, days_to_expiry, iv_level, time_floor=0.1) -> np.ndarray:
+        log_moneyness = np.log(np.divide(current_price, strike))
+        time_factor = np.maximum(time_floor, np.divide(days_to_expiry, 30))
+        return np.column_stack([
+            log_moneyness,
+            log_moneyness / np.sqrt(time_factor),
+            np.log(time_factor),
+            np.divide(iv_level, 400),
+            (np.asarray(strike) <= np.asarray(current_price)).astype(float)
+        ])
+
+    def design(self, raw: np.ndarray) -> np.ndarray:
+        standardized = (raw - self.feature_mean) / self.feature_scale
+        return np.column_stack([np.ones(len(raw)), standardized])
+
+    def probability(self, raw: np.ndarray) -> np.ndarray:
+        slopes = self.coefficients[1:] / self.feature_scale
+        intercept = self.coefficients[0] - slopes @ self.feature_mean
+        return 1 / (1 + np.exp(-(raw @ slopes + intercept)))
+
+    def predict(self, strike, current_price, days_to_expiry=27, iv_level=0.0) -> np.ndarray:
+        raw = self.raw_features(np.atleast_1d(strike), np.atleast_1d(current_price),
+                                np.atleast_1d(days_to_expiry), np.atleast_1d(iv_level),
+                                self.time_floor)
+        return self.probability(raw)
+
+    def restandardized(self, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+        """The same linear predictor expressed on another standardization"""
+        slopes = self.coefficients[1:] / self.feature_scale
+        intercept = self.coefficients[0] - slopes @ self.feature_mean
+        return np.concatenate([[intercept + slopes @ mean], slopes * scale])
+
+    def to_dict(self) -> Dict:
+        return {
+            'features': list(LOGISTIC_FEATURES),
+            'coefficients': self.coefficients.tolist(),
+            'feature_mean': self.feature_mean.tolist(),
+            'feature_scale': self.feature_scale.tolist(),
+            'time_floor': self.time_floor
+        }
+
+
+class AssignmentCalibrator:
+    """Fits and validates assignment models on realized contract outcomes"""
+
+    def __init__(self, base_params: AssignmentModelParams = COMPOUNDER_ASSIGNMENT_PARAMS,
+                 n_folds: int = 5, walk_forward_splits: int = 5, threshold: float = 0.5,
+                 l2: float = 1e-6, max_workers: int = 4, seed: int = 0):
+        """
+        Args:
+            base_params: Production coefficients; the piecewise fit keeps its
+                caps, floors, exponent and time floor and refits the rest
+            n_folds: K-fold cross-validation folds
+            walk_forward_splits: Expanding-window out-of-sample periods
+            threshold: Probability at or above which a contract counts as
+                predicted assigned
+            l2: Ridge penalty for both fits
+            max_workers: Threads fitting folds in parallel
+        """
+        self.base_params = base_params
+        self.n_folds = n_folds
+        self.walk_forward_splits = walk_forward_splits
+        self.threshold = threshold
+        self.l2 = l2
+        self.max_workers = max_workers
+        self.seed = seed
+
+    def prepare(self, history) -> Dict[str, np.ndarray]:
+        """
+        Contract arrays plus both design matrices, built once per history
+
+        Rows are put in trade_date order (when present) so walk-forward
+        windows are plain slices.
+        """
+        frame = history if isinstance(history, pd.DataFrame) else pd.DataFrame(history)
+        data = _history_arrays(frame)
+        if 'trade_date' in frame:
+            order = np.argsort(frame['trade_date'].to_numpy(), kind='stable')
+            data = {name: values[order] for name, values in data.items()}
+        data['put_itm'] = data['strike'] > data['current_price']
+        data['piecewise_design'] = self._piecewise_design(data)
+        data['logistic_features'] = LogisticAssignmentModel.raw_features(
+            data['strike'], data['current_price'], data['days_to_expiry'], data['iv_level'],
+            self.base_params.time_floor)
+        return data
+
+    # -- piecewise model ---------------------------------------------------
+
+    def _piecewise_columns(self):
+        """Coefficients the piecewise fit solves for (vol_weight only if the base form uses IV)"""
+        names = ['itm_base', 'itm_boost', 'vol_weight', 'otm_base', 'otm_factor']
+        if not self.base_params.vol_weight:
+            names.remove('vol_weight')
+        return names
+
+    def _piecewise_design(self, data: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Block design: [below, below*depth, below*iv] for strike <= price, [above, above*ratio*time]
+
+        The IV column is left out when base_params.vol_weight is 0, since
+        assignment_probability then ignores IV and a fitted IV slope would
+        be dropped, biasing the intercept it was fitted against.
+        """
+        bp = self.base_params
+        strike, price = data['strike'], data['current_price']
+        below = (strike <= price).astype(float)
+        above = 1.0 - below
+        depth = (price - strike) / price
+        ratio = (price / strike) ** bp.otm_exponent
+        time_factor = np.maximum(bp.time_floor, data['days_to_expiry'] / 30)
+        columns = {'itm_base': below, 'itm_boost': below * depth,
+                   'vol_weight': below * data['iv_level'] / 400,
+                   'otm_base': above, 'otm_factor': above * ratio * time_factor}
+        return np.column_stack([columns[name] for name in self._piecewise_columns()])
+
+    def fit_piecewise(self, data: Dict[str, np.ndarray], weights=None,
+                      rows=slice(None), initial=None) -> AssignmentModelParams:
+        """Weighted least-squares fit of the piecewise coefficients"""
+        X = data['piecewise_design'][rows]
+        y = data['assigned'][rows]
+        w = np.ones(len(X)) if weights is None else weights[rows]
+        gram = np.zeros((X.shape[1], X.shape[1]))
+        moments = np.zeros(X.shape[1])
+        for start in range(0, len(X), BLOCK_ROWS):
+            Xw = X[start:start + BLOCK_ROWS].T * w[start:start + BLOCK_ROWS]
+            gram += Xw @ X[start:start + BLOCK_ROWS]
+            moments += Xw @ y[start:start + BLOCK_ROWS]
+        beta = np.linalg.solve(gram + self.l2 * np.eye(X.shape[1]), moments)
+        return replace(self.base_params, **dict(zip(self._piecewise_columns(), map(float, beta))))
+
+    @staticmethod
+    def predict_piecewise(params: AssignmentModelParams, data, rows=slice(None)) -> np.ndarray:
+        return np.clip(assignment_probability(data['strike'][rows], data['current_price'][rows],
+                                              data['days_to_expiry'][rows], data['iv_level'][rows],
+                                              params), 0.0, 1.0)
+
+    # -- logistic model ----------------------------------------------------
+
+    def fit_logistic(self, data: Dict[str, np.ndarray], weights=None, rows=slice(None),
+                     initial: Optional[LogisticAssignmentModel] = None, max_iter: int = 25,
+                     tol: float = 1e-7) -> LogisticAssignmentModel:
+        """
+        L2-regularized Newton (IRLS) fit on standardized features
+
+        Args:
+            initial: Warm start (e.g. the full-history fit when fitting folds),
+                which cuts the Newton passes to two or three
+        """
+        raw = data['logistic_features'][rows]
+        w = np.ones(len(raw)) if weights is None else weights[rows]
+        total = w.sum()
+        mean = (w @ raw) / total
+        scale = np.sqrt(np.maximum(np.einsum('i,ij,ij->j', w, raw, raw) / total - mean ** 2, 0.0))
+        scale[scale < EPSILON] = 1.0
+
+        model = LogisticAssignmentModel(np.zeros(raw.shape[1] + 1), mean, scale,
+                                        self.base_params.time_floor)
+        if initial is not None:
+            model.coefficients = initial.restandardized(mean, scale)
+        y = data['assigned'][rows]
+        ridge = self.l2 * total * np.eye(raw.shape[1] + 1)
+        ridge[0, 0] = 0.0
+        beta = model.coefficients
+        for iteration in range(max_iter):
+            gradient, hessian = self._newton_terms(model, raw, y, w, beta)
+            step = np.linalg.solve(hessian + ridge, gradient + ridge @ beta)
+            beta = beta - step
+            if np.max(np.abs(step)) < tol:
+                break
+        model.coefficients = beta
+        return model
+
+    @staticmethod
+    def _newton_terms(model, raw, y, w, beta, block: int = BLOCK_ROWS):
+        """
+        Log-loss gradient and Hessian, accumulated over row blocks so the
+        standardized design and per-row temporaries stay cache-sized however
+        long the history is
+        """
+        gradient = np.zeros(len(beta))
+        hessian = np.zeros((len(beta), len(beta)))
+        for start in range(0, len(raw), block):
+            Xb, wb = model.design(raw[start:start + block]), w[start:start + block]
+            p = 1 / (1 + np.exp(-(Xb @ beta)))
+            gradient += Xb.T @ (wb * (p - y[start:start + block]))
+            hessian += (Xb.T * (wb * p * (1 - p))) @ Xb
+        return gradient, hessian
+
+    @staticmethod
+    def predict_logistic(model: LogisticAssignmentModel, data, rows=slice(None)) -> np.ndarray:
+        return model.probability(data['logistic_features'][rows])
+
+    # -- validation ---------------------------------------------------------
+
+    def _models(self):
+        return {
+            'hand_picked': (lambda data, **kwargs: self.base_params, self.predict_piecewise),
+            'piecewise': (self.fit_piecewise, self.predict_piecewise),
+            'logistic': (self.fit_logistic, self.predict_logistic)
+        }
+
+    def _map(self, function, items):
+        if self.max_workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                return list(pool.map(function, items))
+        return [function(item) for item in items]
+
+    def cross_validate(self, data: Dict[str, np.ndarray],
+                       initial: Optional[LogisticAssignmentModel] = None) -> Dict[str, np.ndarray]:
+        """Out-of-sample k-fold probabilities per model (each row predicted once)"""
+        folds = np.random.default_rng(self.seed).integers(0, self.n_folds, len(data['assigned']))
+
+        def run(task):
+            name, k = task
+            fit, predict = self._models()[name]
+            test = folds == k
+            fitted = fit(data, weights=(~test).astype(float), initial=initial)
+            return name, test, predict(fitted, data, test)
+
+        oos = {name: np.empty(len(folds)) for name in self._models()}
+        for name, test, probability in self._map(run, [(name, k) for name in oos
+                                                       for k in range(self.n_folds)]):
+            oos[name][test] = probability
+        return oos
+
+    def walk_forward(self, data: Dict[str, np.ndarray],
+                     initial: Optional[LogisticAssignmentModel] = None):
+        """
+        Expanding-window out-of-sample probabilities
+
+        Rows are in date order (see prepare); the first of walk_forward_splits
+        + 1 equal blocks is only ever trained on.
+
+        Returns:
+            (slice of tested rows, {model: probabilities})
+        """
+        edges = np.linspace(0, len(data['assigned']), self.walk_forward_splits + 2).astype(int)
+
+        def run(task):
+            name, i = task
+            fit, predict = self._models()[name]
+            fitted = fit(data, rows=slice(0, edges[i]), initial=initial)
+            return name, i, predict(fitted, data, slice(edges[i], edges[i + 1]))
+
+        tested = slice(edges[1], edges[-1])
+        oos = {name: np.empty(edges[-1] - edges[1]) for name in self._models()}
+        for name, i, probability in self._map(run, [(name, i) for name in oos
+                                                    for i in range(1, len(edges) - 1)]):
+            oos[name][edges[i] - edges[1]:edges[i + 1] - edges[1]] = probability
+        return tested, oos
+
+    def validation_table(self, data: Dict[str, np.ndarray],
+                         initial: Optional[LogisticAssignmentModel] = None) -> pd.DataFrame:
+        """Validation rows (ASST_Model_Validation_Results columns) for every model and method"""
+        rows = []
+        for name, probability in self.cross_validate(data, initial).items():
+            rows.append(self._row(name, f'{self.n_folds}-Fold Cross-Validation', probability,
+                                  data['assigned'], data['put_itm']))
+        tested, walk = self.walk_forward(data, initial)
+        for name, probability in walk.items():
+            rows.append(self._row(name, f'Walk-Forward ({self.walk_forward_splits} periods)',
+                                  probability, data['assigned'][tested], data['put_itm'][tested]))
+        return pd.DataFrame(rows, columns=list(VALIDATION_COLUMNS))
+
+    def _row(self, name, method, probability, assigned, put_itm) -> Dict:
+        labels = {'hand_picked': 'Assignment Probability Model (hand-picked)',
+                  'piecewise': 'Assignment Probability Model (fitted piecewise)',
+                  'logistic': 'Assignment Probability Model (logistic)'}
+        return {'Model_Component': labels[name], 'Validation_Method': method,
+                **classification_metrics(probability, assigned, put_itm, self.threshold)}
+
+    def run(self, history, output_dir: str) -> Dict:
+        """
+        Fit both models on the full history, validate, and write the results
+
+        Returns:
+            Dict with fitted 'piecewise' params, 'logistic' model and 'validation' table
+        """
+        data = self.prepare(history)
+        piecewise, logistic = self._map(lambda fit: fit(data), [self.fit_piecewise, self.fit_logistic])
+        validation = self.validation_table(data, initial=logistic)
+
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, PARAMS_FILE), 'w') as handle:
+            json.dump({'contracts': int(len(data['assigned'])),
+                       'threshold': self.threshold,
+                       'piecewise': asdict(piecewise),
+                       'logistic': logistic.to_dict()}, handle, indent=2)
+        formatted = validation.copy()
+        for column in VALIDATION_COLUMNS[3:8]:
+            formatted[column] = (formatted[column] * 100).map('{:.1f}%'.format)
+        formatted[['Log_Loss', 'Brier_Score']] = formatted[['Log_Loss', 'Brier_Score']].round(4)
+        formatted.to_csv(os.path.join(output_dir, VALIDATION_FILE), index=False)
+        logger.info(f"Calibration written to {output_dir}")
+        return {'piecewise': piecewise, 'logistic': logistic, 'validation': validation}
+
+
+def load_fitted_params(path: str) -> AssignmentModelParams:
+    """Fitted piecewise coefficients from a calibration output directory or params file"""
+    if os.path.isdir(path):
+        path = os.path.join(path, PARAMS_FILE)
+    with open(path) as handle:
+        return AssignmentModelParams(**json.load(handle)['piecewise'])
+
+
+def simulate_assignment_history(n_contracts: int, n_days: int = 1000, spot: float = 2.40,
+                                sigma: float = 4.25, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic realized history for demos: short puts written on a
+    mean-reverting daily price series, each assigned when its own lognormal
+    terminal price (at the quoted IV) closes below the strike
+    """
+    rng = np.random.default_rng(seed)
+    daily = sigma / np.sqrt(252)
+    log_price = np.zeros(n_days)
+    shocks = rng.normal(0, daily, n_days)
+    for t in range(1, n_days):
+        log_price[t] = 0.97 * log_price[t - 1] + shocks[t]
+
+    day = np.sort(rng.integers(0, n_days, n_contracts))
+    dte = rng.integers(1, 61, n_contracts)
+    current = spot * np.exp(log_price[day])
+    strike = np.maximum(np.round(current * np.exp(rng.uniform(-0.6, 0.6, n_contracts)) * 2) / 2, 0.5)
+    iv_level = 425 * np.exp(rng.normal(0, 0.2, n_contracts))
+    vol_t = iv_level / 100 * np.sqrt(dte / 365)
+    terminal = current * np.exp(-0.5 * vol_t ** 2 + vol_t * rng.standard_normal(n_contracts))
+    return pd.DataFrame({
+        'trade_date': np.datetime64('2021-01-04') + day.astype('timedelta64[D]'),
+        'strike': strike,
+        'current_price': current,
+        'days_to_expiry': dte,
+        'iv_level': iv_level,
+        'assigned': (terminal < strike).astype(np.int8)
+    })
+
+
+# Usage example
+if __name__ == "__main__":
+    import tempfile
+
+    history = simulate_assignment_history(2_000_000)
+    calibrator = AssignmentCalibrator()
+
+    start = time.perf_counter()
+    output_dir = tempfile.mkdtemp(prefix='asst_calibration_')
+    result = calibrator.run(history, output_dir)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(history):,} contracts calibrated and validated in {elapsed:.1f} s -> {output_dir}")
+    fitted = result['piecewise']
+    print(f"Piecewise fit: itm_base {fitted.itm_base:.3f}, itm_boost {fitted.itm_boost:.3f}, "
+          f"otm_base {fitted.otm_base:.3f}, otm_factor {fitted.otm_factor:.3f}")
+    table = result['validation'].set_index(['Model_Component', 'Validation_Method'])
+    print(table.drop(columns='Sample_Size').round(3).to_string())
+    print(f"Reloaded params match: {load_fitted_params(output_dir) == fitted}")
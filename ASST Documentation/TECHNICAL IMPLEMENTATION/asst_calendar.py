@@ -0,0 +1,355 @@
+"""
+ASST Expiry Calendar
+Trading-day and calendar-day indexes with precomputed DTE for listed expiries
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Day counts are resolved once when the calendar is built instead of on every
+pricing, assignment or roll call:
+
+- Every day in [start, end] gets an offset from start, a trading-day flag
+  (weekends and NYSE holidays excluded), a running session count and its
+  preceding trading day. Any DTE is then a difference of two array lookups.
+- Listed expiries are every weekly Friday and the monthly third Friday,
+  moved to the preceding session when the exchange is closed (Good Friday,
+  Juneteenth or July 4th on a Friday).
+- Calendar DTE, trading DTE and both year fractions against the calendar's
+  as_of date are stored per listed expiry.
+
+Expiry labels found in the suite ("Nov-15-2025", "Jan 16", "Nov-21") and ISO
+dates are parsed in one pass over the unique labels. Labels without a year
+resolve to the next occurrence on or after as_of. Labels that fall on a
+closed day resolve to the preceding session.
+"""
+
+import time
+import logging
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_DAYS_PER_YEAR = 365
+TRADING_DAYS_PER_YEAR = 252
+FRIDAY = 4
+
+MONTHS = {name: i + 1 for i, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'])}
+EXPIRY_LABEL = (r'^\s*(?:(?P<iso>\d{4}-\d{2}-\d{2})|'
+                r'(?P<month>[A-Za-z]{3})[a-z]*[-\s]+(?P<day>\d{1,2})(?:[-\s,]+(?P<year>\d{4}))?)\s*$')
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    """Monday = 0 for datetime64[D] values (1970-01-01 was a Thursday)"""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> np.datetime64:
+    """n-th given weekday of a month; n = -1 is the last one"""
+    if n > 0:
+        first = np.datetime64(f'{year:04d}-{month:02d}-01')
+        return first + int((weekday - _weekday(first)) % 7 + 7 * (n - 1))
+    last = (np.datetime64(f'{year:04d}-{month:02d}', 'M') + 1).astype('datetime64[D]') - 1
+    return last - int((_weekday(last) - weekday) % 7)
+
+
+def _easter(year: int) -> np.datetime64:
+    """Gregorian Easter Sunday (anonymous computus)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return np.datetime64(date(year, month, day + 1))
+
+
+def _observed(day: np.datetime64, saturday_to_friday: bool = True) -> Optional[np.datetime64]:
+    """Weekend fixed-date holidays move to Friday (Saturday) or Monday (Sunday)"""
+    weekday = _weekday(day)
+    if weekday == 5:
+        return day - 1 if saturday_to_friday else None
+    if weekday == 6:
+        return day + 1
+    return day
+
+
+def nyse_holidays(first_year: int, last_year: int) -> np.ndarray:
+    """
+    Full-day NYSE closures by rule
+
+    Args:
+        first_year: First calendar year
+        last_year: Last calendar year (inclusive)
+
+    Returns:
+        Sorted datetime64[D] array; one-off closures are passed to the
+        calendar separately
+    """
+    holidays = []
+    for year in range(first_year, last_year + 1):
+        # New Year's Day on a Saturday is not observed on the prior Friday
+        holidays.append(_observed(np.datetime64(f'{year:04d}-01-01'), saturday_to_friday=False))
+        holidays.append(_nth_weekday(year, 1, 0, 3))          # Martin Luther King Jr. Day
+        holidays.append(_nth_weekday(year, 2, 0, 3))          # Washington's Birthday
+        holidays.append(_easter(year) - 2)                    # Good Friday
+        holidays.append(_nth_weekday(year, 5, 0, -1))         # Memorial Day
+        if year >= 2022:
+            holidays.append(_observed(np.datetime64(f'{year:04d}-06-19')))
+        holidays.append(_observed(np.datetime64(f'{year:04d}-07-04')))
+        holidays.append(_nth_weekday(year, 9, 0, 1))          # Labor Day
+        holidays.append(_nth_weekday(year, 11, 3, 4))         # Thanksgiving
+        holidays.append(_observed(np.datetime64(f'{year:04d}-12-25')))
+    return np.unique(np.array([h for h in holidays if h is not None], dtype='datetime64[D]'))
+
+
+def _as_days(values) -> np.ndarray:
+    """Dates, strings, Timestamps or datetime64 values as datetime64[D]"""
+    if isinstance(values, (pd.Series, pd.Index)):
+        values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[D]')
+    return pd.to_datetime(values.ravel()).to_numpy(dtype='datetime64[D]').reshape(values.shape)
+
+
+class ExpiryCalendar:
+    """Precomputed day indexes and DTE for every listed expiry in a date range"""
+
+    def __init__(self, as_of=None, start=None, end=None,
+                 holidays: Optional[Iterable] = None, weeklies: bool = True):
+        """
+        Args:
+            as_of: Valuation date for the precomputed DTE arrays (default today)
+            start: First indexed day (default one year before as_of)
+            end: Last indexed day (default three years after as_of, LEAPS range)
+            holidays: Extra closures on top of the NYSE rules
+            weeklies: List every Friday, not just the monthly third Fridays
+        """
+        self.as_of = _as_days(as_of if as_of is not None else date.today())[()]
+        self.start = _as_days(start)[()] if start is not None else self.as_of - 366
+        self.end = _as_days(end)[()] if end is not None else self.as_of + 3 * 366
+        if not self.start <= self.as_of <= self.end:
+            raise ValueError("as_of must lie inside [start, end]")
+
+        self.days = np.arange(self.start, self.end + 1, dtype='datetime64[D]')
+        first_year = int(str(self.start)[:4])
+        last_year = int(str(self.end)[:4])
+        closed = nyse_holidays(first_year, last_year)
+        if holidays is not None:
+            closed = np.union1d(closed, _as_days(list(holidays)))
+        self.holidays = closed[(closed >= self.start) & (closed <= self.end)]
+
+        self.is_trading = (_weekday(self.days) < 5) & ~np.isin(self.days, self.holidays)
+        # sessions[i]: trading days in [start, days[i]]
+        self.sessions = np.cumsum(self.is_trading, dtype=np.int32)
+        # previous_session[i]: offset of the last trading day on or before days[i]
+        trading_offsets = np.flatnonzero(self.is_trading)
+        if len(trading_offsets) == 0:
+            raise ValueError("Calendar range contains no trading days")
+        self.previous_session = trading_offsets[np.maximum(self.sessions - 1, 0)].astype(np.int32)
+        self._as_of_offset = int((self.as_of - self.start).astype(np.int64))
+
+        self.expiries, self.monthly = self._listed_expiries(weeklies)
+        self.expiry_offsets = self.offsets(self.expiries)
+        self.calendar_dte = self.expiry_offsets - self._as_of_offset
+        self.trading_dte = self.sessions[self.expiry_offsets] - self.sessions[self._as_of_offset]
+        self.year_fraction_calendar = self.calendar_dte / CALENDAR_DAYS_PER_YEAR
+        self.year_fraction_trading = self.trading_dte / TRADING_DAYS_PER_YEAR
+        self._labels = {}
+        self._label_dte = {}
+
+    def _listed_expiries(self, weeklies: bool):
+        """Weekly and monthly expiry dates, each moved to its preceding session"""
+        fridays = self.days[_weekday(self.days) == FRIDAY]
+        day_of_month = (fridays - fridays.astype('datetime64[M]')).astype(np.int64)
+        third = (day_of_month >= 14) & (day_of_month < 21)
+        if not weeklies:
+            fridays, third = fridays[third], third[third]
+        offsets = self.offsets(fridays)
+        # A closed Friday before the first indexed session has no expiry
+        keep = self.sessions[offsets] > 0
+        return self.days[self.previous_session[offsets[keep]]], third[keep]
+
+    def offsets(self, dates) -> np.ndarray:
+        """Index into the calendar's day arrays; raises outside [start, end]"""
+        offsets = (_as_days(dates) - self.start).astype(np.int64)
+        if offsets.size and (offsets.min() < 0 or offsets.max() >= len(self.days)):
+            raise ValueError(f"Dates outside the calendar range {self.start} to {self.end}")
+        return offsets
+
+    def is_trading_day(self, dates) -> np.ndarray:
+        return self.is_trading[self.offsets(dates)]
+
+    def previous_trading_day(self, dates) -> np.ndarray:
+        """The date itself when it is a session, else the last session before it"""
+        return self.days[self.previous_session[self.offsets(dates)]]
+
+    def calendar_days(self, expiry, as_of=None) -> np.ndarray:
+        """Calendar days from as_of (default the calendar's) to expiry"""
+        start = self._as_of_offset if as_of is None else self.offsets(as_of)
+        return self.offsets(expiry) - start
+
+    def trading_days(self, expiry, as_of=None) -> np.ndarray:
+        """Sessions after as_of up to and including expiry"""
+        start = self._as_of_offset if as_of is None else self.offsets(as_of)
+        return self.sessions[self.offsets(expiry)] - self.sessions[start]
+
+    def year_fraction(self, expiry, as_of=None, basis: str = 'calendar') -> np.ndarray:
+        """
+        Time to expiry in years
+
+        Args:
+            expiry: Expiry dates
+            as_of: Valuation dates (default the calendar's as_of)
+            basis: 'calendar' (days / 365) or 'trading' (sessions / 252)
+        """
+        if basis == 'calendar':
+            return self.calendar_days(expiry, as_of) / CALENDAR_DAYS_PER_YEAR
+        if basis == 'trading':
+            return self.trading_days(expiry, as_of) / TRADING_DAYS_PER_YEAR
+        raise ValueError(f"Unknown day-count basis: {basis}")
+
+    def next_expiry(self, as_of=None, monthly: bool = False) -> np.datetime64:
+        """First listed expiry on or after as_of"""
+        offset = self._as_of_offset if as_of is None else int(self.offsets(as_of))
+        candidates = self.expiry_offsets if not monthly else self.expiry_offsets[self.monthly]
+        i = np.searchsorted(candidates, offset)
+        if i == len(candidates):
+            raise ValueError("No listed expiry left in the calendar range")
+        return self.days[candidates[i]]
+
+    def table(self, monthly: bool = False) -> pd.DataFrame:
+        """Listed expiries with their precomputed DTE and year fractions"""
+        keep = self.monthly if monthly else slice(None)
+        return pd.DataFrame({
+            'expiry': self.expiries[keep],
+            'monthly': self.monthly[keep],
+            'calendar_dte': self.calendar_dte[keep],
+            'trading_dte': self.trading_dte[keep],
+            'year_fraction': self.year_fraction_calendar[keep],
+            'trading_year_fraction': self.year_fraction_trading[keep]
+        })
+
+    def parse(self, labels) -> np.ndarray:
+        """
+        Resolve expiry labels to expiry dates
+
+        Args:
+            labels: Strings such as "Nov-15-2025", "Jan 16", "Nov-21" or
+                "2026-01-16"
+
+        Returns:
+            datetime64[D] array; year-less labels take the next occurrence on
+            or after as_of, and closed days move to the preceding session
+        """
+        labels = pd.Series(np.asarray(labels, dtype=object).ravel()).astype(str)
+        unique = pd.unique(labels)
+        missing = [label for label in unique if label not in self._labels]
+        if missing:
+            self._labels.update(zip(missing, self._resolve(missing)))
+        return labels.map(self._labels).to_numpy(dtype='datetime64[D]')
+
+    def _resolve(self, labels) -> np.ndarray:
+        parts = pd.Series(labels).str.extract(EXPIRY_LABEL)
+        month = parts['month'].str.lower().map(MONTHS)
+        bad = parts['iso'].isna() & month.isna()
+        if bad.any():
+            raise ValueError(f"Unrecognized expiry labels: {list(pd.Series(labels)[bad])}")
+
+        as_of_year = int(str(self.as_of)[:4])
+        year = parts['year'].astype(float).fillna(as_of_year).astype(int)
+        stamps = pd.to_datetime(pd.DataFrame({'year': year, 'month': month.fillna(1).astype(int),
+                                              'day': parts['day'].fillna(1).astype(int)}),
+                                errors='coerce')
+        dates = stamps.to_numpy(dtype='datetime64[D]')
+        # Year-less labels already passed this year roll into next year
+        rolled = parts['year'].isna().to_numpy() & parts['iso'].isna().to_numpy() & (dates < self.as_of)
+        if rolled.any():
+            dates[rolled] = pd.to_datetime(pd.DataFrame({
+                'year': year[rolled] + 1, 'month': month[rolled].astype(int),
+                'day': parts['day'][rolled].astype(int)})).to_numpy(dtype='datetime64[D]')
+        iso = parts['iso'].notna().to_numpy()
+        if iso.any():
+            dates[iso] = _as_days(parts['iso'][iso].to_numpy())
+        if np.isnat(dates).any():
+            raise ValueError(f"Invalid expiry dates: {list(np.asarray(labels)[np.isnat(dates)])}")
+        return self.previous_trading_day(dates)
+
+    def days_to_expiry(self, label) -> int:
+        """Calendar DTE for one expiry label, memoized for per-order paths"""
+        dte = self._label_dte.get(label)
+        if dte is None:
+            dte = self._label_dte[label] = int(self.calendar_days(self.parse([label]))[0])
+        return dte
+
+    def annotate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fill expiry and days_to_expiry from an 'expiry' or 'expiration' column
+
+        Frames that already carry days_to_expiry, or have neither column,
+        are returned unchanged.
+        """
+        if 'days_to_expiry' in frame or frame.empty:
+            return frame
+        source = 'expiry' if 'expiry' in frame else 'expiration' if 'expiration' in frame else None
+        if source is None:
+            return frame
+        values = frame[source]
+        expiry = (_as_days(values) if pd.api.types.is_datetime64_any_dtype(values)
+                  else self.parse(values.to_numpy()))
+        return frame.assign(expiry=expiry, days_to_expiry=self.calendar_days(expiry))
+
+
+# Usage example
+if __name__ == "__main__":
+    start = time.perf_counter()
+    calendar = ExpiryCalendar(as_of='2025-10-17')
+    build = (time.perf_counter() - start) * 1e3
+    print(f"{len(calendar.days)} days, {int(calendar.is_trading.sum())} sessions, "
+          f"{len(calendar.expiries)} listed expiries built in {build:.2f} ms")
+    print(f"Holidays 2025-2026: {[str(h) for h in calendar.holidays if '2025' <= str(h) < '2027']}")
+
+    labels = np.array(['Nov-15-2025', 'Jan 16', 'Nov-21', 'Oct-24', 'Dec 19', '2026-04-03'])
+    expiry = calendar.parse(labels)
+    print(pd.DataFrame({
+        'label': labels,
+        'expiry': expiry,
+        'calendar_dte': calendar.calendar_days(expiry),
+        'trading_dte': calendar.trading_days(expiry),
+        'year_fraction': calendar.year_fraction(expiry).round(4)
+    }).to_string(index=False))
+    print(calendar.table(monthly=True).head(8).to_string(index=False))
+
+    # Lookup cost against per-call date arithmetic for a large book
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    book = calendar.expiries[rng.integers(0, len(calendar.expiries), n)]
+    start = time.perf_counter()
+    dte = calendar.trading_days(book)
+    indexed = (time.perf_counter() - start) * 1e3
+    sample = book[:20_000]
+    busdays = np.busdaycalendar(holidays=calendar.holidays)
+    start = time.perf_counter()
+    # busday_count counts [begin, end); shifting both by a day gives (as_of, expiry]
+    looped = [int(np.busday_count(calendar.as_of + 1, d + 1, busdaycal=busdays)) for d in sample]
+    per_call = (time.perf_counter() - start) * n / len(sample)
+    print(f"Trading DTE for {n:,} legs: indexed {indexed:.1f} ms, "
+          f"per-call busday_count ~{per_call:.1f} s, match {np.array_equal(dte[:20_000], looped)}")
+
+    # Suite positions with resolved expiries feed the cash-flow forecast
+    from asst_datasets import SuiteLoader
+    from asst_assignment_forecast import AssignmentCashFlowForecaster
+    from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
+    logging.disable(logging.INFO)
+    positions = SuiteLoader().positions(calendar=calendar)
+    print(pd.DataFrame(positions)[['strike', 'quantity', 'expiration', 'expiry',
+                                   'days_to_expiry']].to_string(index=False))
+    forecast = AssignmentCashFlowForecaster(ASSTPremiumCompounder(), calendar=calendar).forecast(positions)
+    print(forecast['table'][['contracts', 'expected_cash', 'cash_p95']].to_string())
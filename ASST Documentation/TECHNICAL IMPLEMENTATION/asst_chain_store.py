@@ -0,0 +1,412 @@
+"""
+ASST Chain Snapshot Store
+Append-only, compressed, time-indexed columnar storage for option chain quotes
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Calibrating anything beyond the iv_environment = 425 constant needs years
+of ASST quotes on local disk. Snapshots are appended in time order and cut
+into chunks of chunk_rows rows. Each column of a chunk is compressed
+separately:
+
+- Integer and datetime columns are delta-encoded (a snapshot's repeated
+  timestamps and expiries become runs of zeros)
+- Every column is byte-shuffled (all first bytes, then all second bytes...)
+  before zlib, which is what makes float quotes compressible
+
+Chunks go into one append-only data file. A fixed-width record per chunk
+in the index file holds its time range, expiry range and column byte
+offsets, so the index is a sparse time index: a range seek is a binary
+search over chunk bounds, then one within each edge chunk. Reads
+memory-map the data file and decompress only the requested columns of the
+overlapping chunks (e.g. bid/ask for one expiry never touches strike or
+volume bytes). With codec='none' the columns are stored raw and read
+zero-copy from the map.
+
+The index is written after the chunk bytes, so a crash can only leave
+unindexed trailing bytes, which are truncated on the next open.
+"""
+
+import os
+import json
+import mmap
+import time
+import zlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Default snapshot layout; any columns may be stored, these are what chain_at() needs
+CHAIN_COLUMNS = {
+    'timestamp': 'datetime64[ns]',
+    'expiry': 'datetime64[D]',
+    'strike': 'float64',
+    'is_call': 'bool',
+    'bid': 'float64',
+    'ask': 'float64'
+}
+CODECS = ('zlib', 'none')
+SCHEMA_FILE = 'schema.json'
+DATA_FILE = 'chunks.bin'
+INDEX_FILE = 'index.bin'
+
+
+def _storage_dtype(dtype: np.dtype) -> np.dtype:
+    """Datetimes are stored as their int64 tick counts, bools as uint8"""
+    if dtype.kind == 'M':
+        return np.dtype(np.int64)
+    if dtype.kind == 'b':
+        return np.dtype(np.uint8)
+    return dtype
+
+
+def encode_column(values: np.ndarray, codec: str, level: int = 1) -> bytes:
+    """Delta (integers), byte-shuffle and compress one column"""
+    stored = values.view(_storage_dtype(values.dtype))
+    if codec == 'none':
+        return stored.tobytes()
+    if stored.dtype.kind in 'iu' and stored.dtype.itemsize > 1:
+        stored = np.diff(stored, prepend=stored.dtype.type(0))
+    shuffled = stored.view(np.uint8).reshape(-1, stored.dtype.itemsize).T
+    return zlib.compress(np.ascontiguousarray(shuffled).tobytes(), level)
+
+
+def decode_column(buffer, dtype: np.dtype, rows: int, codec: str) -> np.ndarray:
+    """Inverse of encode_column; codec='none' returns a view of the buffer"""
+    storage = _storage_dtype(dtype)
+    if codec == 'none':
+        return np.frombuffer(buffer, dtype=storage, count=rows).view(dtype)
+    raw = np.frombuffer(zlib.decompress(buffer), dtype=np.uint8)
+    stored = np.ascontiguousarray(raw.reshape(storage.itemsize, rows).T).view(storage).ravel()
+    if storage.kind in 'iu' and storage.itemsize > 1:
+        stored = np.cumsum(stored, dtype=storage)
+    return stored.view(dtype)
+
+
+class ChainSnapshotStore:
+    """Append-only chain snapshot store with a sparse per-chunk time index"""
+
+    def __init__(self, path: str, columns: Optional[Dict[str, str]] = None,
+                 chunk_rows: int = 1 << 16, codec: str = 'zlib', level: int = 1,
+                 max_workers: int = 4):
+        """
+        Open (or create) a store
+
+        Args:
+            path: Store directory
+            columns: Column name -> dtype for a new store (default CHAIN_COLUMNS);
+                must include 'timestamp'. Ignored when the store exists.
+            chunk_rows: Rows per compressed chunk
+            codec: 'zlib' or 'none' (raw, zero-copy reads)
+            level: zlib compression level
+            max_workers: Threads compressing / decompressing columns in parallel
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        schema_path = os.path.join(path, SCHEMA_FILE)
+        if os.path.exists(schema_path):
+            with open(schema_path) as handle:
+                schema = json.load(handle)
+        else:
+            if codec not in CODECS:
+                raise ValueError(f"Unknown codec '{codec}', expected one of {CODECS}")
+            schema = {'columns': dict(columns or CHAIN_COLUMNS), 'chunk_rows': chunk_rows,
+                      'codec': codec, 'level': level}
+            if 'timestamp' not in schema['columns']:
+                raise ValueError("Store schema needs a 'timestamp' column")
+            with open(schema_path, 'w') as handle:
+                json.dump(schema, handle, indent=2)
+
+        self.columns = {name: np.dtype(dtype) for name, dtype in schema['columns'].items()}
+        self.names = list(self.columns)
+        self.chunk_rows = schema['chunk_rows']
+        self.codec = schema['codec']
+        self.level = schema['level']
+        self.record_dtype = np.dtype([
+            ('t_min', 'i8'), ('t_max', 'i8'), ('rows', 'i8'),
+            ('expiry_min', 'i8'), ('expiry_max', 'i8'),
+            ('offsets', 'i8', (len(self.names) + 1,))
+        ])
+        self._pool = ThreadPoolExecutor(max_workers) if max_workers > 1 else None
+        self._buffer: Dict[str, List[np.ndarray]] = {name: [] for name in self.names}
+        self._buffered = 0
+        self._map = None
+        self._recover()
+
+    # -- writing ----------------------------------------------------------
+
+    def _recover(self):
+        """Load the index and drop any chunk bytes written after the last record"""
+        index_path = os.path.join(self.path, INDEX_FILE)
+        data_path = os.path.join(self.path, DATA_FILE)
+        if os.path.exists(index_path):
+            size = os.path.getsize(index_path)
+            complete = size - size % self.record_dtype.itemsize
+            self.index = np.fromfile(index_path, dtype=self.record_dtype,
+                                     count=complete // self.record_dtype.itemsize)
+            if complete != size:
+                with open(index_path, 'r+b') as handle:
+                    handle.truncate(complete)
+        else:
+            self.index = np.zeros(0, dtype=self.record_dtype)
+        end = int(self.index['offsets'][-1, -1]) if len(self.index) else 0
+        with open(data_path, 'a+b') as handle:
+            if handle.seek(0, os.SEEK_END) > end:
+                logger.info(f"Truncating {handle.tell() - end} unindexed bytes")
+                handle.truncate(end)
+
+    def append(self, snapshot):
+        """
+        Buffer rows (DataFrame or dict of arrays) and flush full chunks
+
+        Timestamps must not go backwards across appends.
+        """
+        arrays = {name: np.asarray(snapshot[name], dtype=dtype) for name, dtype in self.columns.items()}
+        ts = arrays['timestamp'].view(np.int64)
+        if len(ts) == 0:
+            return
+        last = self._last_timestamp()
+        if np.any(ts[1:] < ts[:-1]) or (last is not None and ts[0] < last):
+            raise ValueError("Snapshots must be appended in non-decreasing timestamp order")
+
+        for name in self.names:
+            self._buffer[name].append(arrays[name])
+        self._buffered += len(ts)
+        if self._buffered >= self.chunk_rows:
+            self._flush(final=False)
+
+    def flush(self):
+        """Write all buffered rows, including a final partial chunk"""
+        self._flush(final=True)
+
+    def _last_timestamp(self) -> Optional[int]:
+        if self._buffered:
+            return int(self._buffer['timestamp'][-1].view(np.int64)[-1])
+        return int(self.index['t_max'][-1]) if len(self.index) else None
+
+    def _flush(self, final: bool):
+        if not self._buffered:
+            return
+        merged = {name: np.concatenate(parts) if len(parts) > 1 else parts[0]
+                  for name, parts in self._buffer.items()}
+        n_full = self._buffered // self.chunk_rows * self.chunk_rows
+        cut = self._buffered if final else n_full
+
+        for start in range(0, cut, self.chunk_rows):
+            stop = min(start + self.chunk_rows, cut)
+            self._write_chunk({name: values[start:stop] for name, values in merged.items()})
+
+        self._buffer = {name: ([values[cut:]] if cut < self._buffered else [])
+                        for name, values in merged.items()}
+        self._buffered -= cut
+
+    def _write_chunk(self, chunk: Dict[str, np.ndarray]):
+        encode = lambda name: encode_column(np.ascontiguousarray(chunk[name]), self.codec, self.level)
+        blobs = list(self._pool.map(encode, self.names) if self._pool else map(encode, self.names))
+
+        with open(os.path.join(self.path, DATA_FILE), 'ab') as handle:
+            base = handle.tell()
+            for blob in blobs:
+                handle.write(blob)
+        offsets = base + np.concatenate([[0], np.cumsum([len(blob) for blob in blobs])])
+
+        ts = chunk['timestamp'].view(np.int64)
+        record = np.zeros(1, dtype=self.record_dtype)
+        record['t_min'], record['t_max'], record['rows'] = ts[0], ts[-1], len(ts)
+        if 'expiry' in chunk:
+            expiry = chunk['expiry'].view(np.int64)
+            record['expiry_min'], record['expiry_max'] = expiry.min(), expiry.max()
+        record['offsets'] = offsets
+        with open(os.path.join(self.path, INDEX_FILE), 'ab') as handle:
+            handle.write(record.tobytes())
+        self.index = np.concatenate([self.index, record])
+        self._map = None
+
+    # -- reading ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return int(self.index['rows'].sum()) + self._buffered
+
+    @property
+    def time_range(self):
+        if not len(self.index):
+            return None
+        return (np.datetime64(int(self.index['t_min'][0]), 'ns'),
+                np.datetime64(int(self.index['t_max'][-1]), 'ns'))
+
+    def _data(self):
+        if self._map is None and len(self.index):
+            with open(os.path.join(self.path, DATA_FILE), 'rb') as handle:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _column(self, chunk: int, name: str) -> np.ndarray:
+        j = self.names.index(name)
+        start, stop = self.index['offsets'][chunk, j], self.index['offsets'][chunk, j + 1]
+        view = memoryview(self._data())[start:stop]
+        return decode_column(view, self.columns[name], int(self.index['rows'][chunk]), self.codec)
+
+    @staticmethod
+    def _ticks(value, unit: str) -> int:
+        return int(np.datetime64(pd.Timestamp(value).to_datetime64(), unit).view(np.int64))
+
+    def read(self, start=None, end=None, columns: Optional[Sequence[str]] = None,
+             expiry=None) -> Dict[str, np.ndarray]:
+        """
+        Rows with start <= timestamp < end (flushed chunks only)
+
+        Args:
+            start, end: Timestamp bounds (anything pd.Timestamp accepts; None = open)
+            columns: Columns to return (default all); only these are decompressed
+            expiry: Keep only this expiry date (chunks outside it are skipped)
+
+        Returns:
+            Dict of column arrays
+        """
+        columns = list(columns or self.names)
+        t_lo = self._ticks(start, 'ns') if start is not None else np.iinfo(np.int64).min
+        t_hi = self._ticks(end, 'ns') if end is not None else np.iinfo(np.int64).max
+
+        # Chunks are in time order: t_max is sorted, so both edges are binary searches
+        first = int(np.searchsorted(self.index['t_max'], t_lo, side='left'))
+        last = int(np.searchsorted(self.index['t_min'], t_hi, side='left'))
+        chunks = np.arange(first, last)
+        if expiry is not None:
+            if 'expiry' not in self.columns:
+                raise ValueError("Store has no 'expiry' column to filter on")
+            day = self._ticks(expiry, 'D')
+            chunks = chunks[(self.index['expiry_min'][chunks] <= day) &
+                            (self.index['expiry_max'][chunks] >= day)]
+
+        def load(chunk):
+            rows = slice(None)
+            if self.index['t_min'][chunk] < t_lo or self.index['t_max'][chunk] >= t_hi:
+                ts = self._column(chunk, 'timestamp').view(np.int64)
+                rows = slice(np.searchsorted(ts, t_lo, 'left'), np.searchsorted(ts, t_hi, 'left'))
+            mask = None
+            if expiry is not None:
+                mask = self._column(chunk, 'expiry')[rows].view(np.int64) == day
+            out = {}
+            for name in columns:
+                values = self._column(chunk, name)[rows]
+                out[name] = values[mask] if mask is not None else values
+            return out
+
+        parts = list(self._pool.map(load, chunks) if self._pool and len(chunks) > 1
+                     else map(load, chunks))
+        if not parts:
+            return {name: np.zeros(0, dtype=self.columns[name]) for name in columns}
+        return {name: np.concatenate([part[name] for part in parts]) if len(parts) > 1
+                else parts[0][name] for name in columns}
+
+    def read_frame(self, start=None, end=None, columns=None, expiry=None) -> pd.DataFrame:
+        return pd.DataFrame(self.read(start, end, columns, expiry), copy=False)
+
+    def chain_at(self, timestamp, lookback='1D') -> pd.DataFrame:
+        """
+        Latest snapshot at or before a timestamp, in the chain layout used by
+        VolSurface and the overlay/roll engines (time_to_expiry in years)
+        """
+        at = pd.Timestamp(timestamp)
+        rows = self.read(at - pd.Timedelta(lookback), at + pd.Timedelta(1, 'ns'))
+        if len(rows['timestamp']) == 0:
+            return pd.DataFrame(columns=['strike', 'time_to_expiry', 'is_call', 'bid', 'ask'])
+        ts = rows['timestamp'].view(np.int64)
+        latest = ts == ts[-1]
+        frame = pd.DataFrame({name: values[latest] for name, values in rows.items()})
+        days = (frame['expiry'] - frame['timestamp']) / pd.Timedelta(days=1)
+        return frame.assign(time_to_expiry=days.to_numpy() / 365)
+
+    def stats(self) -> Dict:
+        """Row, chunk and compression figures"""
+        rows = int(self.index['rows'].sum())
+        stored = int(self.index['offsets'][-1, -1]) if len(self.index) else 0
+        raw = rows * sum(_storage_dtype(dtype).itemsize for dtype in self.columns.values())
+        return {
+            'rows': rows,
+            'chunks': len(self.index),
+            'bytes_stored': stored,
+            'compression_ratio': raw / stored if stored else 0.0
+        }
+
+    def close(self):
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def synthetic_snapshots(n_snapshots: int, start='2024-01-02 09:30', interval='1min',
+                        spot: float = 2.40, strikes_per_expiry: int = 200, seed: int = 7):
+    """Yield timestamped chains built from synthetic_chain with a random-walk spot"""
+    from asst_vol_surface import synthetic_chain
+
+    base = synthetic_chain(spot=spot, strikes_per_expiry=strikes_per_expiry, seed=seed)
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=n_snapshots, freq=interval).to_numpy()
+    expiry_days = np.rint(base['time_to_expiry'].to_numpy() * 365).astype('timedelta64[D]')
+    expiry = times[0].astype('datetime64[D]') + expiry_days
+    n = len(base)
+    bid, ask = base['bid'].to_numpy(), base['ask'].to_numpy()
+    for ts, move in zip(times, np.exp(np.cumsum(rng.normal(0, 0.003, n_snapshots)))):
+        yield {
+            'timestamp': np.full(n, ts),
+            'expiry': expiry,
+            'strike': base['strike'].to_numpy(),
+            'is_call': base['is_call'].to_numpy(),
+            'bid': np.round(bid * move, 2),
+            'ask': np.round(ask * move, 2)
+        }
+
+
+# Usage example
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    path = tempfile.mkdtemp(prefix='asst_chain_store_')
+    snapshots = list(synthetic_snapshots(2000))  # 2,000 one-minute chains
+    n_rows = sum(len(s['timestamp']) for s in snapshots)
+
+    store = ChainSnapshotStore(path)
+    start = time.perf_counter()
+    for snapshot in snapshots:
+        store.append(snapshot)
+    store.flush()
+    ingest = time.perf_counter() - start
+    stats = store.stats()
+    print(f"Ingested {n_rows:,} rows in {ingest:.2f} s ({n_rows / ingest / 1e6:.2f}M rows/s), "
+          f"{stats['chunks']} chunks, {stats['compression_ratio']:.1f}x compression")
+
+    # Random 15-minute windows: bid/ask for one expiry
+    t0, t1 = store.time_range
+    expiry = snapshots[0]['expiry'][len(snapshots[0]['expiry']) // 2]
+    rng = np.random.default_rng(1)
+    offsets = rng.integers(0, int((t1 - t0) / np.timedelta64(1, 'm')) - 15, 50)
+    timings = []
+    for minute in offsets:
+        lo = t0 + np.timedelta64(int(minute), 'm')
+        begin = time.perf_counter()
+        window = store.read(lo, lo + np.timedelta64(15, 'm'), columns=['bid', 'ask'], expiry=expiry)
+        timings.append((time.perf_counter() - begin) * 1e3)
+    print(f"15-minute bid/ask reads for one expiry ({len(window['bid'])} rows): "
+          f"median {np.median(timings):.2f} ms, max {np.max(timings):.2f} ms")
+
+    # Reopen and hand one snapshot to the vol surface fitter
+    store.close()
+    reopened = ChainSnapshotStore(path)
+    chain = reopened.chain_at(t0 + np.timedelta64(600, 'm'))
+    from asst_vol_surface import VolSurfaceBuilder
+    surface = VolSurfaceBuilder().build(chain, spot=2.40)
+    print(f"Snapshot at {chain['timestamp'].iloc[0]}: {len(chain)} quotes, "
+          f"27-day ATM vol {float(surface.sigma(2.40, 27 / 365)):.0%}")
+    reopened.close()
+    shutil.rmtree(path)
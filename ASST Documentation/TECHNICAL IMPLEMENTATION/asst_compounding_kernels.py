@@ -0,0 +1,373 @@
+"""
+ASST Compounding Kernels
+Month-by-month accumulation and premium growth recurrences across many paths
+Author: Quantitative Strategy Team
+Date: October 2025
+
+The accumulation projection is path-dependent: each month's premium is a
+return on the portfolio value, the premium sets the new contracts, and the
+retained premium feeds next month's portfolio value. Months therefore
+cannot be broadcast, but paths can. Each recurrence is written twice with
+identical arithmetic:
+
+- A scalar kernel (paths x months loops) compiled with numba when it is
+  installed
+- A NumPy kernel that loops over months and advances every path at once
+
+Both write into one preallocated month-major (field, month, path) array
+(returned as per-field (path, month) views), so a
+120-month, 10,000-path run is a single call instead of a million
+monthly_compounding_cycle dictionaries. The kernels reproduce
+ASSTPremiumCompounder.generate_6month_projections and
+PremiumCompoundingEngine.project_compound_growth exactly when given their
+deterministic inputs.
+"""
+
+import time
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    njit = None
+    HAVE_NUMBA = False
+
+logger = logging.getLogger(__name__)
+
+ACCUMULATION_FIELDS = (
+    'Monthly_Premium', 'Put_Reinvestment', 'Call_Hedge_Budget', 'New_Contracts',
+    'Total_Contracts', 'Monthly_Assignments', 'New_Shares', 'Cumulative_Shares',
+    'Effective_Cost_Per_Share', 'Share_Value_Current', 'Total_Cost_Basis',
+    'Call_Hedge_Value', 'Cumulative_Premium', 'Portfolio_Value', 'Compounding_Multiple'
+)
+GROWTH_FIELDS = (
+    'Monthly_Premium', 'Put_Capital', 'Call_Budget', 'New_Contracts',
+    'Cumulative_Contracts', 'Compounding_Multiple'
+)
+# Whole-number fields (stored as float64 in the kernel output)
+COUNT_FIELDS = frozenset(['New_Contracts', 'Total_Contracts', 'Monthly_Assignments',
+                          'New_Shares', 'Cumulative_Shares', 'Cumulative_Contracts'])
+
+
+def _accumulation_scalar(base_return, assignment_rate, price, start_value, start_premium,
+                         start_contracts, monthly_capital, put_allocation, call_allocation,
+                         contract_cost, effective_cost, premium_retention, out):
+    """Accumulation recurrence, one path and one month at a time (numba target)"""
+    n_months, n_paths = base_return.shape
+    for p in range(n_paths):
+        portfolio_value = start_value
+        cumulative_premium = start_premium
+        contracts = start_contracts
+        shares = 0.0
+        for m in range(n_months):
+            month = m + 1.0
+            premium = portfolio_value * base_return[m, p]
+            put_reinvestment = premium * put_allocation
+            call_budget = premium * call_allocation
+            total_put_capital = put_reinvestment + monthly_capital
+            new_contracts = np.trunc(total_put_capital / contract_cost[m, p])
+            cumulative_premium += premium
+            contracts += new_contracts
+
+            assignments = np.trunc(new_contracts * assignment_rate[m, p])
+            new_shares = assignments * 100
+            shares += new_shares
+            share_value = shares * price[m, p]
+            cost_basis = shares * effective_cost
+
+            portfolio_value += monthly_capital + (premium * premium_retention)
+            hedge_value = call_budget * month
+
+            out[0, m, p] = premium
+            out[1, m, p] = put_reinvestment
+            out[2, m, p] = call_budget
+            out[3, m, p] = new_contracts
+            out[4, m, p] = contracts
+            out[5, m, p] = assignments
+            out[6, m, p] = new_shares
+            out[7, m, p] = shares
+            out[8, m, p] = effective_cost
+            out[9, m, p] = share_value
+            out[10, m, p] = cost_basis
+            out[11, m, p] = hedge_value
+            out[12, m, p] = cumulative_premium
+            out[13, m, p] = portfolio_value + share_value - cost_basis + hedge_value
+            out[14, m, p] = total_put_capital / monthly_capital
+    return out
+
+
+def _accumulation_numpy(base_return, assignment_rate, price, start_value, start_premium,
+                        start_contracts, monthly_capital, put_allocation, call_allocation,
+                        contract_cost, effective_cost, premium_retention, out):
+    """Accumulation recurrence, one month at a time across all paths"""
+    n_months, n_paths = base_return.shape
+    portfolio_value = np.full(n_paths, start_value, dtype=float)
+    cumulative_premium = np.full(n_paths, start_premium, dtype=float)
+    contracts = np.full(n_paths, start_contracts, dtype=float)
+    shares = np.zeros(n_paths)
+    for m in range(n_months):
+        premium = portfolio_value * base_return[m]
+        put_reinvestment = premium * put_allocation
+        call_budget = premium * call_allocation
+        total_put_capital = put_reinvestment + monthly_capital
+        new_contracts = np.trunc(total_put_capital / contract_cost[m])
+        cumulative_premium += premium
+        contracts += new_contracts
+
+        assignments = np.trunc(new_contracts * assignment_rate[m])
+        new_shares = assignments * 100
+        shares += new_shares
+        share_value = shares * price[m]
+        cost_basis = shares * effective_cost
+
+        portfolio_value += monthly_capital + (premium * premium_retention)
+        hedge_value = call_budget * (m + 1.0)
+
+        out[0, m] = premium
+        out[1, m] = put_reinvestment
+        out[2, m] = call_budget
+        out[3, m] = new_contracts
+        out[4, m] = contracts
+        out[5, m] = assignments
+        out[6, m] = new_shares
+        out[7, m] = shares
+        out[8, m] = effective_cost
+        out[9, m] = share_value
+        out[10, m] = cost_basis
+        out[11, m] = hedge_value
+        out[12, m] = cumulative_premium
+        out[13, m] = portfolio_value + share_value - cost_basis + hedge_value
+        out[14, m] = total_put_capital / monthly_capital
+    return out
+
+
+def _growth_scalar(growth, base_premium, monthly_capital, put_allocation, call_allocation,
+                   scaling_step, contract_cost, out):
+    """Premium growth recurrence, one path and one month at a time (numba target)"""
+    n_months, n_paths = growth.shape
+    for p in range(n_paths):
+        premium = base_premium
+        contracts = 0.0
+        for m in range(n_months):
+            scaling_factor = 1 + m * scaling_step
+            total_put_capital = premium * put_allocation * scaling_factor + monthly_capital
+            new_contracts = np.trunc(total_put_capital / contract_cost)
+            contracts += new_contracts
+
+            out[0, m, p] = premium
+            out[1, m, p] = total_put_capital
+            out[2, m, p] = premium * call_allocation
+            out[3, m, p] = new_contracts
+            out[4, m, p] = contracts
+            out[5, m, p] = total_put_capital / monthly_capital
+            premium = premium * (1 + growth[m, p])
+    return out
+
+
+def _growth_numpy(growth, base_premium, monthly_capital, put_allocation, call_allocation,
+                  scaling_step, contract_cost, out):
+    """Premium growth recurrence, one month at a time across all paths"""
+    n_months, n_paths = growth.shape
+    premium = np.full(n_paths, base_premium, dtype=float)
+    contracts = np.zeros(n_paths)
+    for m in range(n_months):
+        scaling_factor = 1 + m * scaling_step
+        total_put_capital = premium * put_allocation * scaling_factor + monthly_capital
+        new_contracts = np.trunc(total_put_capital / contract_cost)
+        contracts += new_contracts
+
+        out[0, m] = premium
+        out[1, m] = total_put_capital
+        out[2, m] = premium * call_allocation
+        out[3, m] = new_contracts
+        out[4, m] = contracts
+        out[5, m] = total_put_capital / monthly_capital
+        premium = premium * (1 + growth[m])
+    return out
+
+
+if HAVE_NUMBA:
+    _accumulation_jit = njit(cache=True)(_accumulation_scalar)
+    _growth_jit = njit(cache=True)(_growth_scalar)
+
+
+def _paths(value, n_paths: int, months: int) -> np.ndarray:
+    """
+    Broadcast a scalar, per-month or (paths, months) input to the kernels'
+    month-major (months, paths) layout, so each month is one contiguous row
+    """
+    value = np.broadcast_to(np.asarray(value, dtype=float), (n_paths, months))
+    return np.ascontiguousarray(value.T)
+
+
+def _as_dict(out: np.ndarray, fields) -> Dict[str, np.ndarray]:
+    """Split (field, months, paths) kernel output into (paths, months) views"""
+    return {name: out[i].T for i, name in enumerate(fields)}
+
+
+def default_base_returns(months: int) -> np.ndarray:
+    """Progressive monthly return on portfolio value (8% in month 1, +1% a month)"""
+    return 0.08 + (np.arange(1, months + 1) - 1) * 0.01
+
+
+def default_assignment_rates(months: int) -> np.ndarray:
+    """Progressive assignment rate on new contracts, 55% in month 1 capped at 80%"""
+    return np.minimum(0.80, 0.50 + np.arange(1, months + 1) * 0.05)
+
+
+def accumulation_paths(months: int, start_value: float, monthly_capital: float,
+                       contract_cost, effective_cost: float, price,
+                       base_return=None, assignment_rate=None, n_paths: Optional[int] = None,
+                       start_premium: float = 0.0, start_contracts: int = 38,
+                       put_allocation: float = 0.70, call_allocation: float = 0.30,
+                       premium_retention: float = 0.30, use_jit: Optional[bool] = None
+                       ) -> Dict[str, np.ndarray]:
+    """
+    Share accumulation projection for many paths
+
+    Args:
+        months: Horizon in months
+        start_value: Portfolio value at the start of month 1
+        monthly_capital: Fresh capital added each month
+        contract_cost: Capital consumed per new contract, scalar, per month or
+            (paths, months), e.g. the margin requirement at each path's price
+        effective_cost: Cost basis per assigned share
+        price: Share price, scalar, per month or (paths, months)
+        base_return: Monthly premium return on portfolio value (default progression)
+        assignment_rate: Share of new contracts assigned (default progression)
+        n_paths: Number of paths (inferred from 2-D inputs when omitted)
+        use_jit: Force the numba kernel on or off (default: use it when installed)
+
+    Returns:
+        Dictionary of (paths, months) arrays keyed by ACCUMULATION_FIELDS
+    """
+    base_return = default_base_returns(months) if base_return is None else base_return
+    assignment_rate = default_assignment_rates(months) if assignment_rate is None else assignment_rate
+    if n_paths is None:
+        n_paths = max(np.ndim(x) == 2 and np.shape(x)[0] or 1
+                      for x in (base_return, assignment_rate, price, contract_cost))
+
+    args = (_paths(base_return, n_paths, months), _paths(assignment_rate, n_paths, months),
+            _paths(price, n_paths, months), float(start_value), float(start_premium),
+            float(start_contracts), float(monthly_capital), float(put_allocation),
+            float(call_allocation), _paths(contract_cost, n_paths, months), float(effective_cost),
+            float(premium_retention), np.empty((len(ACCUMULATION_FIELDS), months, n_paths)))
+
+    use_jit = HAVE_NUMBA if use_jit is None else use_jit and HAVE_NUMBA
+    out = _accumulation_jit(*args) if use_jit else _accumulation_numpy(*args)
+    return _as_dict(out, ACCUMULATION_FIELDS)
+
+
+def premium_growth_paths(months: int, growth=0.12, base_premium: float = 1000.0,
+                         monthly_capital: float = 4000.0, n_paths: Optional[int] = None,
+                         put_allocation: float = 0.70, call_allocation: float = 0.30,
+                         scaling_step: float = 0.12, contract_cost: float = 250.0,
+                         use_jit: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """
+    Compounded premium allocation for many paths
+
+    Args:
+        months: Horizon in months
+        growth: Premium growth from each month to the next, scalar, per month
+            or (paths, months); the last month's value is unused
+        base_premium: Premium collected in month 1
+        scaling_step: Per-month increment of the scaling on reinvested premium
+
+    Returns:
+        Dictionary of (paths, months) arrays keyed by GROWTH_FIELDS
+    """
+    if n_paths is None:
+        n_paths = np.shape(growth)[0] if np.ndim(growth) == 2 else 1
+
+    args = (_paths(growth, n_paths, months), float(base_premium), float(monthly_capital),
+            float(put_allocation), float(call_allocation), float(scaling_step),
+            float(contract_cost), np.empty((len(GROWTH_FIELDS), months, n_paths)))
+
+    use_jit = HAVE_NUMBA if use_jit is None else use_jit and HAVE_NUMBA
+    out = _growth_jit(*args) if use_jit else _growth_numpy(*args)
+    return _as_dict(out, GROWTH_FIELDS)
+
+
+def _looped_accumulation(model, months, base_return, assignment_rate, price):
+    """The original per-month dictionary loop, kept as the parity and speed reference"""
+    rows = []
+    shares = 0
+    cumulative_premium = model.premium_collected
+    contracts = 38
+    portfolio_value = model.initial_portfolio + model.premium_collected
+    spot = model.current_price
+    try:
+        for m in range(months):
+            model.current_price = price[m]  # New contracts are sized at the month's price
+            monthly_premium = portfolio_value * base_return[m]
+            cycle = model.monthly_compounding_cycle(monthly_premium, m + 1)
+            cumulative_premium += monthly_premium
+            new_contracts = cycle['estimated_new_contracts']
+            contracts += new_contracts
+            assignments = int(new_contracts * assignment_rate[m])
+            shares += assignments * 100
+            effective_cost = cycle['weighted_avg_strike'] - (cycle['weighted_avg_strike'] * 0.45)
+            portfolio_value += model.monthly_capital + (monthly_premium * 0.30)
+            hedge_value = cycle['call_hedge_budget'] * (m + 1)
+            rows.append(portfolio_value + shares * price[m] - shares * effective_cost + hedge_value)
+    finally:
+        model.current_price = spot
+    return rows
+
+
+# Usage example
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+    from ASST_Advanced_Strategy_System import PremiumCompoundingEngine, StrategyParameters
+
+    print(f"numba kernels: {'enabled' if HAVE_NUMBA else 'not installed, NumPy fallback'}")
+    model = ASSTPremiumCompounder()
+
+    # Parity: six-month projection against the legacy month loop
+    legacy = model.generate_6month_projections()
+    looped = _looped_accumulation(model, 6, default_base_returns(6), default_assignment_rates(6),
+                                  np.full(6, model.current_price))
+    print(f"6-month parity, max |kernel - loop| portfolio value: "
+          f"{np.abs(legacy['Portfolio_Value'].to_numpy() - looped).max():.2e}")
+
+    engine = PremiumCompoundingEngine(StrategyParameters())
+    growth = premium_growth_paths(12, monthly_capital=engine.params.monthly_capital,
+                                  contract_cost=engine.contract_cost())
+    reference = engine.project_compound_growth(12)
+    print(f"12-month growth parity, max |kernel - legacy| put capital: "
+          f"{np.abs(growth['Put_Capital'][0].round(0) - reference['Put_Capital']).max():.2e}, "
+          f"contracts: {np.abs(growth['New_Contracts'][0] - reference['New_Contracts']).max():.0f}")
+
+    # Long horizon: 120 months of stochastic premium returns and prices
+    months, n_paths = 120, 2000
+    from asst_simulation_rng import StreamFactory
+
+    streams = StreamFactory(11)
+    returns = np.clip(streams.unit_generator(0).normal(0.10, 0.03, (n_paths, months)), 0.0, None)
+    prices = model.current_price * np.exp(np.cumsum(
+        streams.unit_generator(1).normal(0, 0.25, (n_paths, months)), axis=1))
+    rates = default_assignment_rates(months)
+
+    n_loop = 50
+    start = time.perf_counter()
+    for p in range(n_loop):
+        looped = _looped_accumulation(model, months, returns[p], rates, prices[p])
+    loop_per_path = (time.perf_counter() - start) / n_loop
+
+    model.project_accumulation(months, base_return=returns, price=prices)  # Warm-up
+    start = time.perf_counter()
+    paths = model.project_accumulation(months, base_return=returns, price=prices)
+    kernel_per_path = (time.perf_counter() - start) / n_paths
+
+    check = np.abs(paths['Portfolio_Value'][n_loop - 1] - looped).max()
+    print(f"{months} months x {n_paths} paths: {kernel_per_path * 1e6:.1f} us/path vs "
+          f"{loop_per_path * 1e3:.2f} ms/path looped ({loop_per_path / kernel_per_path:,.0f}x), "
+          f"max diff {check:.2e}")
+    final = paths['Portfolio_Value'][:, -1]
+    print(f"Month {months} portfolio value p5/p50/p95: "
+          f"{np.percentile(final, [5, 50, 95]).round(0)}")
@@ -0,0 +1,188 @@
+"""
+ASST Covered-Call Overlay Engine
+Chain-priced covered calls across every assigned share lot at once
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Replaces the single effective_cost_basis * 1.25 strike and its estimated
+premium. Calls are priced from the live chain (bid to sell, implied vol
+from the mid), and a call is eligible only if:
+
+- Its strike is at or above the lot's cost basis plus min_markup, so a
+  call-away is never a loss
+- Its risk-neutral call-away probability is below max_call_away, which
+  keeps the "hold INDEFINITE" shares in the account
+- Its expiry lies inside the [min_days, max_days] window
+
+The call-away probability and premium yield of a call do not depend on the
+lot, so candidates are scored once and sorted by strike. A suffix maximum
+then gives, for any strike floor, the best eligible call. Each lot's choice
+is one binary search, for any number of lots.
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from asst_strategy_core import exercise_probability
+from asst_vol_surface import implied_volatility
+
+logger = logging.getLogger(__name__)
+
+SHARES_PER_CONTRACT = 100
+
+
+@dataclass
+class OverlayConstraints:
+    """Eligibility limits for covered calls"""
+    max_call_away: float = 0.15      # Hold INDEFINITE: at most 15% chance of losing the shares
+    min_markup: float = 0.25         # Strike at least 25% above cost basis (legacy 1.25x)
+    min_days: int = 7
+    max_days: int = 60
+    min_premium: float = 0.05        # Per share
+    coverage: float = 1.0            # Fraction of each lot's round lots to write against
+
+
+class CoveredCallOverlay:
+    """Chooses covered-call strike and expiry for all lots in one pass"""
+
+    def __init__(self, current_price: float, constraints: Optional[OverlayConstraints] = None,
+                 rate: float = 0.04, symbol: str = 'ASST'):
+        self.current_price = current_price
+        self.constraints = constraints or OverlayConstraints()
+        self.rate = rate
+        self.symbol = symbol
+
+    def candidates(self, chain: pd.DataFrame) -> pd.DataFrame:
+        """
+        Eligible calls with call-away probability and monthly premium yield
+
+        Lot-independent filters are applied here; the cost-basis floor is
+        applied per lot in select().
+        """
+        c = self.constraints
+        calls = chain.loc[chain['is_call'].astype(bool)]
+        days = calls['time_to_expiry'].to_numpy(dtype=float) * 365
+        bid = calls['bid'].to_numpy(dtype=float)
+        keep = (days >= c.min_days) & (days <= c.max_days) & (bid >= c.min_premium)
+        calls, days, bid = calls[keep], days[keep], bid[keep]
+
+        strike = calls['strike'].to_numpy(dtype=float)
+        t = calls['time_to_expiry'].to_numpy(dtype=float)
+        mid = (calls['mid'].to_numpy(dtype=float) if 'mid' in calls
+               else (bid + calls['ask'].to_numpy(dtype=float)) / 2)
+        sigma = implied_volatility(mid, self.current_price, strike, t, True, self.rate)
+        call_away = exercise_probability(self.current_price, strike, t, sigma, True, self.rate)
+
+        frame = pd.DataFrame({
+            'strike': strike,
+            'days_to_expiry': days,
+            'bid': bid,
+            'implied_vol': sigma,
+            'call_away_probability': call_away,
+            # Premium per share per 30 days, comparable across expiries
+            'monthly_premium': bid * 30 / days
+        })
+        frame = frame[np.isfinite(sigma) & (call_away <= c.max_call_away)]
+        return frame.sort_values('strike', kind='stable').reset_index(drop=True)
+
+    def select(self, lots, chain: pd.DataFrame) -> pd.DataFrame:
+        """
+        Best covered call per lot
+
+        Args:
+            lots: Dicts or DataFrame with lot_id, shares and cost_basis
+            chain: Quotes with strike, time_to_expiry (years), is_call, bid, ask
+
+        Returns:
+            Per-lot DataFrame with contracts, strike, expiry, premium and
+            call-away probability (NaN strike where nothing is eligible)
+        """
+        lots = pd.DataFrame(lots).reset_index(drop=True)
+        cands = self.candidates(chain)
+        floors = lots['cost_basis'].to_numpy(dtype=float) * (1 + self.constraints.min_markup)
+        contracts = (np.floor(lots['shares'].to_numpy(dtype=float) / SHARES_PER_CONTRACT *
+                              self.constraints.coverage)).astype(int)
+
+        # best_from[i]: highest-yield candidate among strikes[i:]
+        yields = cands['monthly_premium'].to_numpy()
+        n = len(yields)
+        best_from = np.zeros(n + 1, dtype=np.intp)
+        if n:
+            rev = yields[::-1]
+            running = np.maximum.accumulate(rev)
+            # Last index (in reversed order) where the running max was set
+            set_at = np.where(rev == running, np.arange(n), 0)
+            best_from[:n] = (n - 1 - np.maximum.accumulate(set_at))[::-1]
+        first = np.searchsorted(cands['strike'].to_numpy(), floors - 1e-9, side='left')
+        found = (first < n) & (contracts > 0)
+        pick = best_from[np.minimum(first, max(n - 1, 0))]
+
+        def chosen(name):
+            values = cands[name].to_numpy() if n else np.zeros(1)
+            return np.where(found, values[pick], np.nan)
+
+        premium = chosen('bid')
+        shares_covered = np.where(found, contracts * SHARES_PER_CONTRACT, 0)
+        result = lots.assign(
+            contracts=np.where(found, contracts, 0),
+            strike=chosen('strike'),
+            days_to_expiry=chosen('days_to_expiry'),
+            premium=premium,
+            call_away_probability=chosen('call_away_probability'),
+            premium_income=np.nan_to_num(premium) * shares_covered,
+            monthly_income=np.nan_to_num(chosen('monthly_premium')) * shares_covered,
+            called_away_profit=np.where(found, (chosen('strike') - lots['cost_basis'].to_numpy()) *
+                                        shares_covered, 0.0)
+        )
+        logger.info(f"Covered calls selected for {int(found.sum())} of {len(lots)} lots")
+        return result
+
+    def orders(self, selection: pd.DataFrame) -> List[Dict]:
+        """Batch lots sharing a strike and expiry into one sell-to-open order"""
+        written = selection[selection['contracts'] > 0]
+        orders = []
+        for (strike, days), group in written.groupby(['strike', 'days_to_expiry'], sort=True):
+            orders.append({
+                'symbol': self.symbol,
+                'type': 'call',
+                'strike': float(strike),
+                'quantity': -int(group['contracts'].sum()),
+                'action': 'SELL_TO_OPEN',
+                'days_to_expiry': int(round(days)),
+                'limit_price': round(float(group['premium'].iloc[0]), 2),
+                'lots': group['lot_id'].tolist() if 'lot_id' in group else group.index.tolist()
+            })
+        return orders
+
+
+# Usage example
+if __name__ == "__main__":
+    from asst_vol_surface import synthetic_chain
+
+    chain = synthetic_chain(strikes_per_expiry=400)
+    overlay = CoveredCallOverlay(current_price=2.40)
+
+    rng = np.random.default_rng(5)
+    n_lots = 10000
+    lots = pd.DataFrame({
+        'lot_id': [f'LOT-{i:05d}' for i in range(n_lots)],
+        'shares': rng.integers(1, 40, n_lots) * 100,
+        'cost_basis': rng.uniform(0.8, 3.5, n_lots).round(2)
+    })
+
+    overlay.select(lots, chain)  # Warm-up
+    start = time.perf_counter()
+    selection = overlay.select(lots, chain)
+    elapsed = (time.perf_counter() - start) * 1e3
+    orders = overlay.orders(selection)
+
+    print(f"{n_lots} lots against {len(chain)} quotes in {elapsed:.1f} ms -> {len(orders)} orders")
+    print(f"Premium income: ${selection['premium_income'].sum():,.0f}, "
+          f"max call-away probability {selection['call_away_probability'].max():.1%}")
+    print(selection[['cost_basis', 'contracts', 'strike', 'days_to_expiry', 'premium',
+                     'call_away_probability']].head(8).round(3).to_string())
@@ -0,0 +1,390 @@
+"""
+ASST Quantitative Analysis Suite Loader
+Typed, hash-keyed, memory-mapped access to the suite's CSV datasets
+Author: Quantitative Strategy Team
+Date: October 2025
+
+The CSVs in QUANTITATIVE ANALYSIS SUITE mix plain numbers with
+string-encoded values ("80%", "5-15%", "3.1% per position", "Nov-15-2025").
+Each dataset has a declared schema that parses those once into typed
+columns:
+
+- percent: first number in the cell, as a fraction ("3.1% per position" -> 0.031)
+- range: "5-15%" -> <name>_min = 0.05 and <name>_max = 0.15 (single values fill both)
+- date: parsed with the declared format into datetime64[D]
+- int / float / text, and auto (numeric if every cell parses, else text)
+
+Parsed columns are written as one .npy file per column under a cache
+directory keyed by the SHA-256 of the CSV bytes and the schema. Later loads
+memory-map those files, so numeric columns reach the DataFrame without
+being copied or re-parsed. Editing a CSV or its schema changes the key and
+forces a re-parse.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                         'QUANTITATIVE ANALYSIS SUITE')
+CACHE_DIRNAME = '.asst_cache'
+SCHEMA_VERSION = 1
+
+NUMBER = r'(-?\d+(?:\.\d+)?)'
+RANGE_PATTERN = re.compile(r'^\s*' + NUMBER + r'\s*(?:-\s*(\d+(?:\.\d+)?))?')
+OPTION_SYMBOL = re.compile(r'^(?P<underlying>\S+)\s+(?P<expiration>[A-Za-z]{3} \d{1,2})\s+'
+                           r'\$(?P<strike>\d+(?:\.\d+)?)(?P<right>[CP])$')
+OPEN_ACTIONS = {'SELL': 'SELL_TO_OPEN', 'BUY': 'BUY_TO_OPEN'}
+
+
+@dataclass
+class DatasetSchema:
+    """Column types for one CSV; undeclared columns are parsed as 'auto'"""
+    filename: str
+    columns: Dict[str, str] = field(default_factory=dict)
+
+    def kind(self, column: str) -> str:
+        return self.columns.get(column, 'auto')
+
+    @property
+    def fingerprint(self) -> str:
+        return json.dumps([SCHEMA_VERSION, self.filename, sorted(self.columns.items())])
+
+
+SCHEMAS = {
+    'benchmark_comparison': DatasetSchema('ASST_Benchmark_Comparison (1).csv', {
+        'Assignment_Rate': 'range',
+        'Expected_Annual_Return': 'range'
+    }),
+    'call_hedge_optimization': DatasetSchema('ASST_Call_Hedge_Optimization.csv', {
+        'Tier': 'int',
+        'Expiration': 'date:%b-%d-%Y',
+        'Contracts': 'int'
+    }),
+    'document_inventory': DatasetSchema('ASST_Document_Inventory.csv', {
+        'Version': 'text',
+        'Date_Created': 'date:%Y-%m-%d',
+        'Records': 'text'
+    }),
+    'implementation_projections': DatasetSchema('ASST_Implementation_Projections.csv', {
+        'Month': 'int',
+        'New_Contracts': 'int',
+        'Monthly_Assignments': 'int',
+        'New_Shares': 'int',
+        'Cumulative_Shares': 'int'
+    }),
+    'long_term_value_projections': DatasetSchema('ASST_Long_Term_Value_Projections.csv', {
+        'Timeframe_Years': 'range'
+    }),
+    'model_validation_results': DatasetSchema('ASST_Model_Validation_Results.csv', {
+        'Sample_Size': 'int',
+        'Confidence_Level': 'percent',
+        'Recommended_Size': 'percent',
+        'Risk_Adjusted_Return': 'percent',
+        'Maximum_Drawdown': 'percent',
+        'Implementation_Confidence': 'percent',
+        'Accuracy_ITM_Puts': 'percent',
+        'Accuracy_OTM_Puts': 'percent',
+        'Overall_Accuracy': 'percent',
+        'False_Positive_Rate': 'percent',
+        'False_Negative_Rate': 'percent',
+        'Compounding_Rate': 'percent',
+        'Capital_Efficiency': 'percent',
+        'Growth_Sustainability': 'text',
+        'Risk_Scaling': 'text',
+        'Return_Scaling': 'text',
+        'Coverage_Effectiveness': 'percent',
+        'Cost_Efficiency': 'percent',
+        'Leverage_Accuracy': 'percent',
+        'Rebalancing_Frequency': 'text',
+        'Protection_Ratio': 'range',
+        'VaR_Accuracy': 'percent',
+        'Concentration_Limits': 'text',
+        'Alert_System_Reliability': 'percent',
+        'False_Alert_Rate': 'percent',
+        'Coverage_Completeness': 'percent',
+        'Price_Target_Accuracy': 'percent',
+        'Timeline_Accuracy': 'text',
+        'Scenario_Probability': 'text',
+        'Return_Range_Validity': 'text',
+        'Model_Robustness': 'text'
+    }),
+    'performance_attribution': DatasetSchema('ASST_Performance_Attribution.csv', {
+        'Month': 'int'
+    }),
+    'position_restructuring_orders': DatasetSchema('ASST_Position_Restructuring_Orders.csv', {
+        'Order_ID': 'int',
+        'Day': 'int',
+        'Quantity': 'int'
+    }),
+    'premium_compounding_model': DatasetSchema('ASST_Premium_Compounding_Model.csv', {
+        'Month': 'int',
+        'Expected_New_Contracts': 'int'
+    }),
+    'risk_metrics_dashboard': DatasetSchema('ASST_Risk_Metrics_Dashboard.csv', {
+        'Month': 'int'
+    }),
+    'share_accumulation_tracker': DatasetSchema('ASST_Share_Accumulation_Tracker.csv', {
+        'Quantity': 'int',
+        'Expected_Shares': 'int',
+        'Expiration_Month': 'text'
+    })
+}
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_percent(values: pd.Series) -> np.ndarray:
+    """First number in each cell as a fraction; blank and N/A cells become NaN"""
+    number = values.astype('string').str.extract(NUMBER, expand=False)
+    return pd.to_numeric(number, errors='coerce').to_numpy(dtype=float) / 100
+
+
+def parse_range(values: pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Low and high bound of "5-15%" style cells
+
+    Cells containing '%' are scaled to fractions; a single value fills both bounds.
+    """
+    text = values.astype('string')
+    parts = text.str.extract(RANGE_PATTERN)
+    low = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float)
+    high = pd.to_numeric(parts[1], errors='coerce').to_numpy(dtype=float)
+    high = np.where(np.isnan(high), low, high)
+    scale = np.where(text.str.contains('%', regex=False).fillna(False).to_numpy(dtype=bool), 0.01, 1.0)
+    return {'min': low * scale, 'max': high * scale}
+
+
+def parse_column(name: str, values: pd.Series, kind: str) -> Dict[str, np.ndarray]:
+    """Parse one raw column into one or more typed arrays"""
+    if kind == 'range':
+        bounds = parse_range(values)
+        return {f'{name}_min': bounds['min'], f'{name}_max': bounds['max']}
+    if kind == 'percent':
+        return {name: parse_percent(values)}
+    if kind.startswith('date:'):
+        dates = pd.to_datetime(values, format=kind[5:], errors='coerce')
+        return {name: dates.to_numpy(dtype='datetime64[D]')}
+    if kind == 'text':
+        return {name: values.fillna('').astype(str).to_numpy(dtype=str)}
+
+    if kind not in ('int', 'float', 'auto'):
+        raise ValueError(f"Unknown column type '{kind}' for {name}")
+
+    numeric = pd.to_numeric(values, errors='coerce')
+    if kind == 'int':
+        if numeric.isna().any():
+            raise ValueError(f"Column {name} declared int but has blank or non-numeric cells")
+        return {name: numeric.to_numpy(dtype=np.int64)}
+    if kind == 'float' or numeric.notna().sum() == values.notna().sum():
+        return {name: numeric.to_numpy(dtype=float)}
+    return {name: values.fillna('').astype(str).to_numpy(dtype=str)}
+
+
+def _with_expiry(records: List[Dict], calendar) -> List[Dict]:
+    """Resolve every record's 'expiration' label in one calendar pass"""
+    if calendar is None or not records:
+        return records
+    expiry = calendar.parse([record['expiration'] for record in records])
+    days = calendar.calendar_days(expiry)
+    for record, when, dte in zip(records, expiry, days):
+        record['expiry'] = when
+        record['days_to_expiry'] = int(dte)
+    return records
+
+
+class SuiteLoader:
+    """Loads suite datasets through the typed, memory-mapped cache"""
+
+    def __init__(self, suite_dir: str = SUITE_DIR, cache_dir: Optional[str] = None,
+                 schemas: Optional[Dict[str, DatasetSchema]] = None):
+        self.suite_dir = os.path.normpath(suite_dir)
+        self.cache_dir = cache_dir or os.path.join(self.suite_dir, CACHE_DIRNAME)
+        self.schemas = schemas or SCHEMAS
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.suite_dir, self.schemas[name].filename)
+
+    def cache_key(self, name: str) -> str:
+        """Cache entry name: dataset plus hash of the CSV bytes and its schema"""
+        digest = hashlib.sha256(file_hash(self.path(name)).encode())
+        digest.update(self.schemas[name].fingerprint.encode())
+        return f'{name}-{digest.hexdigest()[:20]}'
+
+    def parse(self, name: str) -> Dict[str, np.ndarray]:
+        """Read and type a CSV (no cache)"""
+        schema = self.schemas[name]
+        raw = pd.read_csv(self.path(name), dtype=str, keep_default_na=False,
+                          na_values=['', 'N/A'])
+        columns = {}
+        for column in raw.columns:
+            columns.update(parse_column(column, raw[column], schema.kind(column)))
+        return columns
+
+    def _write_cache(self, entry: str, columns: Dict[str, np.ndarray]):
+        """Write column files to a temporary directory, then rename into place"""
+        final = os.path.join(self.cache_dir, entry)
+        staging = f'{final}.tmp-{os.getpid()}'
+        os.makedirs(staging, exist_ok=True)
+        for i, values in enumerate(columns.values()):
+            np.save(os.path.join(staging, f'c{i:03d}.npy'), values, allow_pickle=False)
+        with open(os.path.join(staging, 'columns.json'), 'w') as handle:
+            json.dump(list(columns), handle)
+        try:
+            os.replace(staging, final)
+        except OSError:
+            # Another process published the same entry first
+            for leftover in os.listdir(staging):
+                os.remove(os.path.join(staging, leftover))
+            os.rmdir(staging)
+
+    def load_columns(self, name: str) -> Dict[str, np.ndarray]:
+        """
+        Typed columns for a dataset, memory-mapped from the cache
+
+        Args:
+            name: Dataset key in SCHEMAS
+
+        Returns:
+            Ordered dict of read-only arrays, one per typed column
+        """
+        entry = os.path.join(self.cache_dir, self.cache_key(name))
+        if not os.path.isdir(entry):
+            logger.info(f"Parsing {self.schemas[name].filename} into cache")
+            self._write_cache(os.path.basename(entry), self.parse(name))
+        with open(os.path.join(entry, 'columns.json')) as handle:
+            names = json.load(handle)
+        return {column: np.load(os.path.join(entry, f'c{i:03d}.npy'), mmap_mode='r',
+                                allow_pickle=False)
+                for i, column in enumerate(names)}
+
+    def load(self, name: str) -> pd.DataFrame:
+        """Typed DataFrame; numeric columns share memory with the cache files"""
+        return pd.DataFrame(self.load_columns(name), copy=False)
+
+    def load_all(self) -> Dict[str, pd.DataFrame]:
+        return {name: self.load(name) for name in self.schemas}
+
+    def positions(self, symbol: str = 'ASST', calendar=None) -> List[Dict]:
+        """
+        Short put positions from the share accumulation tracker
+
+        Args:
+            symbol: Underlying symbol
+            calendar: Optional ExpiryCalendar; adds expiry and days_to_expiry
+
+        Returns:
+            Position dicts in the engines' format (negative quantity = short);
+            value is the premium received, carried as a short market value
+        """
+        tracker = self.load('share_accumulation_tracker')
+        positions = [{
+            'symbol': symbol,
+            'type': 'put',
+            'strike': float(strike),
+            'quantity': -int(quantity),
+            'value': -float(quantity * 100 * premium),
+            'premium_received': float(premium),
+            'expiration': str(expiration)
+        } for strike, quantity, premium, expiration in zip(
+            tracker['Strike'], tracker['Quantity'],
+            tracker['Premium_Collected_Per_Share'], tracker['Expiration_Month'])]
+        return _with_expiry(positions, calendar)
+
+    def orders(self, calendar=None) -> List[Dict]:
+        """
+        Restructuring orders in the engines' order format
+
+        The option symbol ("ASST Jan 16 $20C") is split into underlying,
+        expiration, strike and type; SELL/BUY become opening actions, sells
+        carry negative quantity, and limit_price is the per-share estimate.
+        With a calendar, expiry and days_to_expiry are resolved as well.
+        """
+        frame = self.load('position_restructuring_orders')
+        legs = frame['Symbol'].astype(str).str.extract(OPTION_SYMBOL)
+        if legs['strike'].isna().any():
+            bad = frame.loc[legs['strike'].isna(), 'Symbol'].tolist()
+            raise ValueError(f"Unrecognized option symbols: {bad}")
+
+        quantity = frame['Quantity'].to_numpy()
+        dollars = (frame['Estimated_Cost'].fillna(frame['Estimated_Proceeds'])
+                   .fillna(frame['Estimated_Premium']).to_numpy(dtype=float))
+        orders = []
+        for i, row in enumerate(frame.itertuples(index=False)):
+            action = OPEN_ACTIONS.get(row.Action, row.Action)
+            sign = -1 if action.startswith('SELL') else 1
+            orders.append({
+                'order_id': int(row.Order_ID),
+                'day': int(row.Day),
+                'symbol': legs.at[i, 'underlying'],
+                'type': 'call' if legs.at[i, 'right'] == 'C' else 'put',
+                'strike': float(legs.at[i, 'strike']),
+                'expiration': legs.at[i, 'expiration'],
+                'quantity': sign * int(quantity[i]),
+                'action': action,
+                'limit_price': round(float(dollars[i]) / (quantity[i] * 100), 4),
+                'priority': row.Priority
+            })
+        return _with_expiry(orders, calendar)
+
+    def hedge_strikes(self) -> Dict[float, float]:
+        """Call hedge ladder weights by strike (the model's hedge_strikes layout)"""
+        hedges = self.load('call_hedge_optimization')
+        return dict(zip(hedges['Strike'].astype(float).tolist(),
+                        (hedges['Allocation_Percentage'] / 100).tolist()))
+
+
+# Usage example
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    logging.disable(logging.INFO)
+    cache_dir = tempfile.mkdtemp(prefix='asst_suite_')
+    loader = SuiteLoader(cache_dir=cache_dir)
+
+    start = time.perf_counter()
+    frames = loader.load_all()
+    cold = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    frames = loader.load_all()
+    warm = (time.perf_counter() - start) * 1e3
+    print(f"{len(frames)} datasets: cold parse {cold:.1f} ms, cached mmap load {warm:.1f} ms")
+
+    validation = frames['model_validation_results']
+    print(validation[['Model_Component', 'Recommended_Size', 'Accuracy_ITM_Puts',
+                      'Overall_Accuracy', 'Protection_Ratio_min', 'Protection_Ratio_max']].to_string())
+    print(frames['benchmark_comparison'][['Strategy_Type', 'Assignment_Rate_min',
+                                          'Assignment_Rate_max']].to_string())
+
+    # Seed the engines directly from the suite
+    from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+    from asst_risk_automation import ASSRiskMonitor, ASSAutomationEngine
+
+    model = ASSTPremiumCompounder()
+    model.hedge_strikes = loader.hedge_strikes()
+    monitor = ASSRiskMonitor(model)
+    automation = ASSAutomationEngine(model, monitor)
+    positions = loader.positions()
+    print(f"Seeded {len(positions)} positions, portfolio assignment probability "
+          f"{monitor.calculate_portfolio_assignment_prob(positions):.1%}")
+    for order in automation.prioritize_orders(loader.orders()):
+        print(order)
+    shutil.rmtree(cache_dir)
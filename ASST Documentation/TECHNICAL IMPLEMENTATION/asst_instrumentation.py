@@ -0,0 +1,413 @@
+"""
+ASST Instrumentation & Profiling Hooks
+Opt-in hot-path timing, latency histograms and sampling profiler
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Instrumentation is installed by wrapping the public methods of the strategy
+classes in place and removed by restoring the original functions, so a
+disabled process runs the untouched code paths with zero added overhead.
+"""
+
+import sys
+import os
+import inspect
+import time
+import threading
+import logging
+import argparse
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Prometheus histogram bucket boundaries (seconds)
+PROMETHEUS_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+REPORTED_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear latency histogram over integer nanoseconds
+
+    Values below 2 * 2**sub_bucket_bits are counted exactly; larger values
+    land in one of 2**sub_bucket_bits linear sub-buckets per power of two,
+    giving a constant relative error of at most 2**-sub_bucket_bits.
+    Recording is O(1) and never allocates after construction.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 5, max_exponent: int = 48):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.counts = [0] * ((max_exponent + 2) * self.sub_bucket_count)
+        self.total_count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Zero all counts in place (timed wrappers keep a reference to this object)"""
+        with self._lock:
+            self.counts[:] = [0] * len(self.counts)
+            self.total_count = 0
+            self.total_ns = 0
+            self.min_ns = None
+            self.max_ns = 0
+
+    def bucket_index(self, value_ns: int) -> int:
+        """Map a value to its bucket index"""
+        if value_ns < 2 * self.sub_bucket_count:
+            return max(0, value_ns)
+        shift = value_ns.bit_length() - self.sub_bucket_bits - 1
+        return shift * self.sub_bucket_count + (value_ns >> shift)
+
+    def bucket_bounds(self, index: int) -> tuple:
+        """Return the [lower, upper) value range of a bucket"""
+        if index < 2 * self.sub_bucket_count:
+            return index, index + 1
+        shift = index // self.sub_bucket_count - 1
+        top = index % self.sub_bucket_count + self.sub_bucket_count
+        return top << shift, (top + 1) << shift
+
+    def record(self, value_ns: int):
+        """Record one observation"""
+        index = min(self.bucket_index(value_ns), len(self.counts) - 1)
+        with self._lock:
+            self.counts[index] += 1
+            self.total_count += 1
+            self.total_ns += value_ns
+            if self.min_ns is None or value_ns < self.min_ns:
+                self.min_ns = value_ns
+            if value_ns > self.max_ns:
+                self.max_ns = value_ns
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile in nanoseconds (bucket upper bound)"""
+        if self.total_count == 0:
+            return 0.0
+        target = max(1, int(round(q * self.total_count)))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return float(min(self.bucket_bounds(index)[1] - 1, self.max_ns))
+        return float(self.max_ns)
+
+    def cumulative_below(self, limit_ns: float) -> int:
+        """Number of observations in buckets entirely at or below limit_ns"""
+        running = 0
+        for index, count in enumerate(self.counts):
+            if count and self.bucket_bounds(index)[1] - 1 > limit_ns:
+                break
+            running += count
+        return running
+
+    def summary(self) -> Dict:
+        """Summary statistics in microseconds"""
+        mean_ns = self.total_ns / self.total_count if self.total_count else 0.0
+        summary = {
+            'count': self.total_count,
+            'mean_us': mean_ns / 1e3,
+            'min_us': (self.min_ns or 0) / 1e3,
+            'max_us': self.max_ns / 1e3
+        }
+        for q in REPORTED_QUANTILES:
+            summary[f'p{q * 100:g}_us'] = self.quantile(q) / 1e3
+        return summary
+
+
+class MetricsRegistry:
+    """Named latency histograms with Prometheus text exposition"""
+
+    def __init__(self, namespace: str = 'asst'):
+        self.namespace = namespace
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Get or create the histogram for a timed operation"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time a block of code into the named histogram"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter_ns() - start)
+
+    def reset(self):
+        """
+        Discard all recorded observations
+
+        Histograms are cleared in place rather than replaced: decorated
+        functions hold on to the histogram they were bound to.
+        """
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.clear()
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-operation latency summary"""
+        return {name: hist.summary() for name, hist in sorted(self.histograms.items())}
+
+    def to_prometheus(self) -> str:
+        """Render all histograms in Prometheus text exposition format (v0.0.4)"""
+        metric = f'{self.namespace}_method_latency_seconds'
+        quantile_metric = f'{self.namespace}_method_latency_quantile_seconds'
+        lines = [
+            f'# HELP {metric} Wall-clock latency of instrumented strategy methods',
+            f'# TYPE {metric} histogram'
+        ]
+        snapshot = sorted(self.histograms.items())
+
+        for name, hist in snapshot:
+            for bound in PROMETHEUS_BUCKETS:
+                count = hist.cumulative_below(bound * 1e9)
+                lines.append(f'{metric}_bucket{{method="{name}",le="{bound:g}"}} {count}')
+            lines.append(f'{metric}_bucket{{method="{name}",le="+Inf"}} {hist.total_count}')
+            lines.append(f'{metric}_sum{{method="{name}"}} {hist.total_ns / 1e9:.9f}')
+            lines.append(f'{metric}_count{{method="{name}"}} {hist.total_count}')
+
+        lines.append(f'# HELP {quantile_metric} HDR histogram latency quantiles')
+        lines.append(f'# TYPE {quantile_metric} gauge')
+        for name, hist in snapshot:
+            for q in REPORTED_QUANTILES:
+                lines.append(f'{quantile_metric}{{method="{name}",quantile="{q:g}"}} '
+                             f'{hist.quantile(q) / 1e9:.9f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Atomically write the exposition to a file (node_exporter textfile collector)"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def serve_prometheus(self, port: int = 9464, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve /metrics over HTTP from a daemon thread"""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"Prometheus metrics served on http://{host}:{server.server_port}/metrics")
+        return server
+
+
+# Process-wide registry used by the instrumentation hooks
+REGISTRY = MetricsRegistry()
+
+# (class, attribute) -> original function, for restoration
+_INSTALLED: Dict[tuple, object] = {}
+
+
+def timed(name: Optional[str] = None, registry: MetricsRegistry = REGISTRY):
+    """Decorator recording every call of a function into a latency histogram"""
+    def decorator(func):
+        metric_name = name or func.__qualname__
+        histogram = registry.histogram(metric_name)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(time.perf_counter_ns() - start)
+
+        wrapper.__asst_instrumented__ = True
+        return wrapper
+    return decorator
+
+
+def public_methods(cls) -> List[str]:
+    """Public plain functions defined on the class itself"""
+    return [name for name, value in vars(cls).items()
+            if not name.startswith('_') and inspect.isfunction(value)]
+
+
+def instrument_class(cls, registry: MetricsRegistry = REGISTRY) -> List[str]:
+    """Wrap every public method of cls with a timer; returns the wrapped names"""
+    wrapped = []
+    for name in public_methods(cls):
+        original = vars(cls)[name]
+        if getattr(original, '__asst_instrumented__', False):
+            continue
+        _INSTALLED[(cls, name)] = original
+        setattr(cls, name, timed(f'{cls.__name__}.{name}', registry)(original))
+        wrapped.append(name)
+    return wrapped
+
+
+def uninstrument_class(cls):
+    """Restore the original methods of cls"""
+    for (owner, name), original in list(_INSTALLED.items()):
+        if owner is cls:
+            setattr(cls, name, original)
+            del _INSTALLED[(owner, name)]
+
+
+def default_targets() -> list:
+    """Strategy classes on the planning and order-generation hot paths"""
+    from ASST_Advanced_Strategy_System import (
+        PositionManager, PremiumCompoundingEngine, CallHedgeOptimizer, RiskManager
+    )
+    from asst_risk_automation import ASSAutomationEngine
+
+    return [PositionManager, PremiumCompoundingEngine, CallHedgeOptimizer,
+            RiskManager, ASSAutomationEngine]
+
+
+def enable_instrumentation(classes: Optional[Iterable] = None,
+                           registry: MetricsRegistry = REGISTRY) -> Dict[str, List[str]]:
+    """
+    Install timers on every public method of the target classes
+
+    Args:
+        classes: Classes to instrument (defaults to default_targets())
+        registry: Registry receiving the observations
+
+    Returns:
+        Mapping of class name to instrumented method names
+    """
+    classes = default_targets() if classes is None else list(classes)
+    installed = {cls.__name__: instrument_class(cls, registry) for cls in classes}
+    logger.info(f"Instrumentation enabled: {installed}")
+    return installed
+
+
+def disable_instrumentation():
+    """Remove all installed timers, restoring zero-overhead code paths"""
+    for cls in {owner for owner, _ in _INSTALLED}:
+        uninstrument_class(cls)
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler emitting collapsed stacks for flame graphs
+
+    A daemon thread snapshots the target thread's stack every interval and
+    counts identical stacks. The output is Brendan Gregg's folded format
+    (frame;frame;frame count), readable by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.001, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        """Begin sampling"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def folded(self) -> str:
+        """Collapsed stacks, one per line"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common()) + '\n'
+
+    def dump(self, path: str):
+        """Write collapsed stacks to a file"""
+        with open(path, 'w') as f:
+            f.write(self.folded())
+        logger.info(f"Profiler wrote {self.samples} samples to {path}")
+
+
+@contextmanager
+def profiled(path: str, interval: float = 0.001):
+    """Run a block under the sampling profiler and dump flame-graph data to path"""
+    profiler = SamplingProfiler(interval).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.dump(path)
+
+
+# Usage example
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the 6-month plan with instrumentation')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--metrics-file', help='Write Prometheus text format to this file')
+    parser.add_argument('--metrics-port', type=int, help='Serve /metrics on this port')
+    parser.add_argument('--profile', help='Dump folded flame-graph stacks to this file')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    from ASST_Advanced_Strategy_System import ASSComprehensiveStrategy
+
+    enable_instrumentation()
+    if args.metrics_port:
+        REGISTRY.serve_prometheus(args.metrics_port)
+
+    def run_plans():
+        for _ in range(args.iterations):
+            strategy = ASSComprehensiveStrategy()
+            for month in range(1, 7):
+                strategy.generate_monthly_plan(month, 1000 * (1.15 ** (month - 1)), 25000 + 5000 * month)
+
+    if args.profile:
+        with profiled(args.profile):
+            run_plans()
+    else:
+        run_plans()
+
+    for name, stats in REGISTRY.summary().items():
+        print(f"{name:55s} n={stats['count']:6d}  p50={stats['p50_us']:8.1f}us  p99={stats['p99_us']:8.1f}us")
+
+    if args.metrics_file:
+        REGISTRY.write_prometheus(args.metrics_file)
+        print(f"\nPrometheus metrics written to {args.metrics_file}")
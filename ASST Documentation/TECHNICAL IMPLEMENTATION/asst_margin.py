@@ -0,0 +1,320 @@
+"""
+ASST Margin & Buying-Power Engine
+Vectorized Reg-T and portfolio-margin requirements for option ladders
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Replaces the weighted_avg_strike * 100 and avg_contract_value = 250
+capacity estimates with the requirement a broker actually holds:
+
+- Reg-T (FINRA 4210 / CBOE naked equity option rule), per leg:
+  short put  = premium + max(20% * S - OTM amount, 10% * K)
+  short call = premium + max(20% * S - OTM amount, 10% * S)
+  long option = premium paid in full
+- Cash-secured puts: K held, offset by the premium received
+- Portfolio margin (TIMS-style): every leg is revalued with Black-Scholes
+  over a +/-15% price scan (optionally with vol shocks); the requirement per
+  underlying is the worst scenario loss, floored at $37.50 per contract.
+
+All per-leg work is one array pass. BuyingPowerLedger keeps running
+totals (and, for portfolio margin, the per-underlying scenario P&L vector)
+so staging one more order costs O(n_scenarios), not a portfolio recompute.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from asst_strategy_core import black_scholes_price
+
+CONTRACT_MULTIPLIER = 100
+
+
+@dataclass
+class OptionLegs:
+    """Column arrays describing option legs (quantity in contracts, negative = short)"""
+    underlying_price: np.ndarray
+    strike: np.ndarray
+    is_call: np.ndarray
+    quantity: np.ndarray
+    premium: np.ndarray            # Per share
+    time_to_expiry: np.ndarray     # Years
+    sigma: np.ndarray              # Decimal implied vol
+
+    @classmethod
+    def from_arrays(cls, underlying_price, strike, is_call, quantity, premium,
+                    time_to_expiry=27 / 365, sigma=4.25) -> 'OptionLegs':
+        arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (
+            underlying_price, strike, is_call, quantity, premium, time_to_expiry, sigma)))
+        arrays = [np.atleast_1d(a).copy() for a in arrays]
+        arrays[2] = arrays[2].astype(bool)
+        return cls(*arrays)
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+
+class MarginEngine:
+    """Per-leg margin requirements computed in single array passes"""
+
+    def __init__(self, scan_range: float = 0.15, scan_points: int = 11,
+                 vol_shocks: Sequence[float] = (0.0,), min_per_contract: float = 37.50,
+                 rate: float = 0.04):
+        self.price_moves = np.linspace(-scan_range, scan_range, scan_points)
+        self.vol_shocks = np.asarray(vol_shocks, dtype=float)
+        self.min_per_contract = min_per_contract
+        self.rate = rate
+
+    def reg_t_requirement(self, legs: OptionLegs) -> np.ndarray:
+        """Reg-T requirement per leg in dollars (short legs include the premium)"""
+        s, k, prem = legs.underlying_price, legs.strike, legs.premium
+        otm = np.where(legs.is_call, np.maximum(k - s, 0.0), np.maximum(s - k, 0.0))
+        floor_base = np.where(legs.is_call, s, k)
+        short_per_share = prem + np.maximum(0.20 * s - otm, 0.10 * floor_base)
+        per_share = np.where(legs.quantity < 0, short_per_share, prem)
+        return per_share * np.abs(legs.quantity) * CONTRACT_MULTIPLIER
+
+    def cash_secured_requirement(self, legs: OptionLegs) -> np.ndarray:
+        """Cash held against short puts (full strike); other legs at Reg-T"""
+        cash_secured = legs.strike * np.abs(legs.quantity) * CONTRACT_MULTIPLIER
+        short_put = (legs.quantity < 0) & ~legs.is_call
+        return np.where(short_put, cash_secured, self.reg_t_requirement(legs))
+
+    def buying_power_effect(self, legs: OptionLegs, requirement: np.ndarray) -> np.ndarray:
+        """Net buying power consumed: short legs are credited their premium"""
+        credit = np.where(legs.quantity < 0,
+                          legs.premium * np.abs(legs.quantity) * CONTRACT_MULTIPLIER, 0.0)
+        return requirement - credit
+
+    def scenario_pnl(self, legs: OptionLegs) -> np.ndarray:
+        """
+        Profit and loss of each leg under every stress scenario
+
+        Returns:
+            (n_legs, n_price_moves * n_vol_shocks) dollar P&L
+        """
+        moves = np.repeat(self.price_moves, len(self.vol_shocks))[None, :]
+        shocks = np.tile(self.vol_shocks, len(self.price_moves))[None, :]
+        s = legs.underlying_price[:, None]
+        k = legs.strike[:, None]
+        t = np.maximum(legs.time_to_expiry, 1e-6)[:, None]
+        sigma = legs.sigma[:, None]
+        is_call = legs.is_call[:, None]
+
+        base = black_scholes_price(s, k, t, sigma, is_call, self.rate)
+        shocked = black_scholes_price(s * (1 + moves), k, t, np.maximum(sigma * (1 + shocks), 1e-4),
+                                      is_call, self.rate)
+        return (shocked - base) * (legs.quantity[:, None] * CONTRACT_MULTIPLIER)
+
+    def portfolio_margin(self, legs: OptionLegs, groups: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Portfolio margin per underlying group
+
+        Args:
+            legs: Option legs
+            groups: Integer group (underlying) id per leg, 0..n_groups-1
+
+        Returns:
+            Dict with per-group 'requirement', 'scenario_pnl' and 'worst_scenario'
+        """
+        groups = np.asarray(groups, dtype=np.intp)
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        pnl = self.scenario_pnl(legs)
+        group_pnl = np.zeros((n_groups, pnl.shape[1]))
+        np.add.at(group_pnl, groups, pnl)
+
+        min_charge = np.bincount(groups, weights=np.abs(legs.quantity) * self.min_per_contract,
+                                 minlength=n_groups)
+        worst_loss = np.maximum(-group_pnl.min(axis=1), 0.0)
+        return {
+            'requirement': np.maximum(worst_loss, min_charge),
+            'scenario_pnl': group_pnl,
+            'worst_scenario': group_pnl.argmin(axis=1)
+        }
+
+    def put_requirement_per_contract(self, strikes, underlying_price, premiums,
+                                     cash_secured: bool = False) -> np.ndarray:
+        """Buying power consumed by one short put at each strike"""
+        legs = OptionLegs.from_arrays(underlying_price, strikes, False, -1, premiums)
+        requirement = (self.cash_secured_requirement(legs) if cash_secured
+                       else self.reg_t_requirement(legs))
+        return self.buying_power_effect(legs, requirement)
+
+    def standalone_requirement(self, legs: OptionLegs, groups: np.ndarray,
+                               method: str = 'reg_t') -> np.ndarray:
+        """
+        Buying power each group of legs consumes on an empty ledger
+
+        The per-group equivalent of BuyingPowerLedger.marginal_requirement,
+        so one contract can be costed at many underlying prices in one pass.
+        """
+        groups = np.asarray(groups, dtype=np.intp)
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+        if method == 'portfolio':
+            debit = np.where(legs.quantity > 0, legs.premium * legs.quantity, 0.0) * CONTRACT_MULTIPLIER
+            return (self.portfolio_margin(legs, groups)['requirement'] +
+                    np.bincount(groups, weights=debit, minlength=n_groups))
+        if method not in ('reg_t', 'cash'):
+            raise ValueError(f"Unknown margin method: {method}")
+        requirement = (self.reg_t_requirement(legs) if method == 'reg_t'
+                       else self.cash_secured_requirement(legs))
+        return np.bincount(groups, weights=self.buying_power_effect(legs, requirement),
+                           minlength=n_groups)
+
+
+class BuyingPowerLedger:
+    """
+    Incremental buying-power tracker for staging orders
+
+    Reg-T requirements are additive, so each order adds its own leg
+    requirement. Portfolio margin keeps the running scenario P&L vector per
+    underlying; an order adds its scenario vector and the marginal
+    requirement is the change in that underlying's worst loss. Short
+    premium is not credited under portfolio margin (the short option's
+    liability offsets the cash), while long premium is always paid in full.
+    """
+
+    def __init__(self, engine: MarginEngine, buying_power: float, method: str = 'reg_t'):
+        if method not in ('reg_t', 'cash', 'portfolio'):
+            raise ValueError(f"Unknown margin method: {method}")
+        self.engine = engine
+        self.method = method
+        self.initial_buying_power = buying_power
+        self.used = 0.0
+        self.staged = []
+        self._scenario_pnl: Dict[str, np.ndarray] = {}
+        self._min_charge: Dict[str, float] = {}
+
+    @property
+    def available(self) -> float:
+        return self.initial_buying_power - self.used
+
+    def _group_requirement(self, pnl: np.ndarray, min_charge: float) -> float:
+        return max(float(-pnl.min()), 0.0, min_charge)
+
+    def _portfolio_delta(self, symbol: str, legs: OptionLegs):
+        """Scenario P&L, minimum charge and marginal requirement of adding legs to a group"""
+        n_scenarios = len(self.engine.price_moves) * len(self.engine.vol_shocks)
+        current = self._scenario_pnl.get(symbol, np.zeros(n_scenarios))
+        current_min = self._min_charge.get(symbol, 0.0)
+        pnl = current + self.engine.scenario_pnl(legs).sum(axis=0)
+        min_charge = current_min + float(np.sum(np.abs(legs.quantity))) * self.engine.min_per_contract
+        debit = float(np.sum(np.where(legs.quantity > 0, legs.premium * legs.quantity, 0.0))
+                      * CONTRACT_MULTIPLIER)
+        marginal = (self._group_requirement(pnl, min_charge) -
+                    self._group_requirement(current, current_min) + debit)
+        return pnl, min_charge, marginal
+
+    def marginal_requirement(self, symbol: str, legs: OptionLegs) -> float:
+        """Buying power a set of legs on one underlying would consume if staged"""
+        if self.method == 'portfolio':
+            return self._portfolio_delta(symbol, legs)[2]
+        requirement = (self.engine.reg_t_requirement(legs) if self.method == 'reg_t'
+                       else self.engine.cash_secured_requirement(legs))
+        return float(np.sum(self.engine.buying_power_effect(legs, requirement)))
+
+    def stage(self, symbol: str, legs: OptionLegs, allow_partial: bool = False) -> bool:
+        """Commit legs if they fit in the remaining buying power"""
+        if self.method == 'portfolio':
+            pnl, min_charge, marginal = self._portfolio_delta(symbol, legs)
+        else:
+            marginal = self.marginal_requirement(symbol, legs)
+        if marginal > self.available and not allow_partial:
+            return False
+
+        self.used += marginal
+        self.staged.append((symbol, legs, marginal))
+        if self.method == 'portfolio':
+            self._scenario_pnl[symbol] = pnl
+            self._min_charge[symbol] = min_charge
+        return True
+
+    def max_contracts(self, symbol: str, unit_leg: OptionLegs, budget: Optional[float] = None) -> int:
+        """
+        Largest whole number of contracts of a one-contract leg that fits
+
+        Reg-T and cash requirements are linear in quantity. Under portfolio
+        margin the worst loss is the max of lines in quantity, so the bound
+        is the minimum over scenarios of (cap - loss_s) / slope_s.
+        """
+        budget = self.available if budget is None else min(budget, self.available)
+        if budget <= 0:
+            return 0
+
+        if self.method != 'portfolio':
+            per_contract = self.marginal_requirement(symbol, unit_leg)
+            return int(budget // per_contract) if per_contract > 0 else 0
+
+        n_scenarios = len(self.engine.price_moves) * len(self.engine.vol_shocks)
+        current = self._scenario_pnl.get(symbol, np.zeros(n_scenarios))
+        current_min = self._min_charge.get(symbol, 0.0)
+        before = self._group_requirement(current, current_min)
+        unit_pnl = self.engine.scenario_pnl(unit_leg).sum(axis=0)
+        cash_flow = float(unit_leg.premium[0]) * CONTRACT_MULTIPLIER if unit_leg.quantity[0] > 0 else 0.0
+
+        # Requirement after q contracts: max_s(-(current_s + q * unit_s)) + q * cash_flow <= before + budget
+        loss_now = -current
+        slope = -unit_pnl + cash_flow
+        cap = before + budget
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bounds = np.where(slope > 0, (cap - loss_now) / slope, np.inf)
+        min_slope = self.engine.min_per_contract + cash_flow
+        min_bound = (cap - current_min) / min_slope if min_slope > 0 else np.inf
+        q = min(float(bounds.min()), min_bound)
+        return int(max(np.floor(q + 1e-9), 0)) if np.isfinite(q) else 0
+
+
+def short_put_ladder(underlying_price: float, strikes, weights, sigma=4.25,
+                     time_to_expiry: float = 27 / 365) -> OptionLegs:
+    """
+    One short put contract spread across a strike ladder
+
+    Each strike carries -weight contracts (weights summing to 1), priced
+    with Black-Scholes, so max_contracts on this unit sizes the whole ladder.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    premium = black_scholes_price(underlying_price, strikes, time_to_expiry, sigma, False)
+    return OptionLegs.from_arrays(underlying_price, strikes, False, -np.asarray(weights, dtype=float),
+                                  premium, time_to_expiry, sigma)
+
+
+# Usage example
+if __name__ == "__main__":
+    import time
+
+    engine = MarginEngine()
+    rng = np.random.default_rng(1)
+    n = 10000
+    legs = OptionLegs.from_arrays(
+        underlying_price=2.40,
+        strike=rng.choice([1.5, 2.0, 2.5, 3.0, 4.0, 5.0], n),
+        is_call=rng.random(n) < 0.2,
+        quantity=-rng.integers(1, 20, n),
+        premium=rng.uniform(0.2, 1.2, n),
+        sigma=4.25
+    )
+
+    start = time.perf_counter()
+    reg_t = engine.reg_t_requirement(legs)
+    reg_t_ms = (time.perf_counter() - start) * 1e3
+    start = time.perf_counter()
+    pm = engine.portfolio_margin(legs, np.zeros(n, dtype=int))
+    pm_ms = (time.perf_counter() - start) * 1e3
+
+    print(f"{n} legs: Reg-T ${reg_t.sum():,.0f} in {reg_t_ms:.2f} ms, "
+          f"portfolio margin ${pm['requirement'][0]:,.0f} in {pm_ms:.2f} ms")
+
+    # Per-contract capacity vs the legacy flat estimates
+    strikes = np.array([2.0, 2.5, 3.0, 4.0, 5.0])
+    premiums = np.array([0.58, 0.97, 1.22, 2.22, 2.92])
+    print("Reg-T BP per short put:", np.round(engine.put_requirement_per_contract(strikes, 2.40, premiums), 2))
+    print("Cash-secured per put:  ", np.round(engine.put_requirement_per_contract(strikes, 2.40, premiums, True), 2))
+
+    ledger = BuyingPowerLedger(engine, buying_power=10000, method='portfolio')
+    unit = OptionLegs.from_arrays(2.40, 2.5, False, -1, 0.97)
+    fit = ledger.max_contracts('ASST', unit)
+    start = time.perf_counter()
+    staged = sum(ledger.stage('ASST', unit) for _ in range(fit + 5))
+    per_stage_us = (time.perf_counter() - start) / (fit + 5) * 1e6
+    print(f"Portfolio margin: {fit} contracts fit, {staged} staged, "
+          f"${ledger.available:,.0f} BP left, {per_stage_us:.0f} us per staged order")
@@ -0,0 +1,293 @@
+"""
+ASST Multi-Book Portfolio Orchestration
+Runs the accumulation playbook across many symbols and accounts in parallel
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Each book is an independent ASSComprehensiveStrategy (one symbol, one
+account, its own StrategyParameters). Plan generation is CPU-bound Python
+that holds the GIL, so books are evaluated in parallel in a process pool:
+each worker receives its book's strategy (with its compounding history and
+alert state) and sends the updated strategy back, so state carries across
+months exactly as it does in-process. A thread pool is kept for debugging
+and small runs; it gives identical results but no parallel speedup.
+Workers write each book's risk figures straight into its row of a single
+firm-wide ledger matrix (in shared memory for processes), so firm-wide
+aggregation is a column reduction over that matrix rather than a gather of
+per-book copies.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ASST_Advanced_Strategy_System import ASSComprehensiveStrategy, StrategyParameters
+
+logger = logging.getLogger(__name__)
+
+# Per-book risk columns written by workers into the firm ledger
+LEDGER_FIELDS = (
+    'portfolio_value',
+    'position_size',
+    'daily_var_95',
+    'daily_var_99',
+    'max_drawdown',
+    'total_put_capital',
+    'call_budget',
+    'new_contracts'
+)
+FIELD_INDEX = {name: i for i, name in enumerate(LEDGER_FIELDS)}
+
+
+@dataclass
+class MarketData:
+    """Shared market state keyed by symbol"""
+    prices: Dict[str, float]
+    vol_surfaces: Dict[str, object] = field(default_factory=dict)
+
+    def price(self, symbol: str) -> float:
+        return self.prices[symbol]
+
+    def surface(self, symbol: str):
+        return self.vol_surfaces.get(symbol)
+
+
+@dataclass
+class Book:
+    """One symbol traded in one account with its own strategy parameters"""
+    book_id: str
+    account: str
+    params: StrategyParameters
+    portfolio_value: float
+    premium_collected: float
+
+    @property
+    def symbol(self) -> str:
+        return self.params.symbol
+
+
+class FirmRiskLedger:
+    """
+    (n_books x n_fields) risk matrix, optionally backed by shared memory
+
+    Workers receive only the ledger's name and their row index; every
+    aggregate is a vectorized reduction over the matrix.
+    """
+
+    def __init__(self, n_books: int, shared: bool = False, name: Optional[str] = None):
+        shape = (n_books, len(LEDGER_FIELDS))
+        nbytes = int(np.prod(shape)) * np.dtype(np.float64).itemsize
+        self._shm = None
+        if shared or name is not None:
+            self._shm = shared_memory.SharedMemory(name=name, create=name is None, size=max(nbytes, 1))
+            self.values = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf)
+            if name is None:
+                self.values[:] = 0.0
+        else:
+            self.values = np.zeros(shape)
+
+    @property
+    def name(self) -> Optional[str]:
+        return None if self._shm is None else self._shm.name
+
+    def write(self, row: int, metrics: Dict[str, float]):
+        """Store one book's risk figures in place"""
+        for key, value in metrics.items():
+            self.values[row, FIELD_INDEX[key]] = value
+
+    def column(self, field_name: str) -> np.ndarray:
+        """Zero-copy view of one risk field across all books"""
+        return self.values[:, FIELD_INDEX[field_name]]
+
+    def close(self, unlink: bool = False):
+        if self._shm is not None:
+            self.values = None
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+            self._shm = None
+
+
+def book_risk_row(plan: Dict, portfolio_value: float) -> Dict[str, float]:
+    """Convert a monthly plan into the ledger's dollar-denominated risk fields"""
+    risk = plan['risk_metrics']
+    return {
+        'portfolio_value': portfolio_value,
+        'position_size': risk['asst_position_size'],
+        'daily_var_95': portfolio_value * risk['var_95_%'] / 100,
+        'daily_var_99': portfolio_value * risk['var_99_%'] / 100,
+        'max_drawdown': risk['asst_position_size'] * risk['max_drawdown_estimate_%'] / 100,
+        'total_put_capital': plan['premium_allocation']['total_put_capital'],
+        'call_budget': plan['premium_allocation']['call_allocation'],
+        'new_contracts': plan['premium_allocation']['estimated_new_contracts']
+    }
+
+
+def _book_plan(strategy: ASSComprehensiveStrategy, book: Book, market: MarketData,
+               month: int) -> Dict:
+    """One month of a book's persistent strategy at today's market"""
+    # Price this month on a copy: book.params may be shared between books
+    params = replace(book.params, asst_current_price=market.price(book.symbol),
+                     vol_surface=market.surface(book.symbol))
+    for component in (strategy, strategy.position_manager, strategy.premium_engine,
+                      strategy.hedge_optimizer, strategy.risk_manager):
+        component.params = params
+    return strategy.generate_monthly_plan(month, book.premium_collected, book.portfolio_value)
+
+
+def _evaluate_book_in_process(strategy: ASSComprehensiveStrategy, book: Book, market: MarketData,
+                              month: int, ledger_name: str, n_books: int, row: int):
+    """Process-pool worker: advances the book's strategy and returns it with the plan"""
+    plan = _book_plan(strategy, book, market, month)
+
+    ledger = FirmRiskLedger(n_books, name=ledger_name)
+    ledger.write(row, book_risk_row(plan, book.portfolio_value))
+    ledger.close()
+    return plan, strategy
+
+
+class BookOrchestrator:
+    """Evaluates every book on a worker pool and aggregates firm-wide risk"""
+
+    def __init__(self, books: List[Book], market: MarketData, max_workers: int = None,
+                 use_processes: bool = True):
+        self.books = books
+        self.market = market
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.strategies = {book.book_id: ASSComprehensiveStrategy(book.params) for book in books}
+        self.ledger = FirmRiskLedger(len(books), shared=use_processes)
+        self.alert_engine = None    # RuleEngine evaluated over every book's ledger row
+
+        self.symbols = sorted({book.symbol for book in books})
+        self.accounts = sorted({book.account for book in books})
+        self._symbol_index = np.array([self.symbols.index(book.symbol) for book in books])
+        self._account_index = np.array([self.accounts.index(book.account) for book in books])
+
+    def _evaluate_book(self, row: int, month: int) -> Dict:
+        """Thread-pool worker (GIL-bound: same results as processes, no speedup)"""
+        book = self.books[row]
+        plan = _book_plan(self.strategies[book.book_id], book, self.market, month)
+        self.ledger.write(row, book_risk_row(plan, book.portfolio_value))
+        return plan
+
+    def evaluate_month(self, month: int) -> Dict[str, Dict]:
+        """
+        Generate every book's monthly plan in parallel
+
+        Returns:
+            Mapping of book_id to monthly plan
+        """
+        if self.use_processes:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [
+                    pool.submit(_evaluate_book_in_process, self.strategies[book.book_id], book,
+                                self.market, month, self.ledger.name, len(self.books), row)
+                    for row, book in enumerate(self.books)
+                ]
+                plans = []
+                for book, future in zip(self.books, futures):
+                    plan, self.strategies[book.book_id] = future.result()
+                    plans.append(plan)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                plans = list(pool.map(lambda row: self._evaluate_book(row, month),
+                                      range(len(self.books))))
+
+        logger.info(f"Evaluated {len(plans)} books for month {month}")
+        return {book.book_id: plan for book, plan in zip(self.books, plans)}
+
+    def _group_sum(self, index: np.ndarray, n_groups: int) -> np.ndarray:
+        """Sum every ledger column within groups in one pass"""
+        totals = np.zeros((n_groups, len(LEDGER_FIELDS)))
+        np.add.at(totals, index, self.ledger.values)
+        return totals
+
+    def firm_risk(self, correlation: Optional[np.ndarray] = None) -> Dict:
+        """
+        Aggregate firm-wide risk from the ledger
+
+        VaR is additive within a symbol (same underlying); across symbols it
+        is combined with the supplied correlation matrix, or summed
+        (perfect correlation) when none is given.
+
+        Returns:
+            Firm totals plus per-symbol and per-account DataFrames
+        """
+        by_symbol = self._group_sum(self._symbol_index, len(self.symbols))
+        by_account = self._group_sum(self._account_index, len(self.accounts))
+        totals = self.ledger.values.sum(axis=0)
+
+        result = {name: float(totals[i]) for i, name in enumerate(LEDGER_FIELDS)}
+        if correlation is not None:
+            for var_field in ('daily_var_95', 'daily_var_99'):
+                v = by_symbol[:, FIELD_INDEX[var_field]]
+                result[f'diversified_{var_field}'] = float(np.sqrt(v @ correlation @ v))
+
+        result['concentration_%'] = (result['position_size'] / result['portfolio_value'] * 100
+                                     if result['portfolio_value'] else 0.0)
+        result['by_symbol'] = pd.DataFrame(by_symbol, index=pd.Index(self.symbols, name='symbol'),
+                                           columns=LEDGER_FIELDS)
+        result['by_account'] = pd.DataFrame(by_account, index=pd.Index(self.accounts, name='account'),
+                                            columns=LEDGER_FIELDS)
+        return result
+
+    def book_risk(self) -> pd.DataFrame:
+        """Per-book ledger rows plus the RiskManager's percentage metrics"""
+        frame = pd.DataFrame(self.ledger.values, index=[book.book_id for book in self.books],
+                             columns=LEDGER_FIELDS)
+        value = frame['portfolio_value'].where(frame['portfolio_value'] != 0)
+        concentration = frame['position_size'] / value
+        return frame.assign(**{
+            'concentration_%': concentration * 100,
+            'var_95_%': frame['daily_var_95'] / value * 100,
+            'assignment_risk_score': np.minimum(10, concentration * 10)
+        })
+
+    def check_alerts(self, now: Optional[float] = None) -> List[Dict]:
+        """Evaluate the alert engine over all books in one update"""
+        if self.alert_engine is None:
+            return []
+        return self.alert_engine.update(self.book_risk(), now=now)
+
+    def close(self):
+        """Release the shared-memory ledger"""
+        self.ledger.close(unlink=True)
+
+
+# Usage example
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+
+    market = MarketData(prices={'ASST': 2.40, 'MSTR': 310.0, 'SMLR': 28.5})
+    books = []
+    for account in ('IRA', 'Taxable'):
+        for symbol, price in market.prices.items():
+            params = StrategyParameters(symbol=symbol, asst_current_price=price)
+            books.append(Book(f'{account}-{symbol}', account, params,
+                              portfolio_value=25000, premium_collected=1000))
+
+    from asst_alert_rules import RISK_MANAGER_RULES, RuleEngine
+
+    orchestrator = BookOrchestrator(books, market, max_workers=4)
+    orchestrator.alert_engine = RuleEngine(RISK_MANAGER_RULES)
+    for month in range(1, 4):
+        plans = orchestrator.evaluate_month(month)
+        risk = orchestrator.firm_risk(correlation=np.array([[1.0, 0.6, 0.3],
+                                                            [0.6, 1.0, 0.3],
+                                                            [0.3, 0.3, 1.0]]))
+        print(f"\nMonth {month}: {len(plans)} books")
+        print(f"  Firm VaR 95 (additive):    ${risk['daily_var_95']:,.0f}")
+        print(f"  Firm VaR 95 (diversified): ${risk['diversified_daily_var_95']:,.0f}")
+        print(f"  New contracts: {risk['new_contracts']:.0f}")
+        for alert in orchestrator.check_alerts():
+            print(f"  ALERT {alert['book']}: {alert['message']}")
+
+    print("\nRisk by symbol:")
+    print(risk['by_symbol'][['portfolio_value', 'daily_var_95', 'new_contracts']].to_string())
+    orchestrator.close()
@@ -0,0 +1,269 @@
+"""
+ASST Pre-Trade Risk Gate
+Incremental accept/reject checks for orders before submission
+Author: Quantitative Strategy Team
+Date: October 2025
+
+The gate keeps four running aggregates for the book: net dollar delta,
+assignment exposure (share value plus short put notional), call hedge
+delta, and buying power used. An order changes each of them by its own
+contribution, so checking it costs a handful of float operations instead
+of a portfolio recompute:
+
+- VaR 95% = 1.645 * |net dollar delta| * daily vol / portfolio value
+- Concentration = assignment exposure / portfolio value
+- Hedge ratio = call hedge delta / (share + short put delta)
+- Margin = buying power used + order requirement vs buying power
+
+An order is rejected only if it moves a hard-limited metric beyond its
+limit, or further beyond a limit that is already breached. Orders that
+reduce a breach always pass. Long calls bought while the hedge ratio is
+short of its minimum are not rated as VaR breaches: in this delta model
+they add delta on the same side as the short puts, but they are exactly
+the orders the hedge-ratio warning asks for. The order path uses only
+scalar math (no per-order array allocation), which keeps a check in the
+low microseconds.
+"""
+
+import math
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from asst_margin import CONTRACT_MULTIPLIER, MarginEngine, OptionLegs
+
+logger = logging.getLogger(__name__)
+
+Z_95 = 1.645
+SQRT_2 = math.sqrt(2.0)
+
+
+@dataclass
+class GateLimits:
+    """Pre-trade limits (same units as ASSRiskMonitor.risk_thresholds)"""
+    max_daily_var: float = 0.05
+    max_concentration: float = 1.00
+    min_hedge_ratio: float = 0.25
+    # Hedge ratio is a WARNING in daily_risk_check, so it flags but does not block
+    hard_limits: Tuple[str, ...] = ('var', 'concentration', 'margin')
+
+    @classmethod
+    def from_thresholds(cls, thresholds: Dict[str, float], **kwargs) -> 'GateLimits':
+        return cls(max_daily_var=thresholds['max_daily_var'],
+                   max_concentration=thresholds['max_concentration'],
+                   min_hedge_ratio=thresholds['min_hedge_ratio'], **kwargs)
+
+
+@dataclass
+class GateDecision:
+    """Outcome of one pre-trade check"""
+    accepted: bool
+    breaches: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    var_95: float = 0.0
+    concentration: float = 0.0
+    hedge_ratio: float = 0.0
+    margin_used: float = 0.0
+
+
+def _option_delta(spot: float, strike: float, t: float, sigma: float,
+                  is_call: bool, rate: float) -> float:
+    """Scalar Black-Scholes delta (math module, no array overhead)"""
+    if t <= 0 or sigma <= 0:
+        itm = spot > strike if is_call else spot < strike
+        return (1.0 if is_call else -1.0) if itm else 0.0
+    vol_t = sigma * math.sqrt(t)
+    d1 = (math.log(spot / strike) + (rate + 0.5 * sigma * sigma) * t) / vol_t
+    n_d1 = 0.5 * (1.0 + math.erf(d1 / SQRT_2))
+    return n_d1 if is_call else n_d1 - 1.0
+
+
+class PreTradeRiskGate:
+    """Delta-based running risk state with per-order marginal checks"""
+
+    def __init__(self, portfolio_value: float, spot: float, buying_power: float,
+                 limits: Optional[GateLimits] = None, sigma: float = 4.25,
+                 rate: float = 0.04, days_to_expiry: int = 27,
+                 margin_engine: Optional[MarginEngine] = None, calendar=None):
+        self.portfolio_value = portfolio_value
+        self.spot = spot
+        self.buying_power = buying_power
+        self.limits = limits or GateLimits()
+        self.sigma = sigma
+        self.rate = rate
+        self.days_to_expiry = days_to_expiry
+        self.margin_engine = margin_engine or MarginEngine()
+        self.calendar = calendar    # ExpiryCalendar; resolves 'expiration' labels
+        self.daily_vol = sigma / math.sqrt(252)
+
+        self.net_delta = 0.0        # Dollar delta
+        self.exposure = 0.0         # Share value + short put notional
+        self.hedge_delta = 0.0      # Long call dollar delta
+        self.long_delta = 0.0       # Share + short put dollar delta
+        self.margin_used = 0.0
+        self.accepted = 0
+        self.rejections: List[Tuple[Dict, GateDecision]] = []
+
+    @classmethod
+    def from_positions(cls, positions: List[Dict], portfolio_value: float, spot: float,
+                       buying_power: float, **kwargs) -> 'PreTradeRiskGate':
+        """Initialise the running state from current positions"""
+        gate = cls(portfolio_value, spot, buying_power, **kwargs)
+        for position in positions:
+            gate.apply(gate.impact(position))
+        gate.margin_used = 0.0  # Existing margin is already out of buying_power
+        return gate
+
+    def impact(self, order: Dict) -> Tuple[float, float, float, float, float]:
+        """
+        Marginal contribution of an order or position
+
+        Returns:
+            (net_delta, exposure, hedge_delta, long_delta, margin) changes
+        """
+        quantity = order['quantity']
+        kind = order.get('type', 'put')
+        if kind == 'stock':
+            dollars = quantity * self.spot
+            return dollars, dollars, 0.0, dollars, 0.0
+
+        strike = order['strike']
+        is_call = kind == 'call'
+        days = order.get('days_to_expiry')
+        if days is None:
+            days = (self.calendar.days_to_expiry(order['expiration'])
+                    if self.calendar is not None and 'expiration' in order else self.days_to_expiry)
+        t = days / 365
+        sigma = order.get('sigma', self.sigma)
+        delta = order.get('delta')
+        if delta is None:
+            delta = _option_delta(self.spot, strike, t, sigma, is_call, self.rate)
+        dollars = quantity * CONTRACT_MULTIPLIER * delta * self.spot
+
+        exposure = -quantity * CONTRACT_MULTIPLIER * strike if (not is_call and quantity < 0) else 0.0
+        hedge = dollars if (is_call and quantity > 0) else 0.0
+        long_side = dollars if (not is_call and quantity < 0) else 0.0
+
+        margin = order.get('margin_requirement')
+        if margin is None:
+            margin = self._margin(order, strike, is_call, t, sigma)
+        return dollars, exposure, hedge, long_side, margin
+
+    def _margin(self, order: Dict, strike: float, is_call: bool, t: float, sigma: float) -> float:
+        """Slow path for orders without a staged requirement: one-leg Reg-T"""
+        premium = order.get('limit_price', order.get('estimated_premium', 0.0))
+        legs = OptionLegs.from_arrays(self.spot, strike, is_call, order['quantity'], premium, t, sigma)
+        engine = self.margin_engine
+        return float(engine.buying_power_effect(legs, engine.reg_t_requirement(legs))[0])
+
+    def _metrics(self, net_delta, exposure, hedge_delta, long_delta):
+        pv = self.portfolio_value
+        if pv > 0:
+            var_95 = Z_95 * abs(net_delta) * self.daily_vol / pv
+            concentration = exposure / pv
+        else:
+            # Flat account: no risk until something is held
+            var_95 = 0.0 if net_delta == 0 else math.inf
+            concentration = 0.0 if exposure == 0 else math.inf
+        hedge_ratio = hedge_delta / long_delta if long_delta > 0 else math.inf
+        return var_95, concentration, hedge_ratio
+
+    @property
+    def metrics(self) -> Dict[str, float]:
+        var_95, concentration, hedge_ratio = self._metrics(
+            self.net_delta, self.exposure, self.hedge_delta, self.long_delta)
+        return {
+            'var_95': var_95,
+            'concentration': concentration,
+            'hedge_ratio': hedge_ratio,
+            'margin_used': self.margin_used,
+            'buying_power_available': self.buying_power - self.margin_used
+        }
+
+    def check(self, order: Dict) -> GateDecision:
+        """Evaluate an order's marginal effect without changing state"""
+        d_delta, d_exposure, d_hedge, d_long, d_margin = self.impact(order)
+        lim = self.limits
+        before = self._metrics(self.net_delta, self.exposure, self.hedge_delta, self.long_delta)
+        after = self._metrics(self.net_delta + d_delta, self.exposure + d_exposure,
+                              self.hedge_delta + d_hedge, self.long_delta + d_long)
+        margin_after = self.margin_used + d_margin
+
+        # Buying back hedge shortfall takes precedence over the VaR it adds
+        closes_hedge_gap = d_hedge > 0 and before[2] < lim.min_hedge_ratio
+
+        flagged = []
+        if after[0] > lim.max_daily_var and after[0] > before[0] and not closes_hedge_gap:
+            flagged.append('var')
+        if after[1] > lim.max_concentration and after[1] > before[1]:
+            flagged.append('concentration')
+        if after[2] < lim.min_hedge_ratio and after[2] < before[2]:
+            flagged.append('hedge_ratio')
+        if margin_after > self.buying_power and d_margin > 0:
+            flagged.append('margin')
+
+        breaches = [name for name in flagged if name in lim.hard_limits]
+        return GateDecision(
+            accepted=not breaches,
+            breaches=breaches,
+            warnings=[name for name in flagged if name not in lim.hard_limits],
+            var_95=after[0],
+            concentration=after[1],
+            hedge_ratio=after[2],
+            margin_used=margin_after
+        )
+
+    def apply(self, impact: Tuple[float, float, float, float, float]):
+        d_delta, d_exposure, d_hedge, d_long, d_margin = impact
+        self.net_delta += d_delta
+        self.exposure += d_exposure
+        self.hedge_delta += d_hedge
+        self.long_delta += d_long
+        self.margin_used += d_margin
+
+    def submit(self, order: Dict) -> GateDecision:
+        """Check an order and, if accepted, fold it into the running state"""
+        decision = self.check(order)
+        if decision.accepted:
+            self.apply(self.impact(order))
+            self.accepted += 1
+        else:
+            self.rejections.append((order, decision))
+            logger.info(f"Order rejected ({', '.join(decision.breaches)}): "
+                        f"{order.get('action', '')} {order['quantity']} {order.get('strike', '')}")
+        return decision
+
+
+# Usage example
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+
+    positions = [
+        {'symbol': 'ASST', 'type': 'stock', 'quantity': 2200},
+        {'symbol': 'ASST', 'type': 'put', 'strike': 2.5, 'quantity': -22}
+    ]
+    gate = PreTradeRiskGate.from_positions(positions, portfolio_value=50000, spot=2.40,
+                                           buying_power=20000,
+                                           limits=GateLimits(max_daily_var=0.25))
+    print("Current:", {k: round(v, 3) for k, v in gate.metrics.items()})
+
+    rng = np.random.default_rng(2)
+    orders = [{
+        'symbol': 'ASST',
+        'type': 'call' if rng.random() < 0.3 else 'put',
+        'strike': float(rng.choice([2.0, 2.5, 3.0, 5.0, 7.5])),
+        'quantity': int(rng.integers(1, 6)) * (1 if rng.random() < 0.3 else -1),
+        'days_to_expiry': 27,
+        'margin_requirement': float(rng.uniform(50, 400))
+    } for _ in range(20000)]
+
+    start = time.perf_counter()
+    decisions = [gate.submit(order) for order in orders]
+    per_order_us = (time.perf_counter() - start) / len(orders) * 1e6
+
+    print(f"{len(orders)} orders: {gate.accepted} accepted, {len(gate.rejections)} rejected, "
+          f"{per_order_us:.1f} us per check")
+    print("After:  ", {k: round(v, 3) for k, v in gate.metrics.items()})
@@ -9,6 +9,13 @@ import numpy as np
 from datetime import datetime, timedelta
 import json
 
+from asst_alert_rules import RuleEngine, daily_risk_rules
+from asst_assignment_forecast import AssignmentCashFlowForecaster
+from asst_margin import BuyingPowerLedger, MarginEngine, OptionLegs, short_put_ladder
+from asst_pretrade_gate import GateLimits, PreTradeRiskGate
+from asst_roll_optimizer import RollOptimizer
+from asst_strategy_core import black_scholes_price
+
 class ASSRiskMonitor:
     """
     Real-time risk monitoring and portfolio optimization
@@ -23,31 +30,85 @@ class ASSRiskMonitor:
             'min_hedge_ratio': 0.25,     # 25% minimum hedge ratio
             'max_position_scaling': 0.20 # 20% monthly scaling limit
         }
+        self.assignment_forecaster = AssignmentCashFlowForecaster(model)
+        # Compiled from risk_thresholds; rebuild it after changing the thresholds
+        self.alert_engine = RuleEngine(daily_risk_rules(self.risk_thresholds))
+
+    def account_value(self, current_positions, buying_power=0.0):
+        """
+        Net liquidation value implied by the positions: free buying power,
+        plus cash held against short puts, plus the positions' market value
+        (negative for shorts). Capital base for concentration and VaR; zero
+        for a flat book with no buying power.
+        """
+        collateral = sum(-pos['quantity'] * 100 * pos['strike'] for pos in current_positions
+                         if pos.get('type', 'put') == 'put' and pos['quantity'] < 0)
+        market_value = sum(pos['value'] if 'value' in pos
+                           else pos['quantity'] * self.model.current_price
+                           for pos in current_positions if pos.get('type') == 'stock' or 'value' in pos)
+        value = buying_power + collateral + market_value
+        if value < 0 or (value == 0 and any(pos['quantity'] for pos in current_positions)):
+            raise ValueError(f"Positions imply a non-positive account value: {value:,.2f}")
+        return value
+
+    def pretrade_gate(self, current_positions, buying_power):
+        """Pre-trade gate seeded with current positions and these thresholds"""
+        sigma = 4.25
+        if self.model.vol_surface is not None:
+            spot = self.model.current_price
+            sigma = float(self.model.vol_surface.sigma(spot, 27 / 365, spot))
+        return PreTradeRiskGate.from_positions(
+            current_positions, self.account_value(current_positions, buying_power),
+            self.model.current_price, buying_power,
+            limits=GateLimits.from_thresholds(self.risk_thresholds), sigma=sigma)
+
+    def calculate_portfolio_assignment_prob(self, current_positions):
+        """Contract-weighted assignment probability of open short puts"""
+        contracts = self.assignment_forecaster.short_put_contracts(current_positions)
+        return float(contracts['probability'].mean()) if len(contracts) else 0.0
+
+    def calculate_hedge_ratio(self, current_positions, buying_power=0.0, gate=None):
+        """Call hedge delta relative to share and short put delta"""
+        gate = gate or self.pretrade_gate(current_positions, buying_power)
+        return gate.metrics['hedge_ratio']
+
+    def calculate_concentration(self, current_positions, buying_power=0.0, gate=None):
+        """Share value plus short put notional relative to the account"""
+        gate = gate or self.pretrade_gate(current_positions, buying_power)
+        return gate.metrics['concentration']
+
+    def calculate_risk_score(self, assignment_prob, hedge_ratio, concentration):
+        """
+        0-10 composite: concentration (up to 4), assignment probability (up
+        to 3) and hedge shortfall against the minimum ratio (up to 3)
+        """
+        hedge_shortfall = max(0.0, 1 - hedge_ratio / self.risk_thresholds['min_hedge_ratio'])
+        score = 4 * min(concentration, 1.0) + 3 * assignment_prob + 3 * min(hedge_shortfall, 1.0)
+        return round(min(10.0, score), 1)
 
     def daily_risk_check(self, current_positions, market_data):
         """Daily risk assessment and alerts"""
-        alerts = []
-
         # Calculate current metrics
         portfolio_value = sum([pos['value'] for pos in current_positions])
         assignment_prob = self.calculate_portfolio_assignment_prob(current_positions)
-        hedge_ratio = self.calculate_hedge_ratio(current_positions)
-        concentration = self.calculate_concentration(current_positions)
-
-        # Check thresholds
-        if assignment_prob > self.risk_thresholds['max_assignment_rate']:
-            alerts.append({
-                'type': 'INFO',  # This is actually desired
-                'message': f'High assignment probability: {assignment_prob:.1%}',
-                'recommendation': 'Prepare capital for assignments'
-            })
-
-        if hedge_ratio < self.risk_thresholds['min_hedge_ratio']:
-            alerts.append({
-                'type': 'WARNING',
-                'message': f'Low hedge ratio: {hedge_ratio:.1%}',
-                'recommendation': 'Increase call hedge positions'
-            })
+        buying_power = market_data.get('buying_power', 0.0)
+        gate = self.pretrade_gate(current_positions, buying_power)
+        hedge_ratio = self.calculate_hedge_ratio(current_positions, gate=gate)
+        concentration = self.calculate_concentration(current_positions, gate=gate)
+        assignment_forecast = self.assignment_forecaster.forecast(current_positions)
+        cash_p95 = assignment_forecast['total'].cash_quantiles((0.95,))[0]
+
+        # Check thresholds: report every active breach; the engine's sinks
+        # are notified only when one starts
+        metrics = {
+            'assignment_probability': assignment_prob,
+            'hedge_ratio': hedge_ratio,
+            'concentration': concentration,
+            'assignment_cash_p95': cash_p95
+        }
+        self.alert_engine.update(metrics)
+        alerts = [{key: alert[key] for key in ('type', 'message', 'recommendation')}
+                  for alert in self.alert_engine.alerts_for(metrics)]
 
         return {
             'date': datetime.now().strftime('%Y-%m-%d'),
@@ -55,6 +116,7 @@ class ASSRiskMonitor:
             'assignment_probability': assignment_prob,
             'hedge_ratio': hedge_ratio,
             'concentration': concentration,
+            'assignment_cash_forecast': assignment_forecast['table'],
             'alerts': alerts,
             'risk_score': self.calculate_risk_score(assignment_prob, hedge_ratio, concentration)
         }
@@ -86,13 +148,20 @@ class ASSAutomationEngine:
     Automation engine for systematic execution
     """
 
-    def __init__(self, model, risk_monitor):
+    def __init__(self, model, risk_monitor, margin_engine=None, margin_method=None,
+                 days_to_expiry=27):
         self.model = model
         self.risk_monitor = risk_monitor
+        self.margin_engine = margin_engine or MarginEngine()
+        # 'reg_t', 'cash' or 'portfolio'; defaults to the method the model plans with
+        self.margin_method = margin_method or model.margin_method
+        self.days_to_expiry = days_to_expiry
 
     def generate_daily_orders(self, available_capital, current_positions):
         """Generate optimized daily order recommendations"""
         orders = []
+        ledger = BuyingPowerLedger(self.margin_engine, available_capital, self.margin_method)
+        gate = self.risk_monitor.pretrade_gate(current_positions, available_capital)
 
         # Analyze current portfolio
         portfolio_analysis = self.analyze_current_portfolio(current_positions)
@@ -105,25 +174,156 @@ class ASSAutomationEngine:
         # Generate put orders based on strike weights
         put_orders = self.generate_put_orders(
             allocation['total_put_capital'], 
-            self.model.strike_weights
+            self.model.strike_weights,
+            ledger,
+            gate
         )
         orders.extend(put_orders)
 
         # Generate hedge orders
         hedge_orders = self.generate_hedge_orders(
             allocation['call_hedge_budget'],
-            self.model.hedge_strikes
+            self.model.hedge_strikes,
+            ledger,
+            gate
         )
         orders.extend(hedge_orders)
 
         return {
             'date': datetime.now().strftime('%Y-%m-%d'),
             'orders': orders,
+            'rejected_orders': [{**order, 'rejected_for': decision.breaches}
+                                for order, decision in gate.rejections],
+            'pretrade_risk': gate.metrics,
             'allocation_summary': allocation,
+            'buying_power_used': ledger.used,
+            'buying_power_available': ledger.available,
             'execution_priority': self.prioritize_orders(orders),
-            'risk_assessment': self.risk_monitor.daily_risk_check(current_positions, {})
+            'risk_assessment': self.risk_monitor.daily_risk_check(
+                current_positions, {'buying_power': available_capital})
+        }
+
+    def analyze_current_portfolio(self, current_positions):
+        """
+        Summarize open positions
+
+        The monthly premium estimate is the current value of open short
+        options (premium still to be earned), or the model's collected
+        premium when nothing is open.
+        """
+        shorts = [pos for pos in current_positions
+                  if pos.get('type') in ('put', 'call') and pos['quantity'] < 0]
+        open_premium = sum(abs(pos.get('value', 0.0)) for pos in shorts)
+        return {
+            'positions': len(current_positions),
+            'short_put_contracts': -sum(pos['quantity'] for pos in shorts if pos['type'] == 'put'),
+            'long_call_contracts': sum(pos['quantity'] for pos in current_positions
+                                       if pos.get('type') == 'call' and pos['quantity'] > 0),
+            'monthly_premium_estimate': open_premium or self.model.premium_collected
         }
 
+    def prioritize_orders(self, orders):
+        """Execution order: closes first, then short puts (largest margin first), then hedges"""
+        rank = {'BUY_TO_CLOSE': 0, 'SELL_TO_OPEN': 1, 'BUY_TO_OPEN': 2}
+        ranked = sorted(orders, key=lambda o: (rank.get(o['action'], 3),
+                                               -o.get('margin_requirement', 0.0)))
+        return [{'priority': i + 1, 'action': o['action'], 'type': o['type'],
+                 'strike': o['strike'], 'quantity': o['quantity']}
+                for i, o in enumerate(ranked)]
+
+    def _option_legs(self, strikes, is_call, quantity):
+        """One leg per strike, priced off the model's vol surface (flat 425% IV without one)"""
+        strikes = np.asarray(strikes, dtype=float)
+        spot = self.model.current_price
+        t = self.days_to_expiry / 365
+        if self.model.vol_surface is not None:
+            sigma = self.model.vol_surface.sigma(strikes, t, spot)
+        else:
+            sigma = 4.25
+        premium = black_scholes_price(spot, strikes, t, sigma, is_call)
+        return OptionLegs.from_arrays(spot, strikes, is_call, quantity, premium, t, sigma)
+
+    def _stage_orders(self, ledger, legs, budgets, side, gate=None, counts=None):
+        """
+        Size each strike to its budget and the ledger's remaining buying power
+        (or to a given contract count per strike)
+
+        With a pre-trade gate, each sized order must pass it before it is
+        staged, so rejected orders do not consume buying power.
+        """
+        orders = []
+        for i in range(len(legs)):
+            unit = OptionLegs.from_arrays(legs.underlying_price[i], legs.strike[i], legs.is_call[i],
+                                          np.sign(legs.quantity[i]), legs.premium[i],
+                                          legs.time_to_expiry[i], legs.sigma[i])
+            contracts = (ledger.max_contracts(self.model.symbol, unit, budgets[i])
+                         if counts is None else int(counts[i]))
+            if contracts <= 0:
+                continue
+
+            order_legs = OptionLegs.from_arrays(unit.underlying_price, unit.strike, unit.is_call,
+                                                unit.quantity * contracts, unit.premium,
+                                                unit.time_to_expiry, unit.sigma)
+            order = {
+                'symbol': self.model.symbol,
+                'type': 'call' if unit.is_call[0] else 'put',
+                'strike': float(unit.strike[0]),
+                'quantity': int(unit.quantity[0]) * contracts,
+                'action': side,
+                'days_to_expiry': self.days_to_expiry,
+                'limit_price': round(float(unit.premium[0]), 2),
+                'margin_requirement': ledger.marginal_requirement(self.model.symbol, order_legs)
+            }
+            if gate is not None and not gate.submit(order).accepted:
+                continue
+            if ledger.stage(self.model.symbol, order_legs):
+                orders.append(order)
+        return orders
+
+    def generate_put_orders(self, total_put_capital, strike_weights, ledger=None, gate=None):
+        """
+        Short put orders across the strike ladder, sized by margin
+
+        The ladder is sized as the plan sizes it: the most contracts of one
+        ladder-weighted unit that fit in the put capital at the broker's
+        requirement. That count is split across strikes by weight, largest
+        remainders first.
+        """
+        if ledger is None:
+            ledger = BuyingPowerLedger(self.margin_engine, total_put_capital, self.margin_method)
+        strikes = list(strike_weights)
+        weights = np.array([strike_weights[k] for k in strikes])
+        legs = self._option_legs(strikes, False, -1)
+        ladder = short_put_ladder(legs.underlying_price[0], strikes, weights, legs.sigma,
+                                  legs.time_to_expiry[0])
+        total = ledger.max_contracts(self.model.symbol, ladder, total_put_capital)
+
+        share = total * weights
+        counts = np.floor(share).astype(np.int64)
+        largest_remainders = np.argsort(-(share - counts), kind='stable')[:total - counts.sum()]
+        counts[largest_remainders] += 1
+        return self._stage_orders(ledger, legs, None, 'SELL_TO_OPEN', gate, counts)
+
+    def generate_hedge_orders(self, call_hedge_budget, hedge_strikes, ledger=None, gate=None):
+        """Long call hedge orders; each strike's budget buys premium outright"""
+        if ledger is None:
+            ledger = BuyingPowerLedger(self.margin_engine, call_hedge_budget, self.margin_method)
+        strikes = list(hedge_strikes)
+        budgets = [call_hedge_budget * hedge_strikes[k] for k in strikes]
+        legs = self._option_legs(strikes, True, 1)
+        return self._stage_orders(ledger, legs, budgets, 'BUY_TO_OPEN', gate)
+
+    def generate_roll_orders(self, current_positions, chain):
+        """Close-and-roll orders for short puts inside the roll window"""
+        optimizer = RollOptimizer(self.model.current_price,
+                                  assignment_params=self.model.assignment_params,
+                                  margin_engine=self.margin_engine,
+                                  vol_surface=self.model.vol_surface)
+        decisions = optimizer.optimize(current_positions, chain)
+        if decisions.empty:
+            return []
+        return optimizer.roll_orders(decisions, self.model.symbol)
+
     def assignment_notification_system(self, assignments):
         """Automated assignment processing and notifications"""
         for assignment in assignments:
@@ -136,7 +336,7 @@ class ASSAutomationEngine:
             # Generate assignment report
             report = {
                 'assignment_date': datetime.now().strftime('%Y-%m-%d'),
-                'symbol': 'ASST',
+                'symbol': self.model.symbol,
                 'shares_assigned': assignment['shares'],
                 'strike_price': assignment['strike'],
                 'effective_cost_basis': assignment['effective_cost'],
@@ -159,6 +359,8 @@ class ASSAutomationEngine:
 # Implementation example
 def run_daily_automation():
     """Daily automation routine"""
+    from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
     # Initialize systems
     model = ASSTPremiumCompounder()
     risk_monitor = ASSRiskMonitor(model)
@@ -175,6 +377,7 @@ def run_daily_automation():
 
     print("Daily Automation Complete")
     print(f"Orders Generated: {len(daily_plan['orders'])}")
+    print(f"Orders Rejected Pre-Trade: {len(daily_plan['rejected_orders'])}")
     print(f"Risk Score: {daily_plan['risk_assessment']['risk_score']}")
 
     return daily_plan
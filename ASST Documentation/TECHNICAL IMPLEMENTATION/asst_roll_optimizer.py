@@ -0,0 +1,297 @@
+"""
+ASST Roll Optimizer
+Vectorized close-and-roll decisions for expiring short puts
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Every expiring leg is scored against every later-dated put in the chain
+in one (n_legs x n_candidates) array pass. Each candidate roll buys the leg
+back at the ask and sells the candidate at the bid, and is scored on:
+
+- Time-value credit per share per month of extension
+- Distance of the new assignment probability from the accumulation target
+- Carrying cost of the change in Reg-T margin
+- Change in the effective cost basis if the new put is assigned
+
+Column 0 of the score matrix is "hold to expiry" (no credit, no margin or
+basis change), so a leg is only rolled when some roll beats holding. The
+best action per leg is an argmax over rows.
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from asst_margin import CONTRACT_MULTIPLIER, MarginEngine, OptionLegs
+from asst_strategy_core import (
+    COMPOUNDER_ASSIGNMENT_PARAMS, AssignmentModelParams, assignment_probability,
+    black_scholes_price
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RollWeights:
+    """Score coefficients, all in dollars per share"""
+    credit: float = 1.0                  # Per $1 of time-value credit per 30 days added
+    assignment: float = 0.50             # Per unit of |p_new - target|
+    target_assignment: float = 0.80      # Desired assignment rate (ASSRiskMonitor target)
+    cost_basis: float = 1.0              # Per $1 of effective cost basis increase
+    capital_rate: float = 0.08           # Annual carrying cost of margin
+    min_credit: float = 0.0              # Rolls must collect at least this per share
+
+
+class RollOptimizer:
+    """Scores and selects rolls for expiring short puts against a live chain"""
+
+    def __init__(self, current_price: float, weights: Optional[RollWeights] = None,
+                 assignment_params: AssignmentModelParams = COMPOUNDER_ASSIGNMENT_PARAMS,
+                 margin_engine: Optional[MarginEngine] = None, vol_surface=None,
+                 flat_sigma: float = 4.25, rate: float = 0.04, roll_window_days: int = 7,
+                 calendar=None):
+        self.current_price = current_price
+        self.weights = weights or RollWeights()
+        self.assignment_params = assignment_params
+        self.margin_engine = margin_engine or MarginEngine()
+        self.vol_surface = vol_surface
+        self.flat_sigma = flat_sigma
+        self.rate = rate
+        self.roll_window_days = roll_window_days
+        self.calendar = calendar    # ExpiryCalendar; fills DTE from expiry labels
+
+    def expiring_legs(self, positions) -> pd.DataFrame:
+        """Short puts inside the roll window"""
+        frame = pd.DataFrame(positions)
+        if frame.empty:
+            return frame
+        if self.calendar is not None:
+            frame = self.calendar.annotate(frame)
+        if 'days_to_expiry' not in frame:
+            frame = frame.assign(days_to_expiry=27)
+        if 'premium_received' not in frame:
+            frame = frame.assign(premium_received=0.0)
+        if 'type' in frame:
+            frame = frame[frame['type'].str.lower() == 'put']
+        frame = frame[(frame['quantity'] < 0) & (frame['days_to_expiry'] <= self.roll_window_days)]
+        return frame.reset_index(drop=True)
+
+    def _sigma(self, strikes, time_to_expiry) -> np.ndarray:
+        if self.vol_surface is None:
+            return np.full(np.shape(strikes), self.flat_sigma)
+        return self.vol_surface.sigma(strikes, time_to_expiry, self.current_price)
+
+    def _close_prices(self, legs: pd.DataFrame, chain: pd.DataFrame) -> np.ndarray:
+        """Buy-back price per share: quoted ask when listed, else model price"""
+        if 'close_price' in legs:
+            return legs['close_price'].to_numpy(dtype=float)
+
+        t = legs['days_to_expiry'].to_numpy(dtype=float) / 365
+        strikes = legs['strike'].to_numpy(dtype=float)
+        model = black_scholes_price(self.current_price, strikes, np.maximum(t, 1e-6),
+                                    self._sigma(strikes, t), False, self.rate)
+
+        quotes = chain.loc[~chain['is_call'].astype(bool)]
+        if quotes.empty:
+            return model
+        quote_keys = self._quote_key(quotes['strike'].to_numpy(), quotes['time_to_expiry'].to_numpy() * 365)
+        order = np.argsort(quote_keys, kind='stable')
+        quote_keys, ask = quote_keys[order], quotes['ask'].to_numpy(dtype=float)[order]
+        leg_keys = self._quote_key(strikes, t * 365)
+        pos = np.minimum(np.searchsorted(quote_keys, leg_keys), len(quote_keys) - 1)
+        return np.where(quote_keys[pos] == leg_keys, ask[pos], model)
+
+    @staticmethod
+    def _quote_key(strikes, days) -> np.ndarray:
+        """Integer (strike, whole days) key for exact quote matching"""
+        return (np.rint(np.asarray(strikes) * 1e4).astype(np.int64) * 100000 +
+                np.rint(np.asarray(days)).astype(np.int64))
+
+    def _buying_power_per_share(self, strikes, premiums) -> np.ndarray:
+        """Reg-T buying power held per short put share, net of the premium credit"""
+        legs = OptionLegs.from_arrays(self.current_price, strikes, False, -1, premiums)
+        return (self.margin_engine.buying_power_effect(legs, self.margin_engine.reg_t_requirement(legs))
+                / CONTRACT_MULTIPLIER)
+
+    def _sides(self, legs: pd.DataFrame, chain: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Per-leg and per-candidate vectors; every matrix entry combines one of each"""
+        spot = self.current_price
+        puts = chain.loc[~chain['is_call'].astype(bool) & (chain['bid'] > 0)]
+        # Candidates sorted by expiry so "later than the leg" is a column suffix
+        puts = puts.iloc[np.argsort(puts['time_to_expiry'].to_numpy(), kind='stable')]
+        cand_strike = puts['strike'].to_numpy(dtype=float)
+        cand_bid = puts['bid'].to_numpy(dtype=float)
+        leg_strike = legs['strike'].to_numpy(dtype=float)
+        close = self._close_prices(legs, chain)
+        sides = {
+            'cand_strike': cand_strike,
+            'cand_days': np.round(puts['time_to_expiry'].to_numpy(dtype=float) * 365, 6),
+            'cand_bid': cand_bid,
+            'leg_strike': leg_strike,
+            'leg_days': legs['days_to_expiry'].to_numpy(dtype=float),
+            'close': close
+        }
+        for side, strikes, premium in (('cand', cand_strike, cand_bid), ('leg', leg_strike, close)):
+            sides[f'{side}_prob'] = np.clip(assignment_probability(
+                strikes, spot, sides[f'{side}_days'], params=self.assignment_params), 0.0, 1.0)
+            sides[f'{side}_bp'] = self._buying_power_per_share(strikes, premium)
+            # Only time value is income; intrinsic value moves with the strike obligation
+            sides[f'{side}_extrinsic'] = premium - np.maximum(strikes - spot, 0.0)
+            # Strike less premium: effective cost per share if assigned
+            sides[f'{side}_net_strike'] = strikes - premium
+        return sides
+
+    def score_matrix(self, legs: pd.DataFrame, chain: pd.DataFrame):
+        """
+        Evaluate every (leg, candidate) roll in one pass
+
+        Args:
+            legs: Expiring legs with strike, quantity, days_to_expiry and
+                premium_received (per share); optional close_price
+            chain: Quotes with strike, time_to_expiry (years), is_call, bid, ask
+
+        Returns:
+            (score, sides): (n_legs, 1 + n_candidates) score matrix whose
+            column 0 is hold, and the per-side vectors it was built from
+        """
+        w = self.weights
+        sides = self._sides(legs, chain)
+        n_legs, n_cand = len(legs), len(sides['cand_strike'])
+        # Scores only rank candidates, so the matrix passes run in float32
+        dtype = np.float32
+
+        def side_pair(name, scale=1.0):
+            return ((sides[f'cand_{name}'] * scale).astype(dtype),
+                    (sides[f'leg_{name}'] * scale).astype(dtype)[:, None])
+
+        score = np.empty((n_legs, n_cand + 1), dtype=dtype)
+        score[:, 0] = -w.assignment * np.abs(sides['leg_prob'] - w.target_assignment)
+        roll = score[:, 1:]
+        work = np.empty((n_legs, n_cand), dtype=dtype)
+        cand_days, leg_days = side_pair('days')
+        added_days = cand_days - leg_days
+
+        # Time-value credit per 30 days of extension, less assignment-target distance
+        np.subtract(*side_pair('extrinsic', 30 * w.credit), out=roll)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roll /= added_days
+        roll -= (w.assignment * np.abs(sides['cand_prob'] - w.target_assignment)).astype(dtype)
+
+        # Effective cost basis increase if the new put is assigned
+        np.subtract(*side_pair('net_strike', w.cost_basis), out=work)
+        np.maximum(work, 0.0, out=work)
+        roll -= work
+
+        # Carrying cost of the buying-power change over the added days
+        np.subtract(*side_pair('bp', w.capital_rate / 365), out=work)
+        work *= added_days
+        roll -= work
+
+        # Rolls must be for a later expiry and collect at least min_credit
+        np.copyto(roll, -np.inf, where=sides['cand_bid'].astype(dtype) <
+                  (sides['close'] + w.min_credit).astype(dtype)[:, None])
+        first_later = np.searchsorted(sides['cand_days'], sides['leg_days'], side='right')
+        for first in np.unique(first_later):
+            roll[first_later == first, :first] = -np.inf
+        return score, sides
+
+    def optimize(self, positions, chain: pd.DataFrame) -> pd.DataFrame:
+        """
+        Best action per expiring leg
+
+        Returns:
+            DataFrame with action (HOLD/ROLL), new strike and expiry, and the
+            totals (all contracts) of the chosen roll
+        """
+        legs = self.expiring_legs(positions)
+        if legs.empty:
+            return pd.DataFrame()
+
+        score, sides = self.score_matrix(legs, chain)
+        best = np.argmax(score, axis=1)
+        rolled = best > 0
+        j = np.maximum(best - 1, 0)
+        dollars = -legs['quantity'].to_numpy() * CONTRACT_MULTIPLIER
+
+        def chosen(name):
+            return np.where(rolled, sides[f'cand_{name}'][j], np.nan)
+
+        new_premium = chosen('bid')
+        credit = np.where(rolled, new_premium - sides['close'], 0.0)
+        effective_cost = legs['strike'].to_numpy(dtype=float) - legs['premium_received'].to_numpy(dtype=float)
+        result = legs.assign(
+            action=np.where(rolled, 'ROLL', 'HOLD'),
+            close_price=np.where(rolled, sides['close'], np.nan),
+            new_strike=chosen('strike'),
+            new_days_to_expiry=chosen('days'),
+            new_premium=new_premium,
+            net_credit=credit * dollars,
+            new_assignment_probability=np.where(rolled, sides['cand_prob'][j], sides['leg_prob']),
+            margin_change=np.where(rolled, sides['cand_bp'][j] - sides['leg_bp'], 0.0) * dollars,
+            new_effective_cost=np.where(rolled, effective_cost + (chosen('net_strike') - sides['leg_net_strike']),
+                                        effective_cost),
+            score=score[np.arange(len(legs)), best].astype(float)
+        )
+        logger.info(f"Rolls: {int(rolled.sum())} of {len(legs)} expiring legs")
+        return result
+
+    @staticmethod
+    def roll_orders(decisions: pd.DataFrame, symbol: str = 'ASST') -> List[Dict]:
+        """Buy-to-close / sell-to-open order pairs for every ROLL decision"""
+        orders = []
+        for leg in decisions[decisions['action'] == 'ROLL'].itertuples():
+            orders.append({
+                'symbol': symbol,
+                'type': 'put',
+                'strike': float(leg.strike),
+                'quantity': -int(leg.quantity),
+                'action': 'BUY_TO_CLOSE',
+                'days_to_expiry': int(leg.days_to_expiry),
+                'limit_price': round(float(leg.close_price), 2)
+            })
+            orders.append({
+                'symbol': symbol,
+                'type': 'put',
+                'strike': float(leg.new_strike),
+                'quantity': int(leg.quantity),
+                'action': 'SELL_TO_OPEN',
+                'days_to_expiry': int(round(leg.new_days_to_expiry)),
+                'limit_price': round(float(leg.new_premium), 2)
+            })
+        return orders
+
+
+# Usage example
+if __name__ == "__main__":
+    from asst_vol_surface import synthetic_chain
+
+    chain = synthetic_chain(strikes_per_expiry=200)
+    optimizer = RollOptimizer(current_price=2.40)
+
+    rng = np.random.default_rng(11)
+    n_legs = 500
+    positions = pd.DataFrame({
+        'symbol': 'ASST',
+        'type': 'put',
+        'strike': rng.choice(np.arange(1.5, 5.5, 0.5), n_legs),
+        'quantity': -rng.integers(1, 20, n_legs),
+        'days_to_expiry': rng.integers(1, 7, n_legs),
+        'premium_received': rng.uniform(0.2, 1.5, n_legs)
+    })
+
+    optimizer.optimize(positions, chain)  # Warm-up
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        decisions = optimizer.optimize(positions, chain)
+        timings.append((time.perf_counter() - start) * 1e3)
+
+    print(f"{n_legs} legs x {len(chain)} chain quotes: median {np.median(timings):.1f} ms")
+    print(decisions['action'].value_counts().to_string())
+    print(decisions[['strike', 'days_to_expiry', 'action', 'new_strike', 'new_days_to_expiry',
+                     'net_credit', 'new_assignment_probability', 'margin_change']].head(8).round(3).to_string())
+    print(f"Orders: {len(RollOptimizer.roll_orders(decisions))}")
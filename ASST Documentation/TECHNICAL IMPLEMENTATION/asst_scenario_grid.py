@@ -0,0 +1,305 @@
+"""
+ASST Scenario Grid Engine
+Broadcasting evaluation of price x time x volatility x share-count grids
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Each axis is laid out on its own array dimension and every quantity is
+computed on the smallest sub-grid it depends on (share value ignores time
+and vol, hedge value ignores share count) before being broadcast, so a
+1,000 x 1,000 plan grid costs one vectorized pass instead of a million
+Python iterations. Call hedges are repriced with Black-Scholes at each
+scenario's remaining time to expiry rather than a fixed leverage multiple.
+"""
+
+import time
+import argparse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from asst_strategy_core import norm_cdf_fast
+
+AXES = ('price', 'time', 'vol', 'shares')
+GRID_BLOCK_POINTS = 1 << 13     # Grid points per block when repricing hedges
+
+# Anchors of ASST_Long_Term_Value_Projections.csv
+SCENARIO_BANDS = OrderedDict([
+    ('Conservative', 5.0),
+    ('Moderate', 8.0),
+    ('Strong', 12.0),
+    ('Explosive', 20.0),
+    ('Extreme', 30.0)
+])
+SCENARIO_PROBABILITIES = (70.0, 50.0, 30.0, 15.0, 5.0)
+
+
+@dataclass
+class HedgeBook:
+    """Long call hedge positions to reprice across scenarios"""
+    strikes: np.ndarray
+    contracts: np.ndarray
+    premiums: np.ndarray          # Premium paid per share
+    expiries: np.ndarray          # Years from today
+
+    @classmethod
+    def from_hedge_plan(cls, hedge_plan: List[Dict], expiries: Sequence[float]) -> 'HedgeBook':
+        """Build from ASSTPremiumCompounder.call_hedge_optimization output"""
+        return cls(
+            strikes=np.array([leg['strike'] for leg in hedge_plan], dtype=float),
+            contracts=np.array([leg['contracts'] for leg in hedge_plan], dtype=float),
+            premiums=np.array([leg['estimated_premium'] for leg in hedge_plan], dtype=float),
+            expiries=np.asarray(expiries, dtype=float)
+        )
+
+    @property
+    def cost(self) -> float:
+        """Total premium paid for the book"""
+        return float(np.sum(self.contracts * self.premiums * 100))
+
+
+@dataclass
+class ScenarioGrid:
+    """Labeled result arrays sharing the coordinate axes (price, time, vol, shares)"""
+    coords: 'OrderedDict[str, np.ndarray]'
+    data: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(len(values) for values in self.coords.values())
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Full-shape (zero-copy broadcast) view of a result"""
+        return np.broadcast_to(self.data[name], self.shape)
+
+    def to_frame(self, fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Long-format DataFrame with one row per grid point"""
+        fields = list(self.data) if fields is None else list(fields)
+        index = pd.MultiIndex.from_product(list(self.coords.values()), names=list(self.coords))
+        return pd.DataFrame({name: self[name].reshape(-1) for name in fields}, index=index)
+
+    def table(self, name: str, index: str = 'price', columns: str = 'vol') -> pd.DataFrame:
+        """2-D slice of one result; all other axes must have a single coordinate"""
+        values = self[name]
+        order = [list(self.coords).index(index), list(self.coords).index(columns)]
+        others = [i for i in range(len(self.coords)) if i not in order]
+        if any(values.shape[i] != 1 for i in others):
+            raise ValueError(f"Axes other than {index}/{columns} must be length 1 for a table")
+        matrix = np.transpose(values, order + others).reshape(values.shape[order[0]], values.shape[order[1]])
+        return pd.DataFrame(matrix, index=pd.Index(self.coords[index], name=index),
+                            columns=pd.Index(self.coords[columns], name=columns))
+
+
+class ScenarioEngine:
+    """Evaluates accumulation outcomes over dense scenario grids"""
+
+    def __init__(self, current_price: float, effective_cost: float, total_premium: float,
+                 hedge_book: Optional[HedgeBook] = None, rate: float = 0.04, vol_surface=None):
+        self.current_price = current_price
+        self.effective_cost = effective_cost
+        self.total_premium = total_premium
+        self.hedge_book = hedge_book
+        self.rate = rate
+        self.vol_surface = vol_surface
+
+    @staticmethod
+    def _axis(values, position: int) -> np.ndarray:
+        """Reshape a 1-D coordinate so it occupies its own grid dimension"""
+        shape = [1] * len(AXES)
+        shape[position] = -1
+        return np.asarray(values, dtype=float).reshape(shape)
+
+    def hedge_value(self, price, time, vol) -> np.ndarray:
+        """
+        Mark-to-model value of the hedge book on a (price, time, vol, 1) grid
+
+        Legs at or past expiry are valued at intrinsic. With vol=None and a
+        vol surface attached, each leg uses sigma(K, remaining time).
+        """
+        book = self.hedge_book
+        price = np.atleast_1d(np.asarray(price, dtype=float))
+        t = self._axis(time, 1)
+        total = np.zeros((len(price), t.shape[1], 1 if vol is None else len(vol), 1))
+
+        # Per-leg terms that do not depend on price, on their (1, T, V, 1) sub-grids
+        legs = []
+        for strike, contracts, expiry in zip(book.strikes, book.contracts, book.expiries):
+            remaining = np.maximum(expiry - t, 0.0)
+            if vol is None:
+                if self.vol_surface is None:
+                    raise ValueError("vol axis is required without a vol surface")
+                sigma = self.vol_surface.sigma(strike, np.maximum(remaining, 1 / 365), self.current_price)
+            else:
+                sigma = self._axis(vol, 2)
+            vol_sqrt_t = np.maximum(sigma * np.sqrt(remaining), 1e-12)
+            legs.append((strike, contracts * 100, remaining <= 0, vol_sqrt_t,
+                         self.rate * remaining + 0.5 * vol_sqrt_t ** 2,
+                         strike * np.exp(-self.rate * remaining)))
+
+        # Price rows in blocks, so each leg's Black-Scholes temporaries stay cache-sized
+        rows = max(1, GRID_BLOCK_POINTS // total[0].size)
+        for start in range(0, len(price), rows):
+            p = self._axis(price[start:start + rows], 0)
+            out = total[start:start + rows]
+            for strike, multiplier, expired, vol_sqrt_t, drift, discounted_strike in legs:
+                d1 = np.log(p / strike) + drift
+                d1 /= vol_sqrt_t
+                value = p * norm_cdf_fast(d1)
+                d1 -= vol_sqrt_t
+                value -= discounted_strike * norm_cdf_fast(d1)
+                if expired.any():
+                    value = np.where(np.broadcast_to(expired, value.shape), np.maximum(p - strike, 0.0), value)
+                value *= multiplier
+                out += value
+
+        return total
+
+    def evaluate(self, price, time=(0.0,), vol=(4.25,), shares=(0,)) -> ScenarioGrid:
+        """
+        Evaluate every combination of the axis coordinates
+
+        Args:
+            price: Underlying prices
+            time: Horizon in years from today
+            vol: Implied volatilities (decimal) for hedge repricing, or None to use the surface
+            shares: Accumulated share counts
+
+        Returns:
+            ScenarioGrid with share, hedge and total-return results
+        """
+        coords = OrderedDict([
+            ('price', np.atleast_1d(np.asarray(price, dtype=float))),
+            ('time', np.atleast_1d(np.asarray(time, dtype=float))),
+            ('vol', np.atleast_1d(np.asarray(np.nan if vol is None else vol, dtype=float))),
+            ('shares', np.atleast_1d(np.asarray(shares, dtype=float)))
+        ])
+        p = self._axis(coords['price'], 0)
+        n = self._axis(coords['shares'], 3)
+
+        share_value = p * n
+        share_cost = self.effective_cost * n
+        share_profit = share_value - share_cost
+
+        grid = ScenarioGrid(coords)
+        grid.data['share_value'] = share_value
+        grid.data['share_profit'] = share_profit
+
+        book = self.hedge_book
+        if book is not None and np.any(book.contracts):
+            hedge_value = self.hedge_value(coords['price'], coords['time'],
+                                           None if vol is None else coords['vol'])
+            hedge_profit = hedge_value - book.cost
+            hedge_multiple = hedge_value / book.cost if book.cost > 0 else np.zeros_like(hedge_value)
+        else:
+            # No hedges (or a zero-contract ladder): the hedge leg contributes nothing
+            hedge_value = hedge_profit = hedge_multiple = np.zeros((1,) * len(AXES))
+        grid.data['hedge_value'] = hedge_value
+        grid.data['hedge_profit'] = hedge_profit
+        grid.data['hedge_multiple'] = hedge_multiple
+
+        grid.data['total_return'] = share_profit + hedge_profit + self.total_premium
+        grid.data['price_multiple'] = p / self.current_price
+        return grid
+
+
+def scenario_probability(target_prices, anchor_prices=None, anchor_probabilities=None) -> np.ndarray:
+    """Interpolate the planning probability curve (in %) in log-price between the anchors"""
+    if anchor_prices is None:
+        anchor_prices = list(SCENARIO_BANDS.values())
+        anchor_probabilities = SCENARIO_PROBABILITIES
+    return np.interp(np.log(target_prices), np.log(anchor_prices), anchor_probabilities)
+
+
+def scenario_names(target_prices) -> np.ndarray:
+    """Name each target price after the smallest anchor band that contains it"""
+    bands = np.array(list(SCENARIO_BANDS.values()))
+    index = np.minimum(np.searchsorted(bands, target_prices, side='left'), len(bands) - 1)
+    return np.array(list(SCENARIO_BANDS.keys()))[index]
+
+
+def long_term_value_projections(target_prices, final_shares: float, cost_basis: float,
+                                total_premium: float, total_investment: float,
+                                hedge_book: HedgeBook, current_price: float = 2.40,
+                                horizon_years: float = 0.0, vol: float = 4.25,
+                                timeframe: str = '2-5 years',
+                                catalyst: str = 'Bitcoin recovery + business improvement') -> pd.DataFrame:
+    """
+    Regenerate ASST_Long_Term_Value_Projections.csv at any price resolution
+
+    Args:
+        target_prices: Target prices (any number of rows)
+        final_shares: Accumulated shares
+        cost_basis: Total share cost basis in dollars
+        total_premium: Total premium income
+        total_investment: Total capital invested
+        hedge_book: Call hedges, repriced at each target
+        horizon_years: Time from today at which hedges are marked
+        vol: Volatility used for hedges still alive at the horizon
+
+    Returns:
+        DataFrame with the CSV's columns
+    """
+    target_prices = np.asarray(target_prices, dtype=float)
+    engine = ScenarioEngine(current_price, cost_basis / final_shares, total_premium, hedge_book)
+    grid = engine.evaluate(target_prices, (horizon_years,), (vol,), (final_shares,))
+
+    share_value = grid['share_value'].reshape(-1)
+    share_profit = grid['share_profit'].reshape(-1)
+    hedge_profit = grid['hedge_profit'].reshape(-1)
+    total_return = grid['total_return'].reshape(-1)
+    probability = scenario_probability(target_prices)
+
+    return pd.DataFrame({
+        'Scenario': scenario_names(target_prices),
+        'Target_Price': target_prices,
+        'Probability_%': np.round(probability, 1),
+        'Share_Value': np.round(share_value, 0),
+        'Share_Cost_Basis': round(float(cost_basis), 0),
+        'Share_Profit': np.round(share_profit, 0),
+        'Share_Multiple': np.round(share_value / cost_basis, 1),
+        'Hedge_Profit': np.round(hedge_profit, 0),
+        'Hedge_Multiple': np.round(grid['hedge_multiple'].reshape(-1), 1),
+        'Total_Premium_Income': total_premium,
+        'Total_Return': np.round(total_return, 0),
+        'Total_Investment': total_investment,
+        'ROI_%': np.round(total_return / total_investment * 100, 0),
+        'Risk_Adjusted_Return': np.round(total_return * probability / 100, 0),
+        'Timeframe_Years': timeframe,
+        'Catalyst': catalyst
+    })
+
+
+# Usage example
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Evaluate scenario grids / regenerate long-term projections')
+    parser.add_argument('--points', type=int, default=1000, help='Grid points per axis')
+    parser.add_argument('--csv', help='Write long-term value projections to this path')
+    parser.add_argument('--csv-rows', type=int, default=50)
+    args = parser.parse_args()
+
+    # Hedge ladder from ASST_Call_Hedge_Optimization.csv (Nov-15, Dec-20, Jan-16 expiries)
+    book = HedgeBook(strikes=np.array([5.0, 7.5, 12.5]), contracts=np.array([12, 15, 14]),
+                     premiums=np.array([0.35, 0.25, 0.20]), expiries=np.array([0.13, 0.23, 0.30]))
+    engine = ScenarioEngine(current_price=2.40, effective_cost=1.48, total_premium=18000, hedge_book=book)
+
+    prices = np.linspace(1.0, 30.0, args.points)
+    vols = np.linspace(1.0, 6.0, args.points)
+    timings = []
+    for _ in range(6):
+        start = time.perf_counter()
+        grid = engine.evaluate(prices, (0.05,), vols, (11552,))
+        timings.append((time.perf_counter() - start) * 1e3)
+    print(f"{args.points} x {args.points} price x vol grid evaluated in {np.median(timings[1:]):.1f} ms")
+    print(grid.table('total_return').iloc[::args.points // 5, ::args.points // 5].round(0).to_string())
+
+    projections = long_term_value_projections(
+        np.linspace(5.0, 30.0, args.csv_rows), final_shares=11552, cost_basis=17097,
+        total_premium=18000, total_investment=32000, hedge_book=book
+    )
+    print(projections[['Scenario', 'Target_Price', 'Probability_%', 'Hedge_Profit', 'Total_Return']].head().to_string(index=False))
+    if args.csv:
+        projections.to_csv(args.csv, index=False)
+        print(f"\nLong-term projections written to {args.csv}")
@@ -0,0 +1,491 @@
+"""
+ASST Plan & Risk Service
+Local asyncio HTTP service for monthly plans, risk metrics and projections
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Serves the strategy engines on demand instead of as one-shot scripts:
+
+    GET /plan?month=1&premium_collected=1000&portfolio_value=25000
+    GET /risk?portfolio_value=25000&position_size=20000
+    GET /projections?months=6
+    GET /health
+
+The HTTP/1.1 front end is plain asyncio streams with keep-alive. Query
+parameters are typed and defaulted per endpoint, so equivalent queries share
+one canonical cache key. Requests are handled in three tiers:
+
+- LRU cache hit: answered on the event loop, or 304 when If-None-Match
+  matches the ETag.
+- Already in flight: awaits the running computation instead of starting
+  another (request coalescing), and computes it itself if the request that
+  started it is cancelled.
+- Otherwise: the engine runs in a process pool, and the worker returns
+  serialized JSON, so the event loop only writes bytes.
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+    HAVE_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 64 * 1024
+SERVER_NAME = 'asst-service'
+
+
+def _jsonable(obj):
+    """Fallback encoder for numpy and pandas values"""
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict('records')
+    if isinstance(obj, pd.Series):
+        return obj.tolist()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    if HAVE_ORJSON:
+        return orjson.dumps(obj, default=_jsonable,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_jsonable, separators=(',', ':')).encode()
+
+
+# Process-pool workers: stateless, module-level so they pickle by name
+
+def plan_worker(params: Dict) -> bytes:
+    """ASSComprehensiveStrategy.generate_monthly_plan for one parameter set"""
+    from ASST_Advanced_Strategy_System import ASSComprehensiveStrategy, StrategyParameters
+
+    strategy = ASSComprehensiveStrategy(StrategyParameters(
+        symbol=params['symbol'], asst_current_price=params['price'],
+        monthly_capital=params['monthly_capital'], iv_environment=params['iv_environment']))
+    return dumps(strategy.generate_monthly_plan(
+        params['month'], params['premium_collected'], params['portfolio_value']))
+
+
+def risk_worker(params: Dict) -> bytes:
+    """RiskManager.calculate_portfolio_risk plus the alerts it raised"""
+    from ASST_Advanced_Strategy_System import RiskManager, StrategyParameters
+
+    manager = RiskManager(StrategyParameters(
+        symbol=params['symbol'], asst_current_price=params['price'],
+        iv_environment=params['iv_environment']))
+    metrics = manager.calculate_portfolio_risk(params['portfolio_value'], params['position_size'])
+    return dumps({'risk_metrics': metrics, 'alerts': manager.risk_alerts})
+
+
+def projections_worker(params: Dict) -> bytes:
+    """ASSTPremiumCompounder accumulation projection over `months`"""
+    from asst_compounding_kernels import COUNT_FIELDS
+    from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
+    model = ASSTPremiumCompounder(current_price=params['price'],
+                                  monthly_capital=params['monthly_capital'],
+                                  initial_portfolio=params['initial_portfolio'],
+                                  premium_collected=params['premium_collected'])
+    paths = model.project_accumulation(params['months'])
+    table = {'Month': list(range(1, params['months'] + 1))}
+    for name, values in paths.items():
+        column = values[0]
+        table[name] = (column.astype(np.int64) if name in COUNT_FIELDS else column).tolist()
+    return dumps({'months': params['months'], 'projections': table})
+
+
+def _warm_worker():
+    """Import the engines once per worker process"""
+    logging.disable(logging.INFO)
+    import ASST_Advanced_Strategy_System  # noqa: F401
+    import asst_volatility_arbitrage_model  # noqa: F401
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """A worker plus its typed query parameters: name -> (type, default)"""
+    worker: Callable[[Dict], bytes]
+    params: Dict[str, Tuple[type, object]] = field(default_factory=dict)
+    limits: Dict[str, Tuple[float, float]] = field(default_factory=dict)   # Inclusive bounds
+
+    def parse(self, query: str) -> Dict:
+        """Typed parameters with defaults filled; raises ValueError on bad input"""
+        raw = dict(parse_qsl(query, keep_blank_values=True))
+        unknown = set(raw) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+        parsed = {}
+        for name, (kind, default) in self.params.items():
+            if name not in raw:
+                parsed[name] = default
+                continue
+            try:
+                parsed[name] = kind(raw[name])
+            except ValueError:
+                raise ValueError(f"Parameter {name} must be {kind.__name__}") from None
+            if kind in (int, float) and not np.isfinite(parsed[name]):
+                raise ValueError(f"Parameter {name} must be finite")
+        for name, (low, high) in self.limits.items():
+            if not low <= parsed[name] <= high:
+                raise ValueError(f"Parameter {name} must be between {low:g} and {high:g}")
+        return parsed
+
+
+MARKET_PARAMS = {
+    'symbol': (str, 'ASST'),
+    'price': (float, 2.40),
+    'iv_environment': (int, 425)
+}
+MARKET_LIMITS = {
+    'price': (0.01, 1e6),
+    'iv_environment': (1, 2000)
+}
+
+ENDPOINTS = {
+    '/plan': Endpoint(plan_worker, {
+        **MARKET_PARAMS,
+        'month': (int, 1),
+        'premium_collected': (float, 1000.0),
+        'portfolio_value': (float, 25000.0),
+        'monthly_capital': (int, 4000)
+    }, {**MARKET_LIMITS, 'month': (1, 120), 'premium_collected': (0, 1e9),
+        'portfolio_value': (1, 1e12), 'monthly_capital': (0, 1e9)}),
+    '/risk': Endpoint(risk_worker, {
+        **MARKET_PARAMS,
+        'portfolio_value': (float, 25000.0),
+        'position_size': (float, 20000.0)
+    }, {**MARKET_LIMITS, 'portfolio_value': (1, 1e12), 'position_size': (0, 1e12)}),
+    '/projections': Endpoint(projections_worker, {
+        'price': (float, 2.40),
+        'months': (int, 6),
+        'monthly_capital': (int, 4000),
+        'initial_portfolio': (float, 3792.0),
+        'premium_collected': (float, 4349.0)
+    }, {'price': MARKET_LIMITS['price'], 'months': (1, 600), 'monthly_capital': (0, 1e9),
+        'initial_portfolio': (0, 1e12), 'premium_collected': (0, 1e9)})
+}
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes = b''
+    etag: Optional[str] = None
+
+
+class ResponseCache:
+    """LRU of canonical key -> (ETag, body, stored_at) with optional TTL"""
+
+    def __init__(self, max_entries: int = 4096, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[str, bytes, float]]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def put(self, key: str, body: bytes) -> str:
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self._entries[key] = (etag, body, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return etag
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PlanService:
+    """Routes, caches and coalesces requests; engines run in a process pool"""
+
+    def __init__(self, max_workers: Optional[int] = None, cache_entries: int = 4096,
+                 ttl: Optional[float] = None, endpoints: Optional[Dict[str, Endpoint]] = None):
+        """
+        Args:
+            max_workers: Process pool size (default os.cpu_count())
+            cache_entries: LRU capacity in responses
+            ttl: Seconds a cached response stays valid (None = until evicted)
+            endpoints: Path -> Endpoint table (default ENDPOINTS)
+        """
+        self.endpoints = endpoints or ENDPOINTS
+        self.cache = ResponseCache(cache_entries, ttl)
+        self.pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                        initializer=_warm_worker)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'computed': 0,
+                      'not_modified': 0, 'errors': 0}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def handle(self, target: str, if_none_match: Optional[str] = None) -> Response:
+        """Resolve one GET target to a response"""
+        self.stats['requests'] += 1
+        url = urlsplit(target)
+        if url.path == '/health':
+            return Response(HTTPStatus.OK, dumps({'status': 'ok', 'cached': len(self.cache),
+                                                  'in_flight': len(self.in_flight), **self.stats}))
+        endpoint = self.endpoints.get(url.path)
+        if endpoint is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"Unknown path {url.path}")
+        try:
+            params = endpoint.parse(url.query)
+        except ValueError as exc:
+            return self._error(HTTPStatus.BAD_REQUEST, str(exc))
+
+        key = url.path + '?' + json.dumps(params, sort_keys=True, separators=(',', ':'))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+        else:
+            try:
+                cached = await self._compute(key, endpoint, params)
+            except ValueError as exc:
+                return self._error(HTTPStatus.BAD_REQUEST, str(exc))
+            except Exception as exc:
+                logger.exception(f"Worker failed for {key}")
+                return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, type(exc).__name__)
+
+        etag, body = cached
+        if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(',')):
+            self.stats['not_modified'] += 1
+            return Response(HTTPStatus.NOT_MODIFIED, etag=etag)
+        return Response(HTTPStatus.OK, body, etag)
+
+    async def _compute(self, key: str, endpoint: Endpoint, params: Dict) -> Tuple[str, bytes]:
+        """Run the worker once per key however many requests are waiting on it"""
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The request computing this key was cancelled, not this one: take over
+                return await self._compute(key, endpoint, params)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[key] = future
+        try:
+            body = await loop.run_in_executor(self.pool, endpoint.worker, params)
+            result = (self.cache.put(key, body), body)
+            self.stats['computed'] += 1
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # Waiters re-raise; a lone request must not warn
+            raise
+        finally:
+            del self.in_flight[key]
+
+    def _error(self, status: int, message: str) -> Response:
+        self.stats['errors'] += 1
+        return Response(status, dumps({'error': message}))
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One keep-alive HTTP/1.1 connection"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, self._error(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                                          'Headers too large'), False, False)
+                    return
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await self._write(writer, self._error(HTTPStatus.BAD_REQUEST, 'Malformed request line'),
+                                      False, False)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, self._error(HTTPStatus.BAD_REQUEST, 'Malformed Content-Length'),
+                                      False, False)
+                    return
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+                if method not in ('GET', 'HEAD'):
+                    response = self._error(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed")
+                else:
+                    response = await self.handle(target, headers.get('if-none-match'))
+                await self._write(writer, response, keep_alive, method == 'HEAD')
+                if not keep_alive:
+                    return
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, response: Response, keep_alive: bool,
+                     head_only: bool):
+        status = HTTPStatus(response.status)
+        lines = [f'HTTP/1.1 {status.value} {status.phrase}', f'Server: {SERVER_NAME}',
+                 f'Content-Length: {len(response.body)}',
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if response.body:
+            lines.append('Content-Type: application/json')
+        if response.etag is not None:
+            lines += [f'ETag: {response.etag}', 'Cache-Control: no-cache']
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head_only:
+            writer.write(response.body)
+        await writer.drain()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        """Listen on host:port (port 0 picks a free one)"""
+        self.server = await asyncio.start_server(self._connection, host, port,
+                                                 limit=MAX_HEADER_BYTES, backlog=1024)
+        address = self.server.sockets[0].getsockname()
+        logger.info(f"ASST service listening on http://{address[0]}:{address[1]}")
+        return self.server
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            # Idle keep-alive connections see EOF and finish their loops
+            for writer in list(self._connections.values()):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self.server.wait_closed()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, **kwargs):
+    """Run the service until cancelled"""
+    service = PlanService(**kwargs)
+    server = await service.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+# Usage example
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        logging.basicConfig(level=logging.INFO)
+        asyncio.run(serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8765))
+        sys.exit()
+
+    logging.disable(logging.INFO)
+
+    async def get(reader, writer, target: str, etag: Optional[str] = None):
+        """Minimal keep-alive client: (status, headers, body)"""
+        extra = f'If-None-Match: {etag}\r\n' if etag else ''
+        writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n'.encode())
+        head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        headers = dict(line.split(': ', 1) for line in head[1:] if ': ' in line)
+        body = await reader.readexactly(int(headers['Content-Length']))
+        return int(head[0].split()[1]), headers, body
+
+    async def client(port: int, targets, results):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for target in targets:
+            results.append((await get(reader, writer, target))[0])
+        writer.close()
+
+    async def load(port: int, connections: int, targets) -> float:
+        results = []
+        start = time.perf_counter()
+        await asyncio.gather(*(client(port, targets[i::connections], results)
+                               for i in range(connections)))
+        elapsed = time.perf_counter() - start
+        assert all(status == 200 for status in results), set(results)
+        return len(results) / elapsed
+
+    async def demo():
+        service = PlanService()
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        status, headers, body = await get(reader, writer, '/plan?month=3&premium_collected=2500')
+        plan = json.loads(body)
+        print(f"/plan -> {status}, {len(body)} bytes, ETag {headers['ETag']}, "
+              f"new contracts {plan['premium_allocation']['estimated_new_contracts']}")
+        status, _, _ = await get(reader, writer, '/plan?premium_collected=2500&month=3',
+                                 headers['ETag'])
+        print(f"Same plan, parameters reordered, If-None-Match -> {status}")
+        status, _, body = await get(reader, writer, '/risk?portfolio_value=100000&position_size=99000')
+        print(f"/risk -> {status}, alerts {json.loads(body)['alerts']}")
+        status, _, body = await get(reader, writer, '/projections?months=12')
+        print(f"/projections -> {status}, month 12 shares "
+              f"{json.loads(body)['projections']['Cumulative_Shares'][-1]:,}")
+        status, _, body = await get(reader, writer, '/plan?month=soon')
+        print(f"Bad parameter -> {status} {json.loads(body)['error']}")
+        writer.close()
+
+        # Coalescing: many concurrent identical cold queries, one computation
+        before = service.stats['computed']
+        rate = await load(port, 100, ['/projections?months=60'] * 100)
+        print(f"100 concurrent identical cold requests: {service.stats['computed'] - before} "
+              f"computation, {service.stats['coalesced']} coalesced ({rate:,.0f} req/s)")
+
+        # Cold: distinct parameter sets, each computed in the pool
+        cold = [f'/plan?month={m}&premium_collected={1000 + 50 * i}'
+                for m in range(1, 7) for i in range(50)]
+        rate = await load(port, 32, cold)
+        print(f"{len(cold)} distinct plans over 32 connections: {rate:,.0f} req/s")
+
+        # Warm: dashboard polling the same views
+        warm = (cold[:40] + ['/risk', '/projections?months=6']) * 100
+        rate = await load(port, 32, warm)
+        print(f"{len(warm):,} cached requests over 32 connections: {rate:,.0f} req/s")
+        print(f"Stats: {service.stats}")
+        await service.close()
+
+    asyncio.run(demo())
@@ -0,0 +1,326 @@
+"""
+ASST Strategy Computational Core
+Shared array-based kernels for ASSTPremiumCompounder and ASSComprehensiveStrategy
+Author: Quantitative Strategy Team
+Date: October 2025
+
+Every function in this module is pure: inputs are scalars or NumPy arrays,
+outputs are arrays broadcast over the inputs, and no object state is read or
+written. Both strategy APIs delegate to these kernels through thin
+compatibility wrappers that convert results back to their historical dict
+layouts, so an optimization made here speeds up both APIs at once.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Sequence
+
+
+@dataclass(frozen=True)
+class AssignmentModelParams:
+    """Coefficients of the piecewise ITM/OTM assignment probability model"""
+    itm_base: float = 0.85
+    itm_boost: float = 0.15
+    itm_cap: float = 1.0
+    vol_weight: float = 0.0         # Added as (iv / 400) * vol_weight for ITM puts
+    otm_base: float = 0.05
+    otm_factor: float = 0.8
+    otm_exponent: float = 1.0       # Exponent applied to current_price / strike
+    otm_floor: float = 0.05
+    otm_cap: float = float('inf')
+    time_floor: float = 0.1
+
+
+# Coefficients used by ASSTPremiumCompounder (asst_volatility_arbitrage_model.py)
+COMPOUNDER_ASSIGNMENT_PARAMS = AssignmentModelParams()
+
+# Coefficients used by PositionManager (ASST_Advanced_Strategy_System.py)
+STRATEGY_ASSIGNMENT_PARAMS = AssignmentModelParams(
+    itm_cap=0.98,
+    vol_weight=0.05,
+    otm_exponent=2.0,
+    otm_floor=0.02,
+    otm_cap=0.50
+)
+
+
+@dataclass(frozen=True)
+class PremiumTiers:
+    """Step schedule mapping a strike measure to an estimated option premium"""
+    breakpoints: Sequence[float] = (5.0, 10.0)
+    premiums: Sequence[float] = (0.35, 0.25, 0.15)
+
+
+# Compounder tiers are keyed on the absolute strike
+COMPOUNDER_HEDGE_TIERS = PremiumTiers(breakpoints=(5.0, 10.0))
+
+# CallHedgeOptimizer tiers are keyed on moneyness (strike / current price)
+STRATEGY_HEDGE_TIERS = PremiumTiers(breakpoints=(2.0, 4.0))
+
+
+def kelly_position_size(portfolio_value, edge, variance, safety_factor) -> Dict[str, np.ndarray]:
+    """
+    Kelly Criterion position sizing
+
+    Args:
+        portfolio_value: Portfolio value(s)
+        edge: Expected return advantage
+        variance: Return variance
+        safety_factor: Fraction of full Kelly to deploy
+
+    Returns:
+        Dictionary of broadcast arrays (kelly_fraction, adjusted_kelly, position_size)
+    """
+    kelly_optimal = np.divide(edge, variance)
+    adjusted_kelly = kelly_optimal * safety_factor
+    position_size = np.multiply(portfolio_value, adjusted_kelly)
+
+    return {
+        'kelly_fraction': kelly_optimal,
+        'adjusted_kelly': adjusted_kelly,
+        'position_size': position_size
+    }
+
+
+def assignment_probability(strike, current_price, days_to_expiry=27, iv_level=0.0,
+                           params: AssignmentModelParams = COMPOUNDER_ASSIGNMENT_PARAMS) -> np.ndarray:
+    """
+    Piecewise assignment probability for short puts, vectorized over all inputs
+
+    Args:
+        strike: Put strike price(s)
+        current_price: Underlying price(s)
+        days_to_expiry: Days until expiration
+        iv_level: Implied volatility level (%), used only when params.vol_weight != 0
+        params: Model coefficients
+
+    Returns:
+        Assignment probability array (0.0 to 1.0)
+    """
+    strike = np.asarray(strike, dtype=float)
+    current_price = np.asarray(current_price, dtype=float)
+    time_factor = np.maximum(params.time_floor, np.divide(days_to_expiry, 30))
+
+    itm_adjustment = (current_price - strike) / current_price * params.itm_boost
+    itm_prob = params.itm_base + itm_adjustment
+    if params.vol_weight:
+        itm_prob = itm_prob + np.divide(iv_level, 400) * params.vol_weight
+    itm_prob = np.minimum(params.itm_cap, itm_prob)
+
+    price_ratio = current_price / strike
+    if params.otm_exponent != 1.0:
+        price_ratio = price_ratio ** params.otm_exponent
+    otm_prob = params.otm_base + price_ratio * time_factor * params.otm_factor
+    otm_prob = np.maximum(params.otm_floor, np.minimum(params.otm_cap, otm_prob))
+
+    return np.where(strike <= current_price, itm_prob, otm_prob)
+
+
+def weighted_average(values, weights) -> np.ndarray:
+    """Weighted sum of values along the last axis (weights are not renormalized)"""
+    return np.sum(np.multiply(values, weights), axis=-1)
+
+
+def compounding_allocation(premium, month, monthly_capital, put_allocation=0.70,
+                           call_allocation=0.30, scaling_step=0.15,
+                           scale_put_capital=False, contract_cost=250.0) -> Dict[str, np.ndarray]:
+    """
+    Monthly premium compounding allocation, vectorized over premium and month
+
+    Args:
+        premium: Premium collected this month
+        month: Month number(s), 1-based
+        monthly_capital: Fresh capital added each month
+        put_allocation: Share of premium reinvested in puts
+        call_allocation: Share of premium budgeted for call hedges
+        scaling_step: Per-month increment of the progressive scaling factor
+        scale_put_capital: Apply the scaling factor to the reinvested premium
+        contract_cost: Capital assumed to be consumed per new contract
+
+    Returns:
+        Dictionary of broadcast arrays describing the allocation
+    """
+    premium = np.asarray(premium, dtype=float)
+    scaling_factor = 1 + (np.asarray(month) - 1) * scaling_step
+
+    put_reinvestment = premium * put_allocation
+    call_hedge_budget = premium * call_allocation
+    deployed_put = put_reinvestment * scaling_factor if scale_put_capital else put_reinvestment
+    total_put_capital = deployed_put + monthly_capital
+
+    estimated_contracts = np.trunc(total_put_capital / contract_cost).astype(np.int64)
+    compounding_multiple = total_put_capital / monthly_capital
+
+    return {
+        'put_reinvestment': put_reinvestment,
+        'call_hedge_budget': call_hedge_budget,
+        'scaling_factor': scaling_factor,
+        'total_put_capital': total_put_capital,
+        'estimated_new_contracts': estimated_contracts,
+        'compounding_multiple': compounding_multiple
+    }
+
+
+def tiered_premium(measure, tiers: PremiumTiers) -> np.ndarray:
+    """
+    Look up the estimated premium for each strike measure on a step schedule
+
+    A measure equal to a breakpoint falls into the lower (more expensive) tier.
+    """
+    index = np.searchsorted(np.asarray(tiers.breakpoints, dtype=float), measure, side='left')
+    return np.asarray(tiers.premiums, dtype=float)[index]
+
+
+def option_contracts(budget, premium) -> np.ndarray:
+    """Whole contracts affordable with a budget at a per-share premium"""
+    return np.trunc(np.divide(budget, np.multiply(premium, 100))).astype(np.int64)
+
+
+def hedge_ladder(hedge_budget, weights, strike_measure, tiers: PremiumTiers,
+                 strikes_per_tier=1) -> Dict[str, np.ndarray]:
+    """
+    Allocate a call hedge budget across a ladder of strikes
+
+    Args:
+        hedge_budget: Total budget for call hedges
+        weights: Allocation weight per ladder rung
+        strike_measure: Value used for the premium tier lookup (strike or moneyness)
+        tiers: Premium schedule
+        strikes_per_tier: Number of strikes sharing each rung's allocation
+
+    Returns:
+        Dictionary of arrays aligned with strike_measure
+    """
+    rung_budget = np.multiply(hedge_budget, weights)
+    budget_per_strike = rung_budget / strikes_per_tier
+    premium = tiered_premium(strike_measure, tiers)
+    contracts = option_contracts(budget_per_strike, premium)
+
+    return {
+        'budget_allocation': rung_budget,
+        'budget_per_strike': budget_per_strike,
+        'estimated_premium': premium,
+        'contracts': contracts,
+        'total_cost': contracts * premium * 100
+    }
+
+
+def hedge_payoff_matrix(strikes, premiums, contracts, recovery_prices) -> Dict[str, np.ndarray]:
+    """
+    Expiry payoff of long calls for every (strike, recovery price) pair
+
+    Args:
+        strikes: Call strikes, shape (n,)
+        premiums: Premium paid per share, shape (n,)
+        contracts: Contracts held per strike, shape (n,)
+        recovery_prices: Target underlying prices, shape (m,)
+
+    Returns:
+        Dictionary of (n, m) arrays plus an 'in_profit' mask where price > breakeven
+    """
+    strikes = np.asarray(strikes, dtype=float)[:, None]
+    premiums = np.asarray(premiums, dtype=float)[:, None]
+    contracts = np.asarray(contracts)[:, None]
+    recovery_prices = np.asarray(recovery_prices, dtype=float)[None, :]
+
+    breakeven = strikes + premiums
+    cost_per_contract = premiums * 100
+    profit_per_contract = (recovery_prices - strikes) * 100 - cost_per_contract
+
+    return {
+        'in_profit': recovery_prices > breakeven,
+        'profit_per_contract': profit_per_contract,
+        'total_profit': profit_per_contract * contracts,
+        'leverage_multiple': profit_per_contract / cost_per_contract
+    }
+
+
+def norm_cdf(x) -> np.ndarray:
+    """
+    Standard normal CDF via the Chebyshev erfc approximation (|rel. error| < 1.2e-7)
+
+    Pure NumPy so that pricing kernels stay dependency-free and vectorized.
+    """
+    z = np.abs(np.asarray(x, dtype=float)) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = (-1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 +
+            t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 +
+            t * (-0.82215223 + t * 0.17087277)))))))))
+    erfc = t * np.exp(-z * z + poly)
+    return np.where(np.asarray(x) >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+_CDF_TABLE_LIMIT = 8.5
+_CDF_TABLE_NODES = 1 << 13
+_CDF_TABLE = None
+
+
+def norm_cdf_fast(x) -> np.ndarray:
+    """
+    Standard normal CDF by linear interpolation in an 8,193-node table
+
+    Absolute error is below 2e-7 and the table (value + slope per node)
+    stays cache-resident; used on dense scenario grids where the rational
+    approximation in norm_cdf dominates the run time. NaN inputs give NaN.
+    """
+    global _CDF_TABLE
+    if _CDF_TABLE is None:
+        nodes = np.linspace(-_CDF_TABLE_LIMIT, _CDF_TABLE_LIMIT, _CDF_TABLE_NODES + 1)
+        values = norm_cdf(nodes)
+        _CDF_TABLE = (values, np.append(np.diff(values), 0.0))
+    values, slopes = _CDF_TABLE
+
+    x = np.asarray(x, dtype=float)
+    position = np.multiply(x, _CDF_TABLE_NODES / (2 * _CDF_TABLE_LIMIT), out=np.empty(x.shape))
+    position += _CDF_TABLE_NODES / 2
+    np.clip(position, 0.0, _CDF_TABLE_NODES, out=position)
+    with np.errstate(invalid='ignore'):
+        index = position.astype(np.intp)
+    # NaN positions cast to an arbitrary index; any node will do, the NaN carries through
+    np.clip(index, 0, _CDF_TABLE_NODES, out=index)
+    position -= index
+    position *= slopes[index]
+    position += values[index]
+    return position
+
+
+def norm_pdf(x) -> np.ndarray:
+    """Standard normal density"""
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / np.sqrt(2.0 * np.pi)
+
+
+def black_scholes_d1_d2(spot, strike, time_to_expiry, sigma, rate=0.0):
+    """Black-Scholes d1 and d2 (time in years, sigma as a decimal)"""
+    sqrt_t = np.sqrt(np.maximum(time_to_expiry, 1e-12))
+    vol_sqrt_t = np.maximum(np.multiply(sigma, sqrt_t), 1e-12)
+    d1 = (np.log(np.divide(spot, strike)) + (rate + 0.5 * np.square(sigma)) * time_to_expiry) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def black_scholes_price(spot, strike, time_to_expiry, sigma, is_call, rate=0.0) -> np.ndarray:
+    """European option price per share, broadcast over all inputs"""
+    d1, d2 = black_scholes_d1_d2(spot, strike, time_to_expiry, sigma, rate)
+    discount = np.exp(-np.multiply(rate, time_to_expiry))
+    call = spot * norm_cdf(d1) - strike * discount * norm_cdf(d2)
+    put = strike * discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def black_scholes_vega(spot, strike, time_to_expiry, sigma, rate=0.0) -> np.ndarray:
+    """Price sensitivity to a 1.00 (100 vol point) change in sigma"""
+    d1, _ = black_scholes_d1_d2(spot, strike, time_to_expiry, sigma, rate)
+    return spot * norm_pdf(d1) * np.sqrt(time_to_expiry)
+
+
+def black_scholes_delta(spot, strike, time_to_expiry, sigma, is_call, rate=0.0) -> np.ndarray:
+    """Option delta per share"""
+    d1, _ = black_scholes_d1_d2(spot, strike, time_to_expiry, sigma, rate)
+    call_delta = norm_cdf(d1)
+    return np.where(is_call, call_delta, call_delta - 1.0)
+
+
+def exercise_probability(spot, strike, time_to_expiry, sigma, is_call, rate=0.0) -> np.ndarray:
+    """Risk-neutral probability of finishing in the money, N(d2) for calls and N(-d2) for puts"""
+    _, d2 = black_scholes_d1_d2(spot, strike, time_to_expiry, sigma, rate)
+    return np.where(is_call, norm_cdf(d2), norm_cdf(-d2))
@@ -12,6 +12,16 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from asst_strategy_core import (
+    COMPOUNDER_ASSIGNMENT_PARAMS, COMPOUNDER_HEDGE_TIERS, assignment_probability,
+    black_scholes_price, compounding_allocation, hedge_ladder, hedge_payoff_matrix,
+    kelly_position_size, option_contracts, weighted_average
+)
+from asst_margin import BuyingPowerLedger, MarginEngine, OptionLegs, short_put_ladder
+from asst_scenario_grid import HedgeBook, ScenarioEngine, scenario_names
+from asst_covered_call_overlay import CoveredCallOverlay
+from asst_compounding_kernels import COUNT_FIELDS, accumulation_paths
+
 class ASSTPremiumCompounder:
     """
     Comprehensive volatility arbitrage model for ASST share accumulation
@@ -19,8 +29,9 @@ class ASSTPremiumCompounder:
     """
 
     def __init__(self, current_price=2.40, monthly_capital=4000, 
-                 initial_portfolio=3792, premium_collected=4349):
+                 initial_portfolio=3792, premium_collected=4349, symbol='ASST'):
         """Initialize model with market parameters"""
+        self.symbol = symbol
         self.current_price = current_price
         self.monthly_capital = monthly_capital
         self.initial_portfolio = initial_portfolio
@@ -49,6 +60,24 @@ class ASSTPremiumCompounder:
             7.50: 0.35,   # 35% medium-term upside
             12.50: 0.25   # 25% explosive capture
         }
+        # Years to expiry of each hedge strike (Nov-15, Dec-20, Jan-16 expiries)
+        self.hedge_expiries = {5.00: 0.13, 7.50: 0.23, 12.50: 0.30}
+
+        # Assignment model coefficients (see asst_strategy_core)
+        self.assignment_params = COMPOUNDER_ASSIGNMENT_PARAMS
+
+        # Optional fitted VolSurface (asst_vol_surface); None keeps the flat 425% IV
+        self.vol_surface = None
+
+        # Optional live option chain; when set, covered calls are priced from it
+        self.option_chain = None
+
+        # New put contracts are sized to the buying power the broker holds
+        # ('cash', 'reg_t' or 'portfolio'); legacy sizing charges the
+        # weighted average strike * 100 per contract
+        self.margin_engine = MarginEngine()
+        self.margin_method = 'cash'
+        self.legacy_contract_sizing = False
 
     def calculate_optimal_position_size(self, portfolio_value, edge=0.15, 
                                       variance=0.25):
@@ -63,14 +92,13 @@ class ASSTPremiumCompounder:
         Returns:
             Optimal position size in dollars
         """
-        kelly_optimal = edge / variance
-        adjusted_kelly = kelly_optimal * self.personal_factor
-        position_size = portfolio_value * adjusted_kelly
+        sizing = kelly_position_size(portfolio_value, edge, variance, self.personal_factor)
+        adjusted_kelly = float(sizing['adjusted_kelly'])
 
         return {
-            'kelly_fraction': kelly_optimal,
+            'kelly_fraction': float(sizing['kelly_fraction']),
             'adjusted_kelly': adjusted_kelly,
-            'position_size': position_size,
+            'position_size': float(sizing['position_size']),
             'position_percent': adjusted_kelly * 100
         }
 
@@ -85,21 +113,9 @@ class ASSTPremiumCompounder:
         Returns:
             Assignment probability (0.0 to 1.0)
         """
-        moneyness = strike / self.current_price
-        time_decay_factor = max(0.1, days_to_expiry / 30)  # Time value effect
-
-        if strike <= self.current_price:
-            # ITM puts: High assignment probability
-            base_prob = 0.85
-            itm_boost = (self.current_price - strike) / self.current_price * 0.15
-            assignment_prob = min(1.0, base_prob + itm_boost)
-        else:
-            # OTM puts: Lower but non-zero assignment probability
-            base_prob = 0.05
-            otm_factor = (self.current_price / strike) * 0.8 * time_decay_factor
-            assignment_prob = max(0.05, base_prob + otm_factor)
-
-        return assignment_prob
+        # ITM puts: 0.85 base plus depth boost; OTM puts: time-scaled decay with 5% floor
+        return float(assignment_probability(strike, self.current_price, days_to_expiry,
+                                            params=self.assignment_params))
 
     def effective_cost_calculator(self, strike, premium_collected):
         """
@@ -125,6 +141,41 @@ class ASSTPremiumCompounder:
             'discount_to_current': (1 - effective_cost/self.current_price) * 100
         }
 
+    def put_ladder_unit(self, days_to_expiry=27, price=None):
+        """
+        One short put contract spread across the strike ladder
+
+        With price, one ladder per entry of price (flattened, price-major):
+        the same strikes and expiry, premium and vol taken at that spot.
+        """
+        strikes = np.array(list(self.strike_weights.keys()))
+        spot = self.current_price if price is None else np.ravel(price)[:, None]
+        t = days_to_expiry / 365
+        sigma = 4.25 if self.vol_surface is None else self.vol_surface.sigma(strikes, t, spot)
+        legs = short_put_ladder(spot, strikes, list(self.strike_weights.values()), sigma, t)
+        return legs if price is None else OptionLegs(**{k: v.ravel() for k, v in vars(legs).items()})
+
+    def put_contract_cost(self, price=None):
+        """Buying power one new ladder contract consumes, at each entry of price if given"""
+        if self.legacy_contract_sizing:
+            cost = float(weighted_average(list(self.strike_weights.keys()),
+                                          list(self.strike_weights.values()))) * 100
+            return cost if price is None else np.full(np.shape(price), cost)
+        if price is None:
+            ledger = BuyingPowerLedger(self.margin_engine, 0.0, self.margin_method)
+            return ledger.marginal_requirement(self.symbol, self.put_ladder_unit())
+        groups = np.repeat(np.arange(np.size(price)), len(self.strike_weights))
+        cost = self.margin_engine.standalone_requirement(self.put_ladder_unit(price=price), groups,
+                                                         self.margin_method)
+        return cost.reshape(np.shape(price))
+
+    def put_contract_capacity(self, put_capital):
+        """New ladder contracts that put_capital supports"""
+        if self.legacy_contract_sizing:
+            return int(np.trunc(put_capital / self.put_contract_cost()))
+        ledger = BuyingPowerLedger(self.margin_engine, put_capital, self.margin_method)
+        return ledger.max_contracts(self.symbol, self.put_ladder_unit(), put_capital)
+
     def monthly_compounding_cycle(self, current_premium, month_number=1):
         """
         Execute monthly premium compounding allocation
@@ -136,35 +187,34 @@ class ASSTPremiumCompounder:
         Returns:
             Allocation breakdown for puts and calls
         """
-        # Progressive scaling factor (accounts for compounding growth)
-        scaling_factor = 1 + (month_number - 1) * 0.15  # 15% monthly scaling
-
-        # Allocation calculations
-        put_reinvestment = current_premium * self.put_allocation
-        call_hedge_budget = current_premium * self.call_allocation
-        total_put_capital = put_reinvestment + self.monthly_capital
-
-        # Contract estimation (based on weighted average strike)
-        weighted_avg_strike = sum(strike * weight for strike, weight in self.strike_weights.items())
-        contract_cost_estimate = weighted_avg_strike * 100  # Per contract cost
-        estimated_new_contracts = int(total_put_capital / contract_cost_estimate)
+        weighted_avg_strike = float(weighted_average(list(self.strike_weights.keys()),
+                                                     list(self.strike_weights.values())))
+
+        # 15% monthly progressive scaling (reported only, not applied to capital)
+        allocation = compounding_allocation(
+            current_premium, month_number, self.monthly_capital,
+            put_allocation=self.put_allocation,
+            call_allocation=self.call_allocation,
+            scaling_step=0.15
+        )
+        total_put_capital = float(allocation['total_put_capital'])
 
         # Compounding metrics
-        compounding_multiple = total_put_capital / self.monthly_capital
+        compounding_multiple = float(allocation['compounding_multiple'])
         monthly_growth_rate = (compounding_multiple - 1) * 100
 
         return {
             'month': month_number,
             'premium_collected': current_premium,
-            'put_reinvestment': put_reinvestment,
-            'call_hedge_budget': call_hedge_budget,
+            'put_reinvestment': float(allocation['put_reinvestment']),
+            'call_hedge_budget': float(allocation['call_hedge_budget']),
             'total_put_capital': total_put_capital,
             'monthly_capital_added': self.monthly_capital,
-            'estimated_new_contracts': estimated_new_contracts,
+            'estimated_new_contracts': self.put_contract_capacity(total_put_capital),
             'weighted_avg_strike': weighted_avg_strike,
             'compounding_multiple': compounding_multiple,
             'monthly_growth_rate': monthly_growth_rate,
-            'scaling_factor': scaling_factor
+            'scaling_factor': float(allocation['scaling_factor'])
         }
 
     def assignment_management_protocol(self, assigned_shares, effective_cost_basis):
@@ -183,9 +233,17 @@ class ASSTPremiumCompounder:
         unrealized_profit = total_share_value - total_cost_basis
 
         # Covered call strategy (optional income enhancement)
-        cc_strike = effective_cost_basis * 1.25  # 25% above cost basis
-        cc_premium_estimate = max(0.10, (cc_strike - self.current_price) * 0.3)
-        monthly_cc_income = assigned_shares * cc_premium_estimate
+        if self.option_chain is not None:
+            overlay = CoveredCallOverlay(self.current_price, symbol=self.symbol)
+            lot = overlay.select([{'shares': assigned_shares, 'cost_basis': effective_cost_basis}],
+                                 self.option_chain).iloc[0]
+            cc_strike = None if np.isnan(lot['strike']) else float(lot['strike'])
+            cc_premium_estimate = float(np.nan_to_num(lot['premium']))
+            monthly_cc_income = float(lot['monthly_income'])
+        else:
+            cc_strike = effective_cost_basis * 1.25  # 25% above cost basis
+            cc_premium_estimate = max(0.10, (cc_strike - self.current_price) * 0.3)
+            monthly_cc_income = assigned_shares * cc_premium_estimate
 
         return {
             'assigned_shares': assigned_shares,
@@ -215,49 +273,80 @@ class ASSTPremiumCompounder:
         if recovery_scenarios is None:
             recovery_scenarios = [5.0, 7.5, 12.5, 20.0]
 
+        strikes = list(self.hedge_strikes.keys())
+        weights = list(self.hedge_strikes.values())
+
+        # Premium tiers: <= $5 near-term ($0.35), <= $10 medium ($0.25), above explosive ($0.15)
+        ladder = hedge_ladder(hedge_budget, weights, strikes, COMPOUNDER_HEDGE_TIERS)
+        payoff = hedge_payoff_matrix(strikes, ladder['estimated_premium'],
+                                     ladder['contracts'], recovery_scenarios)
+
         hedge_plan = []
 
-        for strike, weight in self.hedge_strikes.items():
-            allocation = hedge_budget * weight
-
-            # Estimate contracts based on current option pricing
-            if strike <= 5.0:
-                estimated_premium = 0.35  # Near-term protection
-            elif strike <= 10.0:
-                estimated_premium = 0.25  # Medium-term upside
-            else:
-                estimated_premium = 0.15  # Long-term explosive
-
-            contracts = int(allocation / (estimated_premium * 100))
-
-            # Calculate breakeven and profit targets
-            breakeven = strike + estimated_premium
-            profit_scenarios = []
-
-            for recovery_price in recovery_scenarios:
-                if recovery_price > breakeven:
-                    profit_per_contract = (recovery_price - strike) * 100 - (estimated_premium * 100)
-                    total_profit = profit_per_contract * contracts
-                    leverage_multiple = profit_per_contract / (estimated_premium * 100)
-                    profit_scenarios.append({
-                        'recovery_price': recovery_price,
-                        'profit_per_contract': profit_per_contract,
-                        'total_profit': total_profit,
-                        'leverage_multiple': leverage_multiple
-                    })
+        for i, (strike, weight) in enumerate(self.hedge_strikes.items()):
+            estimated_premium = float(ladder['estimated_premium'][i])
+            contracts = int(ladder['contracts'][i])
+
+            # Profit targets only for recovery prices above breakeven
+            profit_scenarios = [
+                {
+                    'recovery_price': recovery_price,
+                    'profit_per_contract': float(payoff['profit_per_contract'][i, j]),
+                    'total_profit': float(payoff['total_profit'][i, j]),
+                    'leverage_multiple': float(payoff['leverage_multiple'][i, j])
+                }
+                for j, recovery_price in enumerate(recovery_scenarios)
+                if payoff['in_profit'][i, j]
+            ]
 
             hedge_plan.append({
                 'strike': strike,
                 'allocation_weight': weight,
-                'budget_allocation': allocation,
+                'budget_allocation': float(ladder['budget_allocation'][i]),
                 'estimated_premium': estimated_premium,
                 'contracts': contracts,
-                'breakeven_price': breakeven,
+                'breakeven_price': strike + estimated_premium,
                 'profit_scenarios': profit_scenarios
             })
 
         return hedge_plan
 
+    def project_accumulation(self, months=6, base_return=None, price=None,
+                             assignment_rate=None, n_paths=None):
+        """
+        Month-by-month accumulation recurrence across one or many paths
+
+        Args:
+            months: Horizon in months
+            base_return: Monthly premium return on portfolio value, scalar, per
+                month or (paths, months); default 8% rising 1% a month
+            price: Share price path(s); default the current price. New
+                contracts are sized at each (path, month) price: the ladder's
+                margin is recomputed there (see put_contract_cost)
+            assignment_rate: Share of new contracts assigned; default 55% to 80%
+            n_paths: Number of paths when all inputs are shared
+
+        Returns:
+            Dictionary of (paths, months) arrays (see asst_compounding_kernels)
+        """
+        weighted_avg_strike = float(weighted_average(list(self.strike_weights.keys()),
+                                                     list(self.strike_weights.values())))
+        return accumulation_paths(
+            months,
+            start_value=self.initial_portfolio + self.premium_collected,
+            monthly_capital=self.monthly_capital,
+            contract_cost=self.put_contract_cost(price),
+            effective_cost=weighted_avg_strike - (weighted_avg_strike * 0.45),
+            price=self.current_price if price is None else price,
+            base_return=base_return,
+            assignment_rate=assignment_rate,
+            n_paths=n_paths,
+            start_premium=self.premium_collected,
+            start_contracts=38,  # Starting contracts
+            put_allocation=self.put_allocation,
+            call_allocation=self.call_allocation
+        )
+
     def generate_6month_projections(self):
         """
         Generate comprehensive 6-month accumulation projections
@@ -265,123 +354,91 @@ class ASSTPremiumCompounder:
         Returns:
             DataFrame with month-by-month projections
         """
-        months_data = []
-        cumulative_shares = 0
-        cumulative_premium = self.premium_collected
-        current_contracts = 38  # Starting contracts
-        current_portfolio_value = self.initial_portfolio + self.premium_collected
-
-        for month in range(1, 7):
-            # Progressive return scaling (compounding effect)
-            base_return = 0.08 + (month - 1) * 0.01  # 8% to 13% progression
-            monthly_premium = current_portfolio_value * base_return
-
-            # Compounding cycle calculation
-            cycle = self.monthly_compounding_cycle(monthly_premium, month)
-            cumulative_premium += monthly_premium
-
-            # Position scaling
-            new_contracts = cycle['estimated_new_contracts']
-            current_contracts += new_contracts
-
-            # Assignment calculations
-            assignment_rate = min(0.80, 0.50 + month * 0.05)  # Progressive 50% to 80%
-            monthly_assignments = int(new_contracts * assignment_rate)
-            new_shares = monthly_assignments * 100
-            cumulative_shares += new_shares
-
-            # Cost basis and valuation
-            effective_cost = cycle['weighted_avg_strike'] - (cycle['weighted_avg_strike'] * 0.45)
-            share_value_current = cumulative_shares * self.current_price
-            total_cost_basis = cumulative_shares * effective_cost
-
-            # Portfolio value calculation
-            current_portfolio_value += self.monthly_capital + (monthly_premium * 0.30)
-            call_hedge_value = cycle['call_hedge_budget'] * month  # Cumulative
-            total_portfolio_value = current_portfolio_value + share_value_current - total_cost_basis + call_hedge_value
-
-            months_data.append({
-                'Month': month,
-                'Monthly_Premium': monthly_premium,
-                'Put_Reinvestment': cycle['put_reinvestment'],
-                'Call_Hedge_Budget': cycle['call_hedge_budget'],
-                'New_Contracts': new_contracts,
-                'Total_Contracts': current_contracts,
-                'Monthly_Assignments': monthly_assignments,
-                'New_Shares': new_shares,
-                'Cumulative_Shares': cumulative_shares,
-                'Effective_Cost_Per_Share': effective_cost,
-                'Share_Value_Current': share_value_current,
-                'Total_Cost_Basis': total_cost_basis,
-                'Call_Hedge_Value': call_hedge_value,
-                'Cumulative_Premium': cumulative_premium,
-                'Portfolio_Value': total_portfolio_value,
-                'Compounding_Multiple': cycle['compounding_multiple']
-            })
+        # Progressive 8% to 13% returns and 55% to 80% assignment rates
+        paths = self.project_accumulation(6)
 
-        return pd.DataFrame(months_data)
+        months_data = pd.DataFrame({'Month': np.arange(1, 7)})
+        for name, values in paths.items():
+            column = values[0]
+            months_data[name] = column.astype(np.int64) if name in COUNT_FIELDS else column
+        return months_data
 
-    def appreciation_scenarios(self, final_shares, effective_cost, total_premium, 
-                             hedge_value, target_prices=None):
+    def appreciation_scenarios(self, final_shares, effective_cost, total_premium,
+                             hedge_value, target_prices=None, horizon_years=None, vol=None):
         """
         Calculate long-term appreciation scenarios
 
+        The hedge budget is split across hedge_strikes and bought at
+        Black-Scholes premiums; the same model and volatility mark the
+        ladder at every target price in one scenario grid pass.
+
         Args:
             final_shares: Total accumulated shares
             effective_cost: Average cost per share
             total_premium: Total premium collected
-            hedge_value: Call hedge portfolio value
-            target_prices: List of recovery target prices
+            hedge_value: Budget spent on the call hedge ladder
+            target_prices: Recovery target prices (any number)
+            horizon_years: Time from today at which the hedges are marked;
+                           defaults to the last hedge expiry (intrinsic value)
+            vol: Hedge pricing volatility (decimal); defaults to the vol
+                 surface when one is set, otherwise 4.25
 
         Returns:
             List of scenario dictionaries
         """
         if target_prices is None:
             target_prices = [5.0, 8.0, 12.0, 20.0, 30.0]
-
-        scenarios = []
-        scenario_names = ['Conservative', 'Moderate', 'Strong', 'Explosive', 'Extreme']
-
-        for i, target_price in enumerate(target_prices):
-            share_value = final_shares * target_price
-            share_cost = final_shares * effective_cost
-            share_profit = share_value - share_cost
-
-            # Hedge profit estimation (conservative)
-            price_multiple = target_price / self.current_price
-            hedge_multiplier = min(15, price_multiple * 2)  # Cap at 15x
-            hedge_profit = hedge_value * hedge_multiplier
-
-            total_return = share_profit + total_premium + hedge_profit
-
-            scenarios.append({
-                'Scenario': scenario_names[i],
-                'Target_Price': target_price,
-                'Share_Value': share_value,
-                'Share_Profit': share_profit,
-                'Hedge_Profit': hedge_profit,
-                'Total_Premium': total_premium,
-                'Total_Return': total_return,
-                'Price_Multiple': price_multiple,
-                'Hedge_Leverage': hedge_multiplier
-            })
-
-        return scenarios
+        target_prices = np.asarray(target_prices, dtype=float)
+
+        strikes = np.array(list(self.hedge_strikes.keys()))
+        expiries = np.array([self.hedge_expiries[strike] for strike in strikes])
+        if vol is None and self.vol_surface is None:
+            vol = 4.25
+        sigma = vol if vol is not None else self.vol_surface.sigma(strikes, expiries, self.current_price)
+        engine = ScenarioEngine(self.current_price, effective_cost, total_premium,
+                                vol_surface=self.vol_surface)
+
+        # Buy the ladder at the prices the grid marks it with
+        premiums = black_scholes_price(self.current_price, strikes, expiries, sigma, True, engine.rate)
+        contracts = option_contracts(np.multiply(hedge_value, list(self.hedge_strikes.values())),
+                                     premiums)
+        engine.hedge_book = HedgeBook(strikes, contracts.astype(float), premiums, expiries)
+        if horizon_years is None:
+            horizon_years = float(expiries.max())
+        grid = engine.evaluate(target_prices, (horizon_years,), None if vol is None else (vol,),
+                               (final_shares,))
+
+        return pd.DataFrame({
+            'Scenario': scenario_names(target_prices),
+            'Target_Price': target_prices,
+            'Share_Value': grid['share_value'].reshape(-1),
+            'Share_Profit': grid['share_profit'].reshape(-1),
+            'Hedge_Profit': grid['hedge_profit'].reshape(-1),
+            'Total_Premium': total_premium,
+            'Total_Return': grid['total_return'].reshape(-1),
+            'Price_Multiple': grid['price_multiple'].reshape(-1),
+            'Hedge_Leverage': grid['hedge_multiple'].reshape(-1)
+        }).to_dict('records')
 
     def risk_metrics_calculator(self, portfolio_value, position_size, 
-                               iv_level=425, time_horizon=30):
+                               iv_level=None, time_horizon=30):
         """
         Calculate comprehensive risk metrics
 
         Args:
             portfolio_value: Current portfolio value
             position_size: Total position size
-            iv_level: Implied volatility level (%)
+            iv_level: Implied volatility level (%), defaults to the ATM surface
+                      vol at time_horizon or 425 without a surface
             time_horizon: Risk time horizon in days
 
         Returns:
             Risk metrics dictionary
         """
+        if iv_level is None:
+            iv_level = 425 if self.vol_surface is None else float(
+                self.vol_surface.iv_level(self.current_price, time_horizon, self.current_price))
+
         # Position concentration
         concentration = (position_size / portfolio_value) * 100
 
@@ -0,0 +1,76 @@
+import pandas as pd
+
+from asst_alert_rules import AlertRule, RuleEngine, daily_risk_rules
+from ASST_Advanced_Strategy_System import RiskManager, StrategyParameters
+from asst_risk_automation import ASSRiskMonitor
+from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
+LIMIT = AlertRule('limit', 'x', '>', 10, clear=8)
+
+
+def _fired(engine, values, step=60.0):
+    """Number of alerts sent by each successive single-book update"""
+    return [len(engine.update({'x': value}, now=i * step)) for i, value in enumerate(values)]
+
+
+def test_persistent_breach_alerts_once():
+    assert _fired(RuleEngine([LIMIT]), [11, 12, 15, 11, 12]) == [1, 0, 0, 0, 0]
+
+
+def test_hysteresis_rearms_only_below_clear_level():
+    # 9 is under the threshold but above the clear level: still active, no re-alert
+    assert _fired(RuleEngine([LIMIT]), [11, 9, 11, 7, 11]) == [1, 0, 0, 0, 1]
+
+
+def test_renotify_repeats_active_alert():
+    rule = AlertRule('limit', 'x', '>', 10, clear=8, renotify=120)
+    assert _fired(RuleEngine([rule]), [11] * 6) == [1, 0, 1, 0, 1, 0]
+
+
+def test_alerts_for_reports_active_state_under_rate_limit():
+    engine = RuleEngine([LIMIT], max_alerts=0)
+    assert engine.update({'x': 11}, now=0.0) == [] and engine.pending == 1
+    assert [alert['rule'] for alert in engine.alerts_for({'x': 11})] == ['limit']
+    engine.update({'x': 7}, now=60.0)
+    assert engine.alerts_for({'x': 7}) == []
+
+
+def test_rate_limit_holds_alerts_pending_most_severe_first():
+    rules = [AlertRule('low', 'x', '>', 10), AlertRule('high', 'x', '>', 10, severity='CRITICAL')]
+    engine = RuleEngine(rules, max_alerts=2, period=60)
+    frame = pd.DataFrame({'x': [11.0, 50.0]}, index=['a', 'b'])
+
+    first = engine.update(frame, now=0.0)
+    assert [(a['book'], a['rule']) for a in first] == [('a', 'high'), ('b', 'high')]
+    assert engine.pending == 2
+
+    # Nothing refills within the period; the held alerts go out once tokens return
+    assert engine.update(frame, now=10.0) == [] and engine.pending == 2
+    later = engine.update(frame, now=60.0)
+    assert sorted((a['book'], a['rule']) for a in later) == [('a', 'low'), ('b', 'low')]
+    assert engine.pending == 0
+    assert engine.update(frame, now=120.0) == []
+
+
+def test_risk_manager_dedups_by_default():
+    manager = RiskManager(StrategyParameters())
+    for _ in range(5):
+        metrics = manager.calculate_portfolio_risk(100_000, 99_000)
+    assert manager.risk_alerts.count('CONCENTRATION: Extremely high ASST concentration') == 1
+    # The return value still reports the breach while it persists
+    assert 'CONCENTRATION: Extremely high ASST concentration' in \
+        manager.check_risk_thresholds(metrics)
+
+
+def test_daily_risk_check_uses_compiled_rules():
+    monitor = ASSRiskMonitor(ASSTPremiumCompounder())
+    positions = [{'symbol': 'ASST', 'type': 'put', 'strike': 2.5, 'quantity': -22, 'value': -2596}]
+    notified = []
+    monitor.alert_engine.sinks.append(notified.extend)
+    first = monitor.daily_risk_check(positions, {'buying_power': 5000})
+    assert 'Low hedge ratio' in ' '.join(alert['message'] for alert in first['alerts'])
+    # Active alerts repeat in the result; the sink hears about the breach once
+    assert monitor.daily_risk_check(positions, {'buying_power': 5000})['alerts'] == first['alerts']
+    assert [alert['message'] for alert in notified] == [alert['message'] for alert in first['alerts']]
+    assert [rule.name for rule in monitor.alert_engine.rules] == \
+        [rule.name for rule in daily_risk_rules(monitor.risk_thresholds)]
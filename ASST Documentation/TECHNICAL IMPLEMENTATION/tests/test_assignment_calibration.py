@@ -0,0 +1,165 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_assignment_calibration import (
+    PARAMS_FILE, VALIDATION_COLUMNS, VALIDATION_FILE, AssignmentCalibrator,
+    LogisticAssignmentModel, load_fitted_params, simulate_assignment_history
+)
+from asst_strategy_core import AssignmentModelParams, assignment_probability
+
+
+def _history(params, n=400_000, seed=0):
+    """Contracts whose assignment is drawn from the piecewise model itself"""
+    rng = np.random.default_rng(seed)
+    current = np.full(n, 2.40)
+    strike = current * np.exp(rng.uniform(-0.5, 0.5, n))
+    dte = rng.integers(3, 31, n)
+    iv_level = rng.uniform(200, 600, n)
+    probability = assignment_probability(strike, current, dte, iv_level, params)
+    assert probability.min() > params.otm_floor and probability.max() < 1.0
+    return pd.DataFrame({'strike': strike, 'current_price': current, 'days_to_expiry': dte,
+                         'iv_level': iv_level, 'assigned': rng.random(n) < probability})
+
+
+@pytest.mark.parametrize('truth', [
+    AssignmentModelParams(itm_base=0.30, itm_boost=0.40, otm_base=0.10, otm_factor=0.30),
+    AssignmentModelParams(itm_base=0.20, itm_boost=0.30, vol_weight=0.25,
+                          otm_base=0.10, otm_factor=0.30)
+])
+def test_fit_piecewise_recovers_known_params(truth):
+    base = AssignmentModelParams(vol_weight=0.05 if truth.vol_weight else 0.0)
+    calibrator = AssignmentCalibrator(base_params=base)
+    fitted = calibrator.fit_piecewise(calibrator.prepare(_history(truth)))
+    for name in ('itm_base', 'itm_boost', 'vol_weight', 'otm_base', 'otm_factor'):
+        assert getattr(fitted, name) == pytest.approx(getattr(truth, name), abs=0.03), name
+
+
+def test_piecewise_fit_is_unbiased_without_iv_term():
+    # Default compounder params ignore IV, so the fit must not lean on an IV slope
+    calibrator = AssignmentCalibrator()
+    data = calibrator.prepare(simulate_assignment_history(200_000))
+    fitted = calibrator.fit_piecewise(data)
+    assert fitted.vol_weight == 0.0
+    below = data['strike'] <= data['current_price']
+    predicted = calibrator.predict_piecewise(fitted, data)
+    assert predicted[below].mean() == pytest.approx(data['assigned'][below].mean(), abs=0.01)
+
+
+def test_fit_logistic_recovers_known_slopes():
+    history = simulate_assignment_history(200_000, seed=2)
+    raw = LogisticAssignmentModel.raw_features(history['strike'], history['current_price'],
+                                               history['days_to_expiry'], history['iv_level'])
+    truth = np.array([1.5, 0.4, -0.3, 0.8, 0.5])
+    rng = np.random.default_rng(3)
+    history['assigned'] = rng.random(len(raw)) < 1 / (1 + np.exp(-(raw @ truth - 0.7)))
+
+    calibrator = AssignmentCalibrator()
+    model = calibrator.fit_logistic(calibrator.prepare(history))
+    np.testing.assert_allclose(model.coefficients[1:] / model.feature_scale, truth, atol=0.1)
+    np.testing.assert_allclose(model.predict(history['strike'][:5], history['current_price'][:5],
+                                             history['days_to_expiry'][:5], history['iv_level'][:5]),
+                               1 / (1 + np.exp(-(raw[:5] @ truth - 0.7))), atol=0.02)
+
+
+def test_zero_weight_rows_fit_like_a_subset():
+    history = simulate_assignment_history(20_000, seed=4)
+    calibrator = AssignmentCalibrator()
+    keep = np.random.default_rng(5).random(len(history)) < 0.6
+    data = calibrator.prepare(history)
+    masked = calibrator.fit_logistic(data, weights=keep.astype(float))
+    subset = calibrator.fit_logistic(calibrator.prepare(history[keep]))
+    query = (np.array([2.0, 2.5, 3.0]), np.full(3, 2.4), np.array([5, 20, 45]), np.full(3, 400.0))
+    np.testing.assert_allclose(masked.predict(*query), subset.predict(*query), rtol=1e-8)
+
+
+def _probe(calibrator, monkeypatch, check):
+    """Replace the models with one whose 'fit' returns its training rows"""
+    def fit(data, weights=None, rows=slice(None), initial=None):
+        n = len(data['assigned'])
+        trained = np.zeros(n, dtype=bool)
+        trained[rows] = True
+        return trained & (np.ones(n, dtype=bool) if weights is None else weights > 0)
+
+    def predict(trained, data, rows=slice(None)):
+        tested = np.zeros(len(trained), dtype=bool)
+        tested[rows] = True
+        check(data, trained, tested)
+        return np.flatnonzero(tested).astype(float)
+
+    monkeypatch.setattr(calibrator, '_models', lambda: {'probe': (fit, predict)})
+
+
+def test_cross_validation_predicts_every_row_once_out_of_sample(monkeypatch):
+    calibrator = AssignmentCalibrator(n_folds=5)
+    data = calibrator.prepare(simulate_assignment_history(5_000))
+    counts = np.zeros(len(data['assigned']), dtype=int)
+
+    def check(data, trained, tested):
+        assert not (trained & tested).any()
+        assert (trained | tested).all()
+        counts[tested] += 1
+
+    _probe(calibrator, monkeypatch, check)
+    oos = calibrator.cross_validate(data)['probe']
+    assert (counts == 1).all()
+    np.testing.assert_array_equal(oos, np.arange(len(counts)))
+
+
+def test_cross_validated_probabilities_are_all_filled():
+    calibrator = AssignmentCalibrator(n_folds=4)
+    oos = calibrator.cross_validate(calibrator.prepare(simulate_assignment_history(5_000)))
+    for probability in oos.values():
+        assert np.isfinite(probability).all() and (probability >= 0).all() and (probability <= 1).all()
+
+
+def test_walk_forward_trains_only_on_earlier_rows(monkeypatch):
+    # Shuffled input; each contract's price encodes its trade date
+    n = 6_000
+    order = np.random.default_rng(6).permutation(n)
+    history = pd.DataFrame({'trade_date': np.datetime64('2021-01-04') + order.astype('timedelta64[D]'),
+                            'strike': 2.5, 'current_price': 1.0 + order, 'days_to_expiry': 20,
+                            'assigned': order % 2})
+    calibrator = AssignmentCalibrator(walk_forward_splits=4)
+    data = calibrator.prepare(history)
+    counts = np.zeros(n, dtype=int)
+
+    def check(data, trained, tested):
+        assert trained.any() and tested.any()
+        assert data['current_price'][trained].max() < data['current_price'][tested].min()
+        counts[tested] += 1
+
+    _probe(calibrator, monkeypatch, check)
+    tested, oos = calibrator.walk_forward(data)
+    assert tested == slice(n // 5, n)
+    assert (counts[:n // 5] == 0).all() and (counts[n // 5:] == 1).all()
+    np.testing.assert_array_equal(oos['probe'], np.arange(n // 5, n))
+
+
+def test_run_outputs_round_trip(tmp_path):
+    calibrator = AssignmentCalibrator(n_folds=3, walk_forward_splits=3)
+    result = calibrator.run(simulate_assignment_history(20_000, seed=7), str(tmp_path))
+
+    assert load_fitted_params(str(tmp_path)) == result['piecewise']
+    assert load_fitted_params(str(tmp_path / PARAMS_FILE)) == result['piecewise']
+    with open(tmp_path / PARAMS_FILE) as handle:
+        saved = json.load(handle)
+    assert saved['contracts'] == 20_000
+    logistic = LogisticAssignmentModel(*(np.array(saved['logistic'][key]) for key in
+                                         ('coefficients', 'feature_mean', 'feature_scale')),
+                                       saved['logistic']['time_floor'])
+    query = (np.array([2.0, 3.0]), np.full(2, 2.4), np.full(2, 20), np.full(2, 400.0))
+    np.testing.assert_allclose(logistic.predict(*query), result['logistic'].predict(*query),
+                               rtol=1e-12)
+
+    table = pd.read_csv(tmp_path / VALIDATION_FILE)
+    validation = result['validation']
+    assert list(table.columns) == list(VALIDATION_COLUMNS) and len(table) == 6
+    pd.testing.assert_frame_equal(table[list(VALIDATION_COLUMNS[:3])],
+                                  validation[list(VALIDATION_COLUMNS[:3])])
+    for column in VALIDATION_COLUMNS[3:8]:
+        percent = table[column].str.rstrip('%').astype(float) / 100
+        np.testing.assert_allclose(percent, validation[column], atol=5e-4, err_msg=column)
+    np.testing.assert_allclose(table['Brier_Score'], validation['Brier_Score'], atol=5e-5)
@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from asst_assignment_forecast import (
+    AssignmentCashFlowForecaster, lattice_pmf, pmf_quantiles, poisson_binomial_pmf
+)
+from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
+
+def enumerated_pmf(p, w):
+    """Brute force over all 2^n outcomes"""
+    pmf = np.zeros(sum(w) + 1)
+    for outcome in itertools.product((0, 1), repeat=len(p)):
+        prob = np.prod([pj if o else 1 - pj for pj, o in zip(p, outcome)])
+        pmf[sum(wj for wj, o in zip(w, outcome) if o)] += prob
+    return pmf
+
+
+def dp_pmf(p):
+    """Textbook O(n^2) recursion"""
+    pmf = np.array([1.0])
+    for pj in p:
+        pmf = np.append(pmf * (1 - pj), 0.0) + np.append(0.0, pmf * pj)
+    return pmf
+
+
+def test_lattice_pmf_matches_enumeration():
+    rng = np.random.default_rng(1)
+    p = rng.uniform(0, 1, 12)
+    w = rng.integers(1, 9, 12)
+    np.testing.assert_allclose(lattice_pmf(p, w), enumerated_pmf(p, w), atol=1e-14)
+
+
+@pytest.mark.parametrize('n', [1, 7, 64, 1000])
+def test_poisson_binomial_matches_recursion(n):
+    p = np.random.default_rng(n).uniform(0, 1, n)
+    pmf = poisson_binomial_pmf(p)
+    np.testing.assert_allclose(pmf, dp_pmf(p), atol=1e-13)
+    assert np.arange(n + 1) @ pmf == pytest.approx(p.sum(), rel=1e-12)
+
+
+def test_degenerate_probabilities():
+    np.testing.assert_array_equal(poisson_binomial_pmf([1.0, 1.0, 0.0]), [0, 0, 1, 0])
+    np.testing.assert_array_equal(poisson_binomial_pmf([]), [1.0])
+    assert list(pmf_quantiles(np.array([0.25, 0.5, 0.25]), (0.25, 0.5, 0.99))) == [0, 1, 2]
+
+
+def test_forecast_cash_is_exact_on_the_strike_lattice():
+    model = ASSTPremiumCompounder()
+    forecaster = AssignmentCashFlowForecaster(model)
+    positions = [
+        {'type': 'put', 'strike': 2.5, 'quantity': -3, 'days_to_expiry': 6},
+        {'type': 'put', 'strike': 3.0, 'quantity': -2, 'days_to_expiry': 6},
+        {'type': 'call', 'strike': 5.0, 'quantity': 4, 'days_to_expiry': 6}
+    ]
+    forecast = forecaster.forecast(positions)
+    total = forecast['total']
+    assert total.n_contracts == 5 and total.cash_unit == 50.0
+
+    probabilities = [model.assignment_probability_model(k, 6) for k in (2.5,) * 3 + (3.0,) * 2]
+    expected = enumerated_pmf(probabilities, [5] * 3 + [6] * 2)
+    np.testing.assert_allclose(total.cash_pmf, expected, atol=1e-14)
+    assert total.expected_cash == pytest.approx(sum(p * k * 100 for p, k in
+                                                    zip(probabilities, (2.5,) * 3 + (3.0,) * 2)))
+    assert total.expected_shares == pytest.approx(100 * sum(probabilities))
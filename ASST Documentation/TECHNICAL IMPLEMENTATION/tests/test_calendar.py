@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from asst_calendar import ExpiryCalendar, nyse_holidays
+
+CALENDAR = ExpiryCalendar(as_of='2025-10-17', start='2021-01-01', end='2027-12-31')
+
+
+def _days(*dates):
+    return np.array(dates, dtype='datetime64[D]')
+
+
+def test_saturday_new_year_not_observed():
+    holidays = nyse_holidays(2021, 2023)
+    assert np.datetime64('2021-12-31') not in holidays   # 2022-01-01 was a Saturday
+    assert CALENDAR.is_trading_day(_days('2021-12-31'))[0]
+    assert np.datetime64('2023-01-02') in holidays       # Sunday moves to Monday
+
+
+def test_juneteenth_from_2022():
+    holidays = nyse_holidays(2021, 2026)
+    # 2021-06-19 was a Saturday: not yet an exchange holiday, so no Friday closure
+    assert np.datetime64('2021-06-18') not in holidays
+    assert np.datetime64('2022-06-20') in holidays       # Sunday observed on Monday
+    assert np.datetime64('2023-06-19') in holidays
+
+
+@pytest.mark.parametrize('good_friday', ['2022-04-15', '2024-03-29', '2025-04-18', '2026-04-03'])
+def test_good_friday_closed(good_friday):
+    assert not CALENDAR.is_trading_day(_days(good_friday))[0]
+
+
+@pytest.mark.parametrize('friday, session', [
+    ('2025-04-18', '2025-04-17'),   # Good Friday
+    ('2025-07-04', '2025-07-03'),   # Independence Day
+    ('2026-06-19', '2026-06-18'),   # Juneteenth
+    ('2026-07-03', '2026-07-02'),   # July 4th on a Saturday, observed Friday
+])
+def test_closed_friday_expiry_moves_to_prior_session(friday, session):
+    assert np.datetime64(session) in CALENDAR.expiries
+    assert np.datetime64(friday) not in CALENDAR.expiries
+    assert CALENDAR.parse([friday])[0] == np.datetime64(session)
+
+
+def test_monthly_expiries_are_third_fridays_or_the_prior_session():
+    monthly = CALENDAR.expiries[CALENDAR.monthly]
+    assert np.datetime64('2025-11-21') in monthly and np.datetime64('2026-01-16') in monthly
+    assert len(np.unique(monthly.astype('datetime64[M]'))) == len(monthly)
+
+
+def test_year_less_labels_roll_past_as_of():
+    expiry = CALENDAR.parse(['Oct-17', 'Oct-24', 'Oct-16', 'Jan 16', 'Nov-15-2025', '2026-04-03'])
+    np.testing.assert_array_equal(expiry, _days('2025-10-17', '2025-10-24', '2026-10-16',
+                                                '2026-01-16', '2025-11-14', '2026-04-02'))
+
+
+def test_trading_days_match_busday_count():
+    busdays = np.busdaycalendar(holidays=CALENDAR.holidays)
+    expiry = CALENDAR.expiries[CALENDAR.expiries >= CALENDAR.as_of]
+    # busday_count counts [begin, end); trading_days counts (as_of, expiry]
+    expected = np.busday_count(CALENDAR.as_of + 1, expiry + 1, busdaycal=busdays)
+    np.testing.assert_array_equal(CALENDAR.trading_days(expiry), expected)
+    np.testing.assert_array_equal(CALENDAR.trading_dte[CALENDAR.expiries >= CALENDAR.as_of], expected)
+
+    as_of = np.datetime64('2024-12-20')
+    np.testing.assert_array_equal(CALENDAR.trading_days(expiry, as_of),
+                                  np.busday_count(as_of + 1, expiry + 1, busdaycal=busdays))
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_chain_store import CHAIN_COLUMNS, DATA_FILE, ChainSnapshotStore, decode_column, encode_column, synthetic_snapshots
+
+
+def _frame(snapshots):
+    return pd.DataFrame({name: np.concatenate([s[name] for s in snapshots]).astype(dtype)
+                         for name, dtype in CHAIN_COLUMNS.items()})
+
+
+@pytest.fixture(scope='module')
+def snapshots():
+    return list(synthetic_snapshots(40, strikes_per_expiry=40))
+
+
+@pytest.mark.parametrize('values', [
+    np.arange(-5, 1000, 7, dtype=np.int64),
+    np.random.default_rng(0).normal(size=999),
+    np.array(['2024-01-02T09:30', '2024-01-02T09:31', 'NaT'], dtype='datetime64[ns]'),
+    np.array([True, False, True]),
+    np.zeros(0)
+])
+@pytest.mark.parametrize('codec', ['zlib', 'none'])
+def test_column_codecs_round_trip_bit_exact(values, codec):
+    decoded = decode_column(encode_column(values, codec), values.dtype, len(values), codec)
+    assert decoded.dtype == values.dtype
+    assert decoded.tobytes() == values.tobytes()
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'none'])
+def test_store_round_trips_every_row(tmp_path, snapshots, codec):
+    store = ChainSnapshotStore(str(tmp_path), chunk_rows=1000, codec=codec, max_workers=2)
+    for snapshot in snapshots:
+        store.append(snapshot)
+    store.close()
+
+    reopened = ChainSnapshotStore(str(tmp_path))
+    pd.testing.assert_frame_equal(reopened.read_frame(), _frame(snapshots), check_exact=True)
+    reopened.close()
+
+
+def test_range_and_expiry_reads_match_a_frame_filter(tmp_path, snapshots):
+    expected = _frame(snapshots)
+    store = ChainSnapshotStore(str(tmp_path), chunk_rows=777)
+    for snapshot in snapshots:
+        store.append(snapshot)
+    store.flush()
+
+    lo, hi = expected['timestamp'].iloc[1234], expected['timestamp'].iloc[2500]
+    expiry = expected['expiry'].iloc[500]
+    window = expected[(expected['timestamp'] >= lo) & (expected['timestamp'] < hi)]
+    pd.testing.assert_frame_equal(store.read_frame(lo, hi), window.reset_index(drop=True))
+    filtered = window[window['expiry'] == expiry][['bid', 'ask']].reset_index(drop=True)
+    pd.testing.assert_frame_equal(store.read_frame(lo, hi, ['bid', 'ask'], expiry), filtered)
+
+    latest = store.chain_at(lo)
+    assert (latest['timestamp'] == lo).all() and len(latest) == len(snapshots[0]['strike'])
+    store.close()
+
+
+def test_unindexed_tail_is_truncated_on_open(tmp_path, snapshots):
+    store = ChainSnapshotStore(str(tmp_path), chunk_rows=1000)
+    for snapshot in snapshots[:10]:
+        store.append(snapshot)
+    store.close()
+    with open(os.path.join(tmp_path, DATA_FILE), 'ab') as handle:
+        handle.write(b'partial chunk from a crash')
+
+    reopened = ChainSnapshotStore(str(tmp_path))
+    pd.testing.assert_frame_equal(reopened.read_frame(), _frame(snapshots[:10]), check_exact=True)
+    with pytest.raises(ValueError):
+        reopened.append(snapshots[0])
+    reopened.close()
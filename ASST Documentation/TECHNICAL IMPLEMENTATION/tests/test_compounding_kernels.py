@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_compounding_kernels import (
+    ACCUMULATION_FIELDS, GROWTH_FIELDS, _accumulation_scalar, _growth_scalar, _paths,
+    accumulation_paths, premium_growth_paths
+)
+from asst_margin import BuyingPowerLedger
+from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+from ASST_Advanced_Strategy_System import PremiumCompoundingEngine, StrategyParameters
+
+
+def legacy_6month_projections(model):
+    """generate_6month_projections as it was before the kernels (per-month dict loop)"""
+    months_data = []
+    cumulative_shares = 0
+    cumulative_premium = model.premium_collected
+    current_contracts = 38
+    current_portfolio_value = model.initial_portfolio + model.premium_collected
+    for month in range(1, 7):
+        base_return = 0.08 + (month - 1) * 0.01
+        monthly_premium = current_portfolio_value * base_return
+        cycle = model.monthly_compounding_cycle(monthly_premium, month)
+        cumulative_premium += monthly_premium
+        new_contracts = cycle['estimated_new_contracts']
+        current_contracts += new_contracts
+        assignment_rate = min(0.80, 0.50 + month * 0.05)
+        monthly_assignments = int(new_contracts * assignment_rate)
+        new_shares = monthly_assignments * 100
+        cumulative_shares += new_shares
+        effective_cost = cycle['weighted_avg_strike'] - (cycle['weighted_avg_strike'] * 0.45)
+        share_value_current = cumulative_shares * model.current_price
+        total_cost_basis = cumulative_shares * effective_cost
+        current_portfolio_value += model.monthly_capital + (monthly_premium * 0.30)
+        call_hedge_value = cycle['call_hedge_budget'] * month
+        months_data.append({
+            'Month': month,
+            'Monthly_Premium': monthly_premium,
+            'Put_Reinvestment': cycle['put_reinvestment'],
+            'Call_Hedge_Budget': cycle['call_hedge_budget'],
+            'New_Contracts': new_contracts,
+            'Total_Contracts': current_contracts,
+            'Monthly_Assignments': monthly_assignments,
+            'New_Shares': new_shares,
+            'Cumulative_Shares': cumulative_shares,
+            'Effective_Cost_Per_Share': effective_cost,
+            'Share_Value_Current': share_value_current,
+            'Total_Cost_Basis': total_cost_basis,
+            'Call_Hedge_Value': call_hedge_value,
+            'Cumulative_Premium': cumulative_premium,
+            'Portfolio_Value': current_portfolio_value + share_value_current - total_cost_basis + call_hedge_value,
+            'Compounding_Multiple': cycle['compounding_multiple']
+        })
+    return pd.DataFrame(months_data)
+
+
+def legacy_compound_growth(params, months=12):
+    """project_compound_growth as it was before the kernels"""
+    rows = []
+    for month in range(1, months + 1):
+        premium = 1000 * (1.12 ** (month - 1))
+        scaling_factor = 1 + (month - 1) * 0.12
+        total_put_capital = premium * params.premium_put_allocation * scaling_factor + params.monthly_capital
+        rows.append({
+            'Month': month,
+            'Monthly_Premium': round(premium, 0),
+            'Put_Capital': round(total_put_capital, 0),
+            'Call_Budget': round(premium * params.premium_call_allocation, 0),
+            'New_Contracts': int(total_put_capital / 250),
+            'Compounding_Multiple': round(total_put_capital / params.monthly_capital, 2),
+            'Growth_Rate_%': round((scaling_factor - 1) * 100, 1)
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('legacy_sizing', [True, False])
+def test_6month_projections_match_legacy_loop_exactly(legacy_sizing):
+    model = ASSTPremiumCompounder()
+    model.legacy_contract_sizing = legacy_sizing
+    pd.testing.assert_frame_equal(model.generate_6month_projections(),
+                                  legacy_6month_projections(model), check_exact=True)
+
+
+def test_legacy_sizing_charges_weighted_average_strike():
+    model = ASSTPremiumCompounder()
+    model.legacy_contract_sizing = True
+    assert model.put_contract_cost() == 277.5
+    assert model.monthly_compounding_cycle(1000)['estimated_new_contracts'] == int(4700 / 277.5)
+
+
+@pytest.mark.parametrize('method', ['cash', 'reg_t', 'portfolio'])
+def test_contract_counts_come_from_the_margin_ledger(method):
+    model = ASSTPremiumCompounder()
+    model.margin_method = method
+    cycle = model.monthly_compounding_cycle(1000)
+    ledger = BuyingPowerLedger(model.margin_engine, cycle['total_put_capital'], method)
+    expected = ledger.max_contracts('ASST', model.put_ladder_unit(), cycle['total_put_capital'])
+    assert cycle['estimated_new_contracts'] == expected
+    # The kernels' per-contract cost gives the same count on an empty ledger
+    assert expected == int(cycle['total_put_capital'] // model.put_contract_cost())
+
+    # Staging the sized ladder fits the capital; one more contract does not
+    unit = model.put_ladder_unit()
+    assert ledger.marginal_requirement('ASST', unit) * expected <= cycle['total_put_capital']
+    assert ledger.marginal_requirement('ASST', unit) * (expected + 1) > cycle['total_put_capital']
+
+
+def test_project_accumulation_matches_generate_6month_projections():
+    model = ASSTPremiumCompounder()
+    paths = model.project_accumulation(6, n_paths=3)
+    frame = model.generate_6month_projections()
+    for name in ACCUMULATION_FIELDS:
+        for p in range(3):
+            np.testing.assert_array_equal(paths[name][p], frame[name].to_numpy(dtype=float))
+
+
+@pytest.mark.parametrize('method', ['cash', 'reg_t', 'portfolio'])
+def test_contract_cost_at_each_price_matches_the_ledger(method):
+    model = ASSTPremiumCompounder()
+    model.margin_method = method
+    prices = np.array([[1.2, 2.4], [4.0, 9.5]])
+    cost = model.put_contract_cost(prices)
+    assert cost.shape == prices.shape
+    for price, expected_cost in zip(prices.ravel(), cost.ravel()):
+        at_price = ASSTPremiumCompounder(current_price=price)
+        at_price.margin_method = method
+        assert expected_cost == pytest.approx(at_price.put_contract_cost(), rel=1e-12)
+
+
+@pytest.mark.parametrize('method', ['cash', 'reg_t', 'portfolio'])
+def test_project_accumulation_sizes_contracts_at_the_path_price(method):
+    model = ASSTPremiumCompounder()
+    model.margin_method = method
+    prices = np.array([[2.4, 3.0, 4.5, 7.0], [2.4, 1.8, 1.2, 0.9]])
+    paths = model.project_accumulation(4, price=prices)
+    put_capital = paths['Put_Reinvestment'] + model.monthly_capital
+    for (p, m), price in np.ndenumerate(prices):
+        at_price = ASSTPremiumCompounder(current_price=price)
+        at_price.margin_method = method
+        assert paths['New_Contracts'][p, m] == at_price.put_contract_capacity(put_capital[p, m])
+
+
+def test_premium_growth_matches_project_compound_growth_exactly():
+    engine = PremiumCompoundingEngine(StrategyParameters(legacy_contract_sizing=True))
+    growth = premium_growth_paths(12, monthly_capital=engine.params.monthly_capital)
+    expected = legacy_compound_growth(engine.params)
+    actual = engine.project_compound_growth(12)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+    np.testing.assert_array_equal(growth['New_Contracts'][0], expected['New_Contracts'])
+    for name, decimals in (('Monthly_Premium', 0), ('Put_Capital', 0), ('Call_Budget', 0),
+                           ('Compounding_Multiple', 2)):
+        np.testing.assert_array_equal(growth[name][0].round(decimals), expected[name], err_msg=name)
+
+
+def test_compound_growth_contracts_match_monthly_allocation():
+    engine = PremiumCompoundingEngine(StrategyParameters())
+    growth = engine.project_compound_growth(12)
+    for month in (1, 6, 12):
+        allocation = engine.calculate_monthly_allocation(1000 * 1.12 ** (month - 1), month)
+        assert growth['New_Contracts'][month - 1] == allocation['estimated_new_contracts']
+    assert engine.contract_cost() < 250
+
+
+def _stochastic_inputs(months=36, n_paths=64, seed=3):
+    rng = np.random.default_rng(seed)
+    return (np.clip(rng.normal(0.10, 0.03, (n_paths, months)), 0.0, None),
+            rng.uniform(0.4, 0.9, (n_paths, months)),
+            2.40 * np.exp(np.cumsum(rng.normal(0, 0.25, (n_paths, months)), axis=1)))
+
+
+def test_accumulation_numpy_kernel_matches_scalar_kernel():
+    returns, rates, prices = _stochastic_inputs()
+    n_paths, months = returns.shape
+    cost = ASSTPremiumCompounder().put_contract_cost(prices)
+    kwargs = dict(start_value=8141.0, monthly_capital=4000.0, contract_cost=cost,
+                  effective_cost=1.52625, start_premium=4349.0)
+    vectorized = accumulation_paths(months, price=prices, base_return=returns,
+                                    assignment_rate=rates, use_jit=False, **kwargs)
+    out = _accumulation_scalar(
+        _paths(returns, n_paths, months), _paths(rates, n_paths, months),
+        _paths(prices, n_paths, months), 8141.0, 4349.0, 38.0, 4000.0, 0.70, 0.30,
+        _paths(cost, n_paths, months), 1.52625, 0.30,
+        np.empty((len(ACCUMULATION_FIELDS), months, n_paths)))
+    for i, name in enumerate(ACCUMULATION_FIELDS):
+        np.testing.assert_array_equal(vectorized[name], out[i].T, err_msg=name)
+
+
+def test_growth_numpy_kernel_matches_scalar_kernel():
+    growth = np.random.default_rng(5).normal(0.1, 0.05, (32, 24))
+    vectorized = premium_growth_paths(24, growth=growth, use_jit=False)
+    out = _growth_scalar(_paths(growth, 32, 24), 1000.0, 4000.0, 0.70, 0.30, 0.12, 250.0,
+                         np.empty((len(GROWTH_FIELDS), 24, 32)))
+    for i, name in enumerate(GROWTH_FIELDS):
+        np.testing.assert_array_equal(vectorized[name], out[i].T, err_msg=name)
+
+
+@pytest.mark.parametrize('use_jit', [None, True, False])
+def test_use_jit_flag_falls_back_without_numba(use_jit):
+    paths = accumulation_paths(6, 8141.0, 4000.0, 277.5, 1.52625, 2.40, use_jit=use_jit)
+    assert paths['Portfolio_Value'].shape == (1, 6)
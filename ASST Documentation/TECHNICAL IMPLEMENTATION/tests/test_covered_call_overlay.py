@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_covered_call_overlay import CoveredCallOverlay, OverlayConstraints
+from asst_vol_surface import synthetic_chain
+
+CHAIN = synthetic_chain(strikes_per_expiry=60)
+
+
+def _lots(n_lots=400, seed=5):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'lot_id': [f'LOT-{i:03d}' for i in range(n_lots)],
+        'shares': rng.integers(0, 40, n_lots) * 100 + rng.choice([0, 50], n_lots),
+        'cost_basis': rng.uniform(0.8, 6.0, n_lots).round(2)
+    })
+
+
+def _brute_force(lots, cands, markup):
+    """Highest monthly yield at or above each lot's floor, lowest strike on ties"""
+    picks = []
+    for basis in lots['cost_basis']:
+        eligible = cands[cands['strike'] >= basis * (1 + markup) - 1e-9]
+        picks.append(np.nan if eligible.empty else
+                     eligible['strike'].iloc[int(np.argmax(eligible['monthly_premium'].to_numpy()))])
+    return np.array(picks)
+
+
+def test_strike_never_below_cost_basis_floor():
+    lots = _lots()
+    selection = CoveredCallOverlay(2.40).select(lots, CHAIN)
+    written = selection[selection['contracts'] > 0]
+    assert len(written) and (written['strike'] >= written['cost_basis'] * 1.25 - 1e-9).all()
+    assert (written['called_away_profit'] > 0).all()
+
+    # Nothing clears a floor above the highest eligible strike
+    top = CoveredCallOverlay(2.40).candidates(CHAIN)['strike'].max()
+    above = CoveredCallOverlay(2.40).select([{'lot_id': 'A', 'shares': 500, 'cost_basis': top}], CHAIN)
+    assert above['contracts'][0] == 0 and np.isnan(above['strike'][0])
+    assert above['premium_income'][0] == 0.0
+
+
+@pytest.mark.parametrize('cap', [0.05, 0.10, 0.15])
+def test_call_away_probability_capped(cap):
+    overlay = CoveredCallOverlay(2.40, OverlayConstraints(max_call_away=cap))
+    selection = overlay.select(_lots(), CHAIN)
+    assert (overlay.candidates(CHAIN)['call_away_probability'] <= cap).all()
+    chosen = selection['call_away_probability'].dropna()
+    assert len(chosen) and (chosen <= cap).all()
+
+
+def test_no_call_clears_a_zero_cap():
+    overlay = CoveredCallOverlay(2.40, OverlayConstraints(max_call_away=0.0))
+    assert (overlay.select(_lots(), CHAIN)['contracts'] == 0).all()
+
+
+def test_suffix_max_matches_brute_force():
+    overlay = CoveredCallOverlay(2.40)
+    lots = _lots()
+    selection = overlay.select(lots, CHAIN)
+    expected = _brute_force(lots, overlay.candidates(CHAIN), overlay.constraints.min_markup)
+    expected[selection['contracts'].to_numpy() == 0] = np.nan  # Lots under one round lot
+    np.testing.assert_array_equal(selection['strike'], expected)
+
+
+def test_suffix_max_breaks_ties_toward_the_floor(monkeypatch):
+    rng = np.random.default_rng(8)
+    strikes = np.round(np.arange(2.0, 8.0, 0.25), 2)
+    yields = rng.choice([0.05, 0.08, 0.12], len(strikes))  # Many equal yields
+    cands = pd.DataFrame({'strike': strikes, 'days_to_expiry': 30.0, 'bid': yields,
+                          'implied_vol': 2.0, 'call_away_probability': 0.1,
+                          'monthly_premium': yields})
+    overlay = CoveredCallOverlay(2.40)
+    monkeypatch.setattr(overlay, 'candidates', lambda chain: cands)
+
+    lots = pd.DataFrame({'lot_id': range(60), 'shares': 100,
+                         'cost_basis': np.linspace(1.0, 7.0, 60).round(2)})
+    selection = overlay.select(lots, CHAIN)
+    np.testing.assert_array_equal(selection['strike'], _brute_force(lots, cands, 0.25))
+
+
+def test_orders_batch_lots_by_strike_and_expiry():
+    overlay = CoveredCallOverlay(2.40)
+    lots = pd.DataFrame({'lot_id': ['A', 'B', 'C', 'D'], 'shares': [300, 250, 1000, 50],
+                         'cost_basis': [2.0, 2.0, 4.5, 2.0]})
+    selection = overlay.select(lots, CHAIN)
+    assert list(selection['contracts']) == [3, 2, 10, 0]
+    assert selection['strike'][0] == selection['strike'][1] != selection['strike'][2]
+
+    orders = overlay.orders(selection)
+    assert [order['lots'] for order in orders] == [['A', 'B'], ['C']]
+    assert [order['quantity'] for order in orders] == [-5, -10]
+    for order, lot in zip(orders, (0, 2)):
+        assert order['action'] == 'SELL_TO_OPEN' and order['type'] == 'call'
+        assert order['strike'] == selection['strike'][lot]
+        assert order['days_to_expiry'] == round(selection['days_to_expiry'][lot])
+        assert order['limit_price'] == round(selection['premium'][lot], 2)
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_datasets import (
+    SCHEMAS, SUITE_DIR, SuiteLoader, parse_column, parse_percent, parse_range
+)
+
+
+def test_parse_percent_takes_first_number():
+    cells = pd.Series(['80%', '3.1% per position', '-12.5%', 'N/A', None])
+    np.testing.assert_allclose(parse_percent(cells), [0.80, 0.031, -0.125, np.nan, np.nan])
+
+
+def test_parse_range_bounds():
+    bounds = parse_range(pd.Series(['5-15%', '20%', '2-5', '1.5 - 3', None]))
+    np.testing.assert_allclose(bounds['min'], [0.05, 0.20, 2.0, 1.5, np.nan])
+    np.testing.assert_allclose(bounds['max'], [0.15, 0.20, 5.0, 3.0, np.nan])
+
+
+def test_parse_date_and_int_columns():
+    dates = parse_column('Expiration', pd.Series(['Nov-15-2025', 'Dec-20-2025', None]), 'date:%b-%d-%Y')
+    np.testing.assert_array_equal(dates['Expiration'],
+                                  np.array(['2025-11-15', '2025-12-20', 'NaT'], dtype='datetime64[D]'))
+    assert parse_column('Tier', pd.Series(['1', '2']), 'int')['Tier'].dtype == np.int64
+    with pytest.raises(ValueError):
+        parse_column('Tier', pd.Series(['1', None]), 'int')
+
+
+def test_auto_columns_fall_back_to_text():
+    assert parse_column('x', pd.Series(['1.5', '2']), 'auto')['x'].dtype == float
+    assert parse_column('x', pd.Series(['1.5', 'HIGH']), 'auto')['x'].dtype.kind == 'U'
+
+
+def test_cache_reused_until_the_csv_changes(tmp_path, monkeypatch):
+    suite = tmp_path / 'suite'
+    suite.mkdir()
+    filename = SCHEMAS['call_hedge_optimization'].filename
+    shutil.copy(os.path.join(SUITE_DIR, filename), suite / filename)
+    loader = SuiteLoader(str(suite), cache_dir=str(tmp_path / 'cache'))
+
+    first = loader.load('call_hedge_optimization')
+    entries = os.listdir(tmp_path / 'cache')
+    assert entries == [loader.cache_key('call_hedge_optimization')]
+
+    # A warm load memory-maps the cached files instead of parsing again
+    def fail(name):
+        raise AssertionError('re-parsed a cached dataset')
+    monkeypatch.setattr(loader, 'parse', fail)
+    columns = loader.load_columns('call_hedge_optimization')
+    assert isinstance(columns['Strike'], np.memmap)
+    pd.testing.assert_frame_equal(loader.load('call_hedge_optimization'), first)
+
+    # Editing the CSV changes the key and forces a fresh parse
+    text = (suite / filename).read_text().replace('Nov-15-2025', 'Nov-14-2025', 1)
+    (suite / filename).write_text(text)
+    monkeypatch.undo()
+    edited = loader.load('call_hedge_optimization')
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+    assert edited['Expiration'][0] == np.datetime64('2025-11-14')
+    assert first['Expiration'][0] == np.datetime64('2025-11-15')
+
+
+@pytest.fixture
+def loader(tmp_path):
+    return SuiteLoader(cache_dir=str(tmp_path))
+
+
+def test_positions_from_tracker(loader):
+    positions = loader.positions()
+    assert len(positions) == 5
+    assert positions[3] == {'symbol': 'ASST', 'type': 'put', 'strike': 2.5, 'quantity': -22,
+                            'value': pytest.approx(-22 * 100 * 0.97), 'premium_received': 0.97,
+                            'expiration': 'Oct-24'}
+
+
+def test_orders_split_symbols_and_sign_sells(loader):
+    orders = {order['order_id']: order for order in loader.orders()}
+    assert [(o['action'], o['quantity']) for o in orders.values()] == [
+        ('BUY_TO_CLOSE', 75), ('BUY_TO_CLOSE', 15), ('SELL_TO_CLOSE', -18),
+        ('SELL_TO_OPEN', -12), ('SELL_TO_OPEN', -8), ('BUY_TO_OPEN', 12), ('BUY_TO_OPEN', 15)]
+
+    sell_to_close = orders[3]
+    assert (sell_to_close['symbol'], sell_to_close['type'], sell_to_close['strike'],
+            sell_to_close['expiration']) == ('ASST', 'call', 10.0, 'Jan 16')
+    assert sell_to_close['limit_price'] == pytest.approx(324.0 / 1800)
+    assert orders[4]['type'] == 'put' and orders[4]['limit_price'] == pytest.approx(1416.0 / 1200)
+    assert orders[1]['limit_price'] == pytest.approx(1125.0 / 7500)
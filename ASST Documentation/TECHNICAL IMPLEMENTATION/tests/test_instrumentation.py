@@ -0,0 +1,44 @@
+from asst_instrumentation import LatencyHistogram, MetricsRegistry, instrument_class, timed, uninstrument_class
+
+
+def test_timed_records_after_reset():
+    registry = MetricsRegistry()
+
+    @timed('work', registry)
+    def work():
+        return 1
+
+    work()
+    assert registry.summary()['work']['count'] == 1
+    registry.reset()
+    assert registry.summary()['work']['count'] == 0
+    work()
+    work()
+    assert registry.summary()['work']['count'] == 2
+    assert 'method="work",le="+Inf"} 2' in registry.to_prometheus()
+
+
+def test_instrumented_class_records_after_reset():
+    class Model:
+        def run(self):
+            return 'ok'
+
+    registry = MetricsRegistry()
+    assert instrument_class(Model, registry) == ['run']
+    try:
+        registry.reset()
+        assert Model().run() == 'ok'
+        assert registry.summary()['Model.run']['count'] == 1
+    finally:
+        uninstrument_class(Model)
+    assert not getattr(Model.run, '__asst_instrumented__', False)
+
+
+def test_histogram_quantiles_within_relative_error():
+    histogram = LatencyHistogram()
+    for value in range(1, 100_001):
+        histogram.record(value * 1000)
+    assert abs(histogram.quantile(0.5) - 50_000_000) / 50_000_000 < 2 ** -5
+    assert histogram.summary()['count'] == 100_000
+    histogram.clear()
+    assert histogram.summary()['count'] == 0 and histogram.quantile(0.99) == 0.0
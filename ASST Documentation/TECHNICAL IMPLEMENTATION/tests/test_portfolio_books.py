@@ -0,0 +1,68 @@
+import numpy as np
+
+from asst_portfolio_books import Book, BookOrchestrator, MarketData
+from ASST_Advanced_Strategy_System import ASSComprehensiveStrategy, StrategyParameters
+
+MARKET = MarketData(prices={'ASST': 2.40, 'MSTR': 310.0})
+
+
+def _books(params_by_symbol):
+    return [Book(f'{account}-{symbol}', account, params, portfolio_value=25000,
+                 premium_collected=1000)
+            for account in ('IRA', 'Taxable') for symbol, params in params_by_symbol.items()]
+
+
+def _run(use_processes, books=None):
+    books = books or _books({symbol: StrategyParameters(symbol=symbol) for symbol in MARKET.prices})
+    orchestrator = BookOrchestrator(books, MARKET, max_workers=2, use_processes=use_processes)
+    try:
+        plans = orchestrator.evaluate_month(2)
+        return plans, orchestrator.ledger.values.copy()
+    finally:
+        orchestrator.close()
+
+
+def test_evaluation_does_not_mutate_shared_params():
+    shared = StrategyParameters(symbol='ASST', asst_current_price=1.0)
+    books = _books({'ASST': shared})
+    _run(False, books)
+    assert shared.asst_current_price == 1.0 and shared.vol_surface is None
+
+
+def test_thread_and_process_pools_agree():
+    thread_plans, thread_ledger = _run(False)
+    process_plans, process_ledger = _run(True)
+    np.testing.assert_array_equal(thread_ledger, process_ledger)
+    for book_id, plan in thread_plans.items():
+        assert plan['premium_allocation'] == process_plans[book_id]['premium_allocation']
+
+
+def test_books_match_a_standalone_strategy():
+    plans, ledger = _run(False)
+    params = StrategyParameters(symbol='MSTR', asst_current_price=310.0)
+    plan = ASSComprehensiveStrategy(params).generate_monthly_plan(2, 1000, 25000)
+    assert plans['IRA-MSTR']['premium_allocation'] == plan['premium_allocation']
+    assert plans['IRA-MSTR']['risk_metrics'] == plan['risk_metrics']
+
+
+def _run_months(use_processes, months=3):
+    books = _books({symbol: StrategyParameters(symbol=symbol) for symbol in MARKET.prices})
+    orchestrator = BookOrchestrator(books, MARKET, max_workers=2, use_processes=use_processes)
+    try:
+        for month in range(1, months + 1):
+            orchestrator.evaluate_month(month)
+        return orchestrator.strategies
+    finally:
+        orchestrator.close()
+
+
+def test_book_state_carries_across_months_in_both_modes():
+    threads, processes = _run_months(False), _run_months(True)
+    for book_id, strategy in threads.items():
+        other = processes[book_id]
+        assert len(strategy.premium_engine.compounding_history) == 3
+        assert strategy.premium_engine.compounding_history == \
+            other.premium_engine.compounding_history
+        assert strategy.risk_manager.risk_alerts == other.risk_manager.risk_alerts
+        np.testing.assert_array_equal(strategy.risk_manager.alert_engine.active,
+                                      other.risk_manager.alert_engine.active)
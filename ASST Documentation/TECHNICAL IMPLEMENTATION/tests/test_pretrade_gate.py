@@ -0,0 +1,84 @@
+import pytest
+
+from asst_pretrade_gate import GateLimits, PreTradeRiskGate
+from asst_margin import BuyingPowerLedger
+from asst_risk_automation import ASSAutomationEngine, ASSRiskMonitor
+from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
+SHORT_PUTS = [{'symbol': 'ASST', 'type': 'put', 'strike': 2.5, 'quantity': -22, 'value': -2596}]
+
+
+def test_hedge_calls_pass_var_while_hedge_ratio_is_short():
+    gate = PreTradeRiskGate.from_positions(SHORT_PUTS, 8000, 2.40, 5000)
+    assert gate.metrics['var_95'] > gate.limits.max_daily_var
+    assert gate.metrics['hedge_ratio'] < gate.limits.min_hedge_ratio
+
+    call = {'type': 'call', 'strike': 5.0, 'quantity': 5, 'margin_requirement': 100.0}
+    decision = gate.submit(call)
+    assert decision.accepted
+    assert decision.hedge_ratio >= gate.limits.min_hedge_ratio
+
+    # Once the minimum is met, further calls are rated on VaR again
+    assert gate.check(call).breaches == ['var']
+
+
+def test_short_puts_still_blocked_on_var():
+    gate = PreTradeRiskGate.from_positions(SHORT_PUTS, 8000, 2.40, 5000)
+    decision = gate.check({'type': 'put', 'strike': 2.0, 'quantity': -10, 'margin_requirement': 100.0})
+    assert 'var' in decision.breaches
+
+
+def test_account_value_derived_from_positions():
+    monitor = ASSRiskMonitor(ASSTPremiumCompounder())
+    # 5000 free + 22 * 100 * 2.5 collateral - 2596 short put value
+    assert monitor.account_value(SHORT_PUTS, 5000) == pytest.approx(7904)
+    stock = [{'symbol': 'ASST', 'type': 'stock', 'quantity': 1000}]
+    assert monitor.account_value(stock) == pytest.approx(1000 * monitor.model.current_price)
+    assert monitor.account_value([]) == 0.0
+    with pytest.raises(ValueError):
+        monitor.account_value([{'symbol': 'ASST', 'type': 'stock', 'quantity': -1000}])
+
+
+def test_daily_risk_check_on_empty_book():
+    monitor = ASSRiskMonitor(ASSTPremiumCompounder())
+    check = monitor.daily_risk_check([], {})
+    assert check['concentration'] == 0.0 and check['risk_score'] == 0.0
+    assert check['alerts'] == []
+
+
+def test_daily_risk_check_builds_one_gate(monkeypatch):
+    monitor = ASSRiskMonitor(ASSTPremiumCompounder())
+    built = []
+    original = monitor.pretrade_gate
+    monkeypatch.setattr(monitor, 'pretrade_gate', lambda *args: built.append(args) or original(*args))
+    monitor.daily_risk_check(SHORT_PUTS, {'buying_power': 5000})
+    assert len(built) == 1
+
+
+def test_gate_limits_from_thresholds():
+    limits = GateLimits.from_thresholds({'max_daily_var': 0.1, 'max_concentration': 2.0,
+                                         'min_hedge_ratio': 0.3})
+    assert (limits.max_daily_var, limits.max_concentration, limits.min_hedge_ratio) == (0.1, 2.0, 0.3)
+
+
+def test_automation_engine_sizes_with_the_model_margin_method():
+    model = ASSTPremiumCompounder()
+    automation = ASSAutomationEngine(model, ASSRiskMonitor(model))
+    assert automation.margin_method == model.margin_method
+
+    daily = automation.generate_daily_orders(100000, [])
+    assert daily['rejected_orders'] == []
+    staged = -sum(order['quantity'] for order in daily['orders'] if order['type'] == 'put')
+    assert staged == daily['allocation_summary']['estimated_new_contracts']
+
+
+@pytest.mark.parametrize('method', ['cash', 'reg_t', 'portfolio'])
+def test_staged_put_ladder_matches_planned_contracts(method):
+    model = ASSTPremiumCompounder()
+    model.margin_method = method
+    automation = ASSAutomationEngine(model, ASSRiskMonitor(model))
+    cycle = model.monthly_compounding_cycle(model.premium_collected)
+    ledger = BuyingPowerLedger(automation.margin_engine, 100000, method)
+    orders = automation.generate_put_orders(cycle['total_put_capital'], model.strike_weights, ledger)
+    assert -sum(order['quantity'] for order in orders) == cycle['estimated_new_contracts']
+    assert ledger.used <= cycle['total_put_capital']
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_roll_optimizer import RollOptimizer, RollWeights
+from asst_vol_surface import synthetic_chain
+
+# Near the 80% assignment target, so holding scores well: -0.5 * |0.875 - 0.80|
+LEG = {'symbol': 'ASST', 'type': 'put', 'strike': 2.0, 'quantity': -10, 'days_to_expiry': 3,
+       'premium_received': 0.60, 'close_price': 0.05}
+
+
+def _chain(*quotes):
+    """Put quotes as (strike, days to expiry, bid)"""
+    return pd.DataFrame([{'strike': k, 'time_to_expiry': days / 365, 'is_call': False,
+                          'bid': bid, 'ask': bid + 0.05} for k, days, bid in quotes])
+
+
+def _decide(chain, weights=None, legs=(LEG,)):
+    return RollOptimizer(2.40, weights).optimize(list(legs), chain)
+
+
+def test_holds_when_no_roll_beats_holding():
+    # A 10 cent credit does not pay for the 40 cents a share of higher cost basis
+    decision = _decide(_chain((2.5, 33, 0.15)))
+    assert list(decision['action']) == ['HOLD']
+    assert decision['net_credit'][0] == 0.0 and np.isnan(decision['new_strike'][0])
+
+    rolled = _decide(_chain((2.5, 33, 0.90)))
+    assert list(rolled['action']) == ['ROLL']
+    assert rolled['new_strike'][0] == 2.5 and rolled['new_days_to_expiry'][0] == 33
+    assert rolled['net_credit'][0] == pytest.approx((0.90 - 0.05) * 1000)
+
+
+def test_rolls_only_to_later_expiries():
+    # Rich quotes at the leg's own expiry and earlier are never candidates
+    assert list(_decide(_chain((2.5, 2, 5.0), (2.5, 3, 5.0)))['action']) == ['HOLD']
+    decision = _decide(_chain((2.5, 2, 5.0), (2.5, 3, 5.0), (2.5, 33, 0.90)))
+    assert decision['new_days_to_expiry'][0] == 33
+
+
+def test_rolls_must_collect_min_credit():
+    chain = _chain((2.5, 33, 0.90))
+    assert list(_decide(chain, RollWeights(min_credit=0.50))['action']) == ['ROLL']
+    assert list(_decide(chain, RollWeights(min_credit=1.00))['action']) == ['HOLD']
+
+
+def _positions(n_legs=300, seed=5):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'symbol': 'ASST', 'type': 'put',
+        'strike': rng.choice(np.arange(1.5, 5.5, 0.5), n_legs),
+        'quantity': -rng.integers(1, 20, n_legs),
+        'days_to_expiry': rng.integers(1, 7, n_legs),
+        'premium_received': rng.uniform(0.2, 1.5, n_legs),
+        'close_price': rng.uniform(0.0, 3.0, n_legs)
+    })
+
+
+def _reference_scores(optimizer, legs, chain):
+    """The score matrix in float64, one (leg, candidate) formula at a time"""
+    w = optimizer.weights
+    _, s = optimizer.score_matrix(legs, chain)
+    cand = {name[5:]: value[None, :] for name, value in s.items() if name.startswith('cand_')}
+    leg = {name[4:]: value[:, None] for name, value in s.items() if name.startswith('leg_')}
+    close = s['close'][:, None]
+    added = cand['days'] - leg['days']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roll = (30 * w.credit * (cand['extrinsic'] - leg['extrinsic']) / added
+                - w.assignment * np.abs(cand['prob'] - w.target_assignment)
+                - np.maximum(w.cost_basis * (cand['net_strike'] - leg['net_strike']), 0.0)
+                - w.capital_rate / 365 * (cand['bp'] - leg['bp']) * added)
+    roll = np.where((added > 0) & (cand['bid'] >= close + w.min_credit), roll, -np.inf)
+    hold = -w.assignment * np.abs(s['leg_prob'] - w.target_assignment)
+    return np.column_stack([hold, roll])
+
+
+def test_decisions_match_float64_reference():
+    chain = synthetic_chain(strikes_per_expiry=40)
+    positions = _positions()
+    optimizer = RollOptimizer(2.40, RollWeights(min_credit=0.10))
+    decisions = optimizer.optimize(positions, chain)
+    reference = _reference_scores(optimizer, optimizer.expiring_legs(positions), chain)
+
+    best = np.argmax(reference, axis=1)
+    assert 0 < (best > 0).sum() < len(best)  # Both branches of the comparison are exercised
+    np.testing.assert_array_equal(decisions['action'], np.where(best > 0, 'ROLL', 'HOLD'))
+    chosen = np.maximum(best - 1, 0)
+    _, sides = optimizer.score_matrix(optimizer.expiring_legs(positions), chain)
+    rolled = best > 0
+    np.testing.assert_array_equal(decisions['new_strike'][rolled], sides['cand_strike'][chosen][rolled])
+    np.testing.assert_array_equal(decisions['new_days_to_expiry'][rolled],
+                                  sides['cand_days'][chosen][rolled])
+
+    # Every roll beats holding, extends the expiry and clears min_credit
+    rolls = decisions[rolled]
+    assert (reference[rolled, best[rolled]] > reference[rolled, 0]).all()
+    assert (rolls['new_days_to_expiry'] > rolls['days_to_expiry']).all()
+    assert (rolls['new_premium'] - rolls['close_price'] >= 0.10 - 1e-9).all()
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import asst_scenario_grid
+from asst_scenario_grid import HedgeBook, ScenarioEngine, long_term_value_projections, scenario_names
+from asst_strategy_core import black_scholes_price
+from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+
+BOOK = HedgeBook(strikes=np.array([5.0, 7.5, 12.5]), contracts=np.array([10.0, 6.0, 4.0]),
+                 premiums=np.array([0.90, 0.60, 0.35]), expiries=np.array([0.13, 0.23, 0.30]))
+
+
+def _reference_hedge_value(price, time, vol, book=BOOK, rate=0.04):
+    """Unblocked Black-Scholes mark of the book, one leg at a time"""
+    p = np.asarray(price, dtype=float)[:, None, None]
+    t = np.asarray(time, dtype=float)[None, :, None]
+    v = np.asarray(vol, dtype=float)[None, None, :]
+    total = 0.0
+    for strike, contracts, expiry in zip(book.strikes, book.contracts, book.expiries):
+        remaining = np.maximum(expiry - t, 0.0)
+        alive = black_scholes_price(p, strike, np.maximum(remaining, 1e-12), v, True, rate)
+        total = total + contracts * 100 * np.where(remaining > 0, alive, np.maximum(p - strike, 0.0))
+    return total[..., None]
+
+
+def test_hedge_repricing_matches_black_scholes():
+    price, time, vol = np.linspace(0.5, 40, 37), (0.0, 0.1, 0.2, 0.5), (0.8, 2.0, 4.25)
+    value = ScenarioEngine(2.40, 2.5, 1000, BOOK).hedge_value(price, time, vol)
+    # norm_cdf_fast is accurate to ~1e-7 per share: agree to the cent on the whole book
+    np.testing.assert_allclose(value, _reference_hedge_value(price, time, vol), atol=1e-2)
+
+
+def test_blocked_grid_equals_single_block(monkeypatch):
+    price, time, vol = np.linspace(0.5, 40, 501), (0.0, 0.2), np.linspace(0.5, 5, 23)
+    engine = ScenarioEngine(2.40, 2.5, 1000, BOOK)
+    blocked = engine.hedge_value(price, time, vol)
+    monkeypatch.setattr(asst_scenario_grid, 'GRID_BLOCK_POINTS', 1 << 30)
+    np.testing.assert_array_equal(blocked, engine.hedge_value(price, time, vol))
+
+
+@pytest.mark.parametrize('book', [None, HedgeBook(np.array([5.0]), np.array([0.0]),
+                                                  np.array([0.9]), np.array([0.13]))])
+def test_empty_hedge_book_contributes_nothing(book):
+    grid = ScenarioEngine(2.40, 2.5, 1000, book).evaluate([3.0, 8.0], shares=(100,))
+    assert not grid['hedge_profit'].any() and not grid['hedge_multiple'].any()
+    np.testing.assert_array_equal(grid['total_return'], grid['share_profit'] + 1000)
+
+
+def test_projections_without_hedges():
+    empty = HedgeBook(np.array([]), np.array([]), np.array([]), np.array([]))
+    frame = long_term_value_projections([5.0, 12.0], 1000, 2500, 800, 3000, empty)
+    assert len(frame) == 2
+
+
+def test_scenario_names_cover_any_number_of_targets():
+    names = scenario_names([1.0, 5.0, 6.0, 8.0, 10.0, 12.0, 15.0, 20.0, 25.0, 30.0, 100.0])
+    assert list(names) == ['Conservative', 'Conservative', 'Moderate', 'Moderate', 'Strong',
+                           'Strong', 'Explosive', 'Explosive', 'Extreme', 'Extreme', 'Extreme']
+
+
+def _ladder(model, budget, vol=4.25, rate=0.04):
+    """The hedge ladder bought at Black-Scholes premiums"""
+    strikes = np.array(list(model.hedge_strikes))
+    expiries = np.array([model.hedge_expiries[k] for k in strikes])
+    premiums = black_scholes_price(model.current_price, strikes, expiries, vol, True, rate)
+    contracts = np.trunc(budget * np.array(list(model.hedge_strikes.values())) / (premiums * 100))
+    return HedgeBook(strikes, contracts, premiums, expiries)
+
+
+def test_appreciation_hedges_marked_at_expiry_by_default():
+    model = ASSTPremiumCompounder()
+    targets = np.linspace(1, 40, 12)
+    scenarios = model.appreciation_scenarios(10000, 2.5, 5000, 2000, target_prices=targets)
+    assert [row['Target_Price'] for row in scenarios] == list(targets)
+
+    book = _ladder(model, 2000)
+    assert 0 < book.cost <= 2000
+    intrinsic = np.maximum(targets[:, None] - book.strikes, 0.0) @ (book.contracts * 100)
+    np.testing.assert_allclose([row['Hedge_Profit'] for row in scenarios], intrinsic - book.cost,
+                               atol=1e-6)
+    for row in scenarios:
+        assert row['Total_Return'] == pytest.approx(row['Share_Profit'] + row['Hedge_Profit'] + 5000)
+
+
+def test_appreciation_hedges_cost_what_they_are_marked_at():
+    model = ASSTPremiumCompounder()
+    today, = model.appreciation_scenarios(10000, 2.5, 5000, 2000, target_prices=[model.current_price],
+                                          horizon_years=0.0)
+    assert today['Hedge_Profit'] == pytest.approx(0.0, abs=0.05)
+    assert today['Hedge_Leverage'] == pytest.approx(1.0, abs=1e-4)
+
+    unchanged, = model.appreciation_scenarios(10000, 2.5, 5000, 2000,
+                                              target_prices=[model.current_price])
+    assert unchanged['Hedge_Profit'] == pytest.approx(-_ladder(model, 2000).cost)
+
+
+def test_appreciation_scenarios_without_hedge_budget():
+    scenarios = ASSTPremiumCompounder().appreciation_scenarios(10000, 2.5, 5000, 0)
+    assert [row['Hedge_Profit'] for row in scenarios] == [0.0] * 5
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asst_service import Endpoint, PlanService
+
+
+def _service(worker):
+    service = PlanService(max_workers=1, endpoints={'/slow': Endpoint(worker)})
+    service.pool.shutdown()
+    service.pool = ThreadPoolExecutor(max_workers=2)
+    return service
+
+
+def test_coalesced_waiter_survives_cancelled_leader():
+    release = threading.Event()
+    calls = []
+
+    def worker(params):
+        calls.append(params)
+        release.wait(5)
+        return b'{}'
+
+    async def scenario():
+        service = _service(worker)
+        leader = asyncio.create_task(service.handle('/slow'))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(service.handle('/slow'))
+        await asyncio.sleep(0.05)
+        assert service.stats['coalesced'] == 1
+
+        leader.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        response = await waiter
+        await service.close()
+        return leader, response
+
+    leader, response = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert response.status == 200 and response.body == b'{}'
+    assert len(calls) == 2
+
+
+def test_malformed_content_length_is_bad_request():
+    async def scenario():
+        service = _service(lambda params: b'{}')
+        server = await service.start(port=0)
+        host, port = server.sockets[0].getsockname()[:2]
+        statuses = []
+        for length in ('abc', '-5'):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(f'GET /health HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode())
+            statuses.append((await reader.readline()).decode().split(' ')[1])
+            writer.close()
+        await service.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == ['400', '400']
@@ -0,0 +1,76 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asst_simulation_rng import (
+    MONTHS, RATE, MonteCarloSimulator, SobolSequence, StreamFactory, european_put_controls,
+    norm_ppf, rolling_put_income
+)
+from asst_strategy_core import black_scholes_price
+
+SPOT, SIGMA, HORIZON = 2.40, 1.50, MONTHS / 12
+CONTROL_MEANS = black_scholes_price(SPOT, 0.95 * SPOT, np.arange(1, MONTHS + 1) / 12,
+                                    SIGMA, False, RATE)
+
+
+@pytest.mark.parametrize('method, antithetic', [('sobol', True), ('pseudo', False)])
+def test_estimates_bit_identical_across_worker_counts(method, antithetic):
+    simulator = MonteCarloSimulator(method=method, antithetic=antithetic, replicates=4, unit_size=512)
+    kwargs = dict(controls=european_put_controls, control_means=CONTROL_MEANS)
+    serial = simulator.estimate(rolling_put_income, 8192, SPOT, SIGMA, HORIZON, MONTHS, RATE, **kwargs)
+    parallel = simulator.estimate(rolling_put_income, 8192, SPOT, SIGMA, HORIZON, MONTHS, RATE,
+                                  max_workers=2, **kwargs)
+    assert (serial.mean, serial.std_error, serial.n_paths) == \
+        (parallel.mean, parallel.std_error, parallel.n_paths)
+    np.testing.assert_array_equal(serial.beta, parallel.beta)
+
+    rerun = MonteCarloSimulator(method=method, antithetic=antithetic, replicates=4, unit_size=512)
+    assert rerun.estimate(rolling_put_income, 8192, SPOT, SIGMA, HORIZON, MONTHS, RATE,
+                          **kwargs).mean == serial.mean
+
+
+def test_unit_streams_do_not_depend_on_call_order():
+    streams = StreamFactory(7)
+    later = [streams.unit_generator(u).standard_normal(4) for u in (3, 0, 2)]
+    fresh = StreamFactory(7)
+    np.testing.assert_array_equal(later[0], fresh.unit_generator(3).standard_normal(4))
+    assert not np.array_equal(later[1], later[2])
+
+
+def test_sobol_points_are_index_addressable():
+    sobol = SobolSequence(6, shift_seed=(1, 0))
+    whole = sobol.points(0, 1024)
+    np.testing.assert_array_equal(np.vstack([sobol.points(0, 300), sobol.points(300, 724)]), whole)
+
+    # Unshifted first dimension is the van der Corput sequence
+    first = SobolSequence(1).points(0, 4)[:, 0]
+    np.testing.assert_allclose(first, [0.0, 0.5, 0.75, 0.25], atol=1e-9)
+    # Every 2^m-point prefix puts exactly one point in each 1/2^m interval, per dimension
+    for dim in range(6):
+        assert np.array_equal(np.sort(np.floor(whole[:, dim] * 1024)), np.arange(1024))
+
+
+def test_norm_ppf_matches_inverse_cdf():
+    tail = np.logspace(-12, -1, 50)
+    u = np.concatenate([tail, np.linspace(0.01, 0.99, 99), 1 - tail])
+    exact = np.array([NormalDist().inv_cdf(x) for x in u])
+    np.testing.assert_allclose(norm_ppf(u), exact, rtol=1.2e-9)
+
+
+def test_variance_reduced_estimate_is_unbiased():
+    simulator = MonteCarloSimulator(method='sobol', antithetic=True, replicates=16, unit_size=512)
+    estimate = simulator.estimate(lambda paths: paths[:, -1], 8192, SPOT, SIGMA, 1.0, 1, RATE)
+    assert abs(estimate.mean - SPOT * np.exp(RATE)) < 4 * estimate.std_error
+
+
+def test_synthetic_chain_draws_one_stream_per_expiry():
+    from asst_vol_surface import synthetic_chain
+
+    full = synthetic_chain(expiries_days=[27, 55, 90], strikes_per_expiry=20)
+    pd.testing.assert_frame_equal(full, synthetic_chain(expiries_days=[27, 55, 90],
+                                                        strikes_per_expiry=20))
+    # Dropping later expiries leaves the earlier expiries' quotes unchanged
+    prefix = synthetic_chain(expiries_days=[27], strikes_per_expiry=20)
+    pd.testing.assert_frame_equal(prefix, full.iloc[:len(prefix)])
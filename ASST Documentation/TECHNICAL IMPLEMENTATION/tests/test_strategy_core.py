@@ -0,0 +1,152 @@
+"""Array core against the original per-call formulas of both strategy APIs"""
+import numpy as np
+import pytest
+
+from asst_strategy_core import (
+    STRATEGY_ASSIGNMENT_PARAMS, assignment_probability, kelly_position_size, norm_cdf,
+    norm_cdf_fast
+)
+from asst_volatility_arbitrage_model import ASSTPremiumCompounder
+from ASST_Advanced_Strategy_System import CallHedgeOptimizer, PositionManager, StrategyParameters
+
+STRIKES = [0.5, 1.0, 1.5, 2.0, 2.25, 2.4, 2.5, 2.75, 3.0, 4.0, 5.0, 7.5, 12.0]
+DAYS = [1, 3, 7, 14, 27, 45, 90]
+
+
+def legacy_compounder_probability(strike, current_price, days_to_expiry):
+    time_decay_factor = max(0.1, days_to_expiry / 30)
+    if strike <= current_price:
+        itm_boost = (current_price - strike) / current_price * 0.15
+        return min(1.0, 0.85 + itm_boost)
+    otm_factor = (current_price / strike) * 0.8 * time_decay_factor
+    return max(0.05, 0.05 + otm_factor)
+
+
+def legacy_strategy_probability(strike, current_price, days_to_expiry, iv_environment):
+    time_factor = max(0.1, days_to_expiry / 30)
+    if strike <= current_price:
+        itm_adjustment = (current_price - strike) / current_price * 0.15
+        vol_adjustment = (iv_environment / 400) * 0.05
+        return min(0.98, 0.85 + itm_adjustment + vol_adjustment)
+    otm_factor = (current_price / strike) ** 2 * time_factor * 0.8
+    return max(0.02, min(0.50, 0.05 + otm_factor))
+
+
+def legacy_call_hedge_optimization(model, hedge_budget, recovery_scenarios):
+    hedge_plan = []
+    for strike, weight in model.hedge_strikes.items():
+        allocation = hedge_budget * weight
+        estimated_premium = 0.35 if strike <= 5.0 else 0.25 if strike <= 10.0 else 0.15
+        contracts = int(allocation / (estimated_premium * 100))
+        breakeven = strike + estimated_premium
+        profit_scenarios = []
+        for recovery_price in recovery_scenarios:
+            if recovery_price > breakeven:
+                profit_per_contract = (recovery_price - strike) * 100 - (estimated_premium * 100)
+                profit_scenarios.append({
+                    'recovery_price': recovery_price,
+                    'profit_per_contract': profit_per_contract,
+                    'total_profit': profit_per_contract * contracts,
+                    'leverage_multiple': profit_per_contract / (estimated_premium * 100)
+                })
+        hedge_plan.append({
+            'strike': strike, 'allocation_weight': weight, 'budget_allocation': allocation,
+            'estimated_premium': estimated_premium, 'contracts': contracts,
+            'breakeven_price': breakeven, 'profit_scenarios': profit_scenarios
+        })
+    return hedge_plan
+
+
+def legacy_hedge_contracts(params, hedge_budget):
+    price = params.asst_current_price
+    tiers = [([price * 2.0, price * 2.5], 0.40), ([price * 3.0, price * 4.0], 0.35),
+             ([price * 5.0, price * 8.0], 0.25)]
+    contracts = []
+    for strikes, allocation in tiers:
+        tier_budget = hedge_budget * allocation
+        for strike in strikes:
+            moneyness = strike / price
+            premium = 0.35 if moneyness <= 2.0 else 0.25 if moneyness <= 4.0 else 0.15
+            contracts.append(int((tier_budget / len(strikes)) / (premium * 100)))
+    return contracts
+
+
+@pytest.mark.parametrize('price', [1.8, 2.40, 3.1])
+def test_compounder_assignment_probability_matches_legacy(price):
+    model = ASSTPremiumCompounder(current_price=price)
+    for strike in STRIKES:
+        for days in DAYS:
+            expected = legacy_compounder_probability(strike, price, days)
+            actual = model.assignment_probability_model(strike, days)
+            if strike <= price:
+                assert actual == expected
+            else:
+                # Shared multiplication order: equal to the last bit or one ulp off
+                assert actual == pytest.approx(expected, rel=1e-15, abs=0)
+
+
+@pytest.mark.parametrize('iv', [150, 425, 900])
+def test_strategy_assignment_probability_matches_legacy(iv):
+    params = StrategyParameters(iv_environment=iv)
+    manager = PositionManager(params)
+    for strike in STRIKES:
+        for days in DAYS:
+            expected = legacy_strategy_probability(strike, params.asst_current_price, days, iv)
+            assert manager.assignment_probability_model(strike, days_to_expiry=days) == expected
+
+    # One vectorized call over the whole grid gives the same numbers
+    k, d = np.meshgrid(STRIKES, DAYS, indexing='ij')
+    grid = assignment_probability(k, params.asst_current_price, d, iv, STRATEGY_ASSIGNMENT_PARAMS)
+    for (i, j), value in np.ndenumerate(grid):
+        assert value == legacy_strategy_probability(k[i, j], params.asst_current_price, d[i, j], iv)
+
+
+def test_position_sizing_matches_legacy():
+    model = ASSTPremiumCompounder()
+    sizing = model.calculate_optimal_position_size(25000, edge=0.15, variance=0.25)
+    assert sizing['kelly_fraction'] == 0.15 / 0.25
+    assert sizing['position_size'] == 25000 * (0.15 / 0.25 * model.personal_factor)
+
+    params = StrategyParameters()
+    sizing = PositionManager(params).calculate_optimal_position_size(25000)
+    kelly = 0.15 / (params.iv_environment / 100) ** 2
+    assert sizing['kelly_fraction'] == kelly
+    assert sizing['position_size'] == 25000 * (kelly * params.personal_safety_factor)
+
+    batch = kelly_position_size(np.array([10000.0, 25000.0]), 0.15, 0.25, model.personal_factor)
+    assert batch['position_size'][1] == 25000 * (0.15 / 0.25 * model.personal_factor)
+
+
+def test_hedge_ladders_match_legacy():
+    model = ASSTPremiumCompounder()
+    scenarios = [5.0, 7.5, 12.5, 20.0]
+    for budget in (500.0, 1304.7, 10000.0):
+        assert model.call_hedge_optimization(budget, scenarios) == \
+            legacy_call_hedge_optimization(model, budget, scenarios)
+
+    params = StrategyParameters()
+    ladder = CallHedgeOptimizer(params).optimize_hedge_ladder(2000.0)
+    contracts = [row['contracts'] for tier in ladder.values() for row in tier['contracts_breakdown']]
+    assert contracts == legacy_hedge_contracts(params, 2000.0)
+
+
+def test_norm_cdf_fast_matches_norm_cdf():
+    x = np.linspace(-12, 12, 100_001)
+    np.testing.assert_allclose(norm_cdf_fast(x), norm_cdf(x), atol=2e-7)
+    np.testing.assert_allclose(norm_cdf_fast(x.reshape(-1, 1)).ravel(), norm_cdf(x), atol=2e-7)
+
+
+@pytest.mark.parametrize('x', [0.3, -1.7, 20.0, np.float32(1.2), 2])
+def test_norm_cdf_fast_accepts_scalars(x):
+    assert norm_cdf_fast(x).shape == ()
+    assert float(norm_cdf_fast(x)) == pytest.approx(float(norm_cdf(x)), abs=2e-7)
+
+
+def test_norm_cdf_fast_passes_nan_through():
+    x = np.array([np.nan, -0.5, np.inf, -np.inf, np.nan])
+    result = norm_cdf_fast(x)
+    np.testing.assert_array_equal(np.isnan(result), [True, False, False, False, True])
+    np.testing.assert_allclose(result[1:4], [norm_cdf(-0.5), 1.0, 0.0], atol=2e-7)
+    assert np.isnan(norm_cdf_fast(np.nan))
+    # The input is left untouched
+    assert np.isnan(x[0]) and x[1] == -0.5
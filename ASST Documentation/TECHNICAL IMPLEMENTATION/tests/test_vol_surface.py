@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from asst_vol_surface import (
+    VolSurfaceBuilder, VolSurfaceCache, implied_volatility, svi_total_variance, synthetic_chain
+)
+
+
+@pytest.mark.parametrize('rate', [0.04, 0.30])
+def test_fitted_slices_round_trip_through_sigma(rate):
+    spot = 2.40
+    surface = VolSurfaceBuilder(rate=rate).build(
+        synthetic_chain(spot, expiries_days=[27, 181, 363], rate=rate), spot)
+
+    strikes = np.linspace(1.0, 6.0, 50)
+    for t, params in zip(surface.expiries, surface.svi_params):
+        log_moneyness = np.log(strikes / (spot * np.exp(rate * t)))
+        fitted = np.sqrt(svi_total_variance(log_moneyness, params) / t)
+        assert np.abs(surface.sigma(strikes, t) - fitted).max() < 0.01
+        assert np.allclose(surface.sigma_days(strikes, t * 365), surface.sigma(strikes, t))
+
+
+def test_sigma_matches_quoted_vols():
+    chain = synthetic_chain(expiries_days=[55, 181])
+    chain['mid'] = 0.5 * (chain['bid'] + chain['ask'])
+    surface = VolSurfaceBuilder().build(chain, 2.40)
+    atm = chain[(chain['strike'] - 2.40).abs() < 0.3]
+    quoted = implied_volatility(atm['mid'], 2.40, atm['strike'], atm['time_to_expiry'],
+                                atm['is_call'], surface.rate)
+    assert np.abs(surface.sigma(atm['strike'], atm['time_to_expiry']) - quoted).max() < 0.02
+
+
+def test_cache_reuses_unchanged_chain():
+    chain = synthetic_chain(expiries_days=[27, 55])
+    cache = VolSurfaceCache()
+    first = cache.refit(chain, 2.40)
+    assert cache.refit(chain.copy(), 2.40) is first
+    chain.loc[0, 'bid'] += 1e-4
+    assert cache.refit(chain, 2.40).version == first.version + 1